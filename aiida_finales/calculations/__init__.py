@@ -1,7 +1,8 @@
 """Calculation plugins provided with aiida-finale."""
 
-from .conductivity_estimation import conductivity_estimation
+from .conductivity_estimation import conductivity_estimation, conductivity_estimation_batch
 
 __all__ = [
     'conductivity_estimation',
+    'conductivity_estimation_batch',
 ]
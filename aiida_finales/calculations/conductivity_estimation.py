@@ -2,16 +2,81 @@
 from aiida import orm
 from aiida.engine import calcfunction
 
-from aiida_finales.utils.conductivity_estimator import estimate_conductivity
+from aiida_finales.utils.conductivity_estimator import estimate_conductivity, estimate_conductivity_batch
+from aiida_finales.utils.conductivity_grid import load_grid
 from aiida_finales.utils.create_result import create_result
 
 
 @calcfunction
-def conductivity_estimation(input_node):
-    """Calculate the conductivity of LiPF6 in EC+PC mixtures."""
+def conductivity_estimation(input_node, grid_file=None):
+    """Calculate the conductivity of LiPF6 in EC+PC mixtures.
+
+    If the path of a precomputed `grid_file` is given, the conductivity is
+    interpolated from the grid instead of evaluating the model.
+    """
     input_data = input_node.get_dict()
     input_params = input_data['request']['parameters']['molecular_dynamics']
 
+    value_lpf, value_ecs, value_pcs, temp = get_estimator_inputs(input_params)
+
+    result_raw = None
+    if grid_file is not None:
+        results_raw, valid_mask = load_grid(grid_file.value).estimate_batch(
+            value_lpf, value_ecs, value_pcs, temp)
+        if valid_mask[0]:
+            result_raw = float(results_raw[0])
+    if result_raw is None:
+        result_raw = estimate_conductivity(value_lpf, value_ecs, value_pcs,
+                                           temp)
+    result_data = create_result(result_raw, temp, input_params['formulation'],
+                                input_node.uuid)
+    # NOTE -> result data can't contain the calcjob uuid if I'm creating it inside the calcjob...
+    # Using the input node uuid instead while I figure out how to re-arrange this.
+    return orm.Dict(dict=result_data)
+
+
+@calcfunction
+def conductivity_estimation_batch(input_node, grid_file=None):
+    """Calculate the conductivity for a batch of requests at once.
+
+    The input contains the list of `requests`; the output maps the uuid of
+    each request to its result (`results`) or, for the requests that the
+    model can't be evaluated on, to the reason (`errors`). If the path of a
+    precomputed `grid_file` is given, the conductivities are interpolated
+    from the grid instead of evaluating the model.
+    """
+    requests_data = input_node.get_dict()['requests']
+    params_list = [
+        request_data['request']['parameters']['molecular_dynamics']
+        for request_data in requests_data
+    ]
+    estimator_inputs = [get_estimator_inputs(params) for params in params_list]
+    values_lpf, values_ecs, values_pcs, temps = zip(*estimator_inputs)
+
+    estimate_batch = estimate_conductivity_batch
+    if grid_file is not None:
+        estimate_batch = load_grid(grid_file.value).estimate_batch
+    results_raw, valid_mask = estimate_batch(values_lpf, values_ecs,
+                                             values_pcs, temps)
+
+    results = {}
+    errors = {}
+    for index, request_data in enumerate(requests_data):
+        request_uuid = request_data['uuid']
+        if not valid_mask[index]:
+            errors[request_uuid] = (
+                f'Cannot operate with concentrations of LPF={values_lpf[index]}'
+                f', PC={values_pcs[index]} and temperature={temps[index]}')
+            continue
+        results[request_uuid] = create_result(
+            float(results_raw[index]), temps[index],
+            params_list[index]['formulation'], input_node.uuid)
+
+    return orm.Dict(dict={'results': results, 'errors': errors})
+
+
+def get_estimator_inputs(input_params):
+    """Extract the fractions of LiPF6, EC and PC and the temperature."""
     components_fractions = {}
     for component in input_params['formulation']:
         inchikey = component['chemical']['InChIKey']
@@ -21,10 +86,4 @@ def conductivity_estimation(input_node):
     value_lpf = components_fractions.get('AXPLOJNSKRXQPA-UHFFFAOYSA-N', 0.0)
     value_ecs = components_fractions.get('KMTRUDSVKNLOMY-UHFFFAOYSA-N', 0.0)
     value_pcs = components_fractions.get('RUOJZAUFBMNUDX-UHFFFAOYSA-N', 0.0)
-
-    result_raw = estimate_conductivity(value_lpf, value_ecs, value_pcs, temp)
-    result_data = create_result(result_raw, temp, input_params['formulation'],
-                                input_node.uuid)
-    # NOTE -> result data can't contain the calcjob uuid if I'm creating it inside the calcjob...
-    # Using the input node uuid instead while I figure out how to re-arrange this.
-    return orm.Dict(dict=result_data)
+    return value_lpf, value_ecs, value_pcs, temp
@@ -1,15 +1,25 @@
 """Module for the command line interface.
 
-Import here all groups that directly inherit from root.
+The groups that directly inherit from root are imported lazily, when they
+are accessed or their commands are run (see `root.ROOT_SUBCOMMANDS`).
 """
-from .root import cmd_root
-from .server import cmd_server
-from .tenant import cmd_tenant
-from .test import cmd_test
+import importlib
+
+from .root import ROOT_SUBCOMMANDS, cmd_root
 
 __all__ = [
+    'cmd_estimator',
     'cmd_tenant',
     'cmd_root',
     'cmd_test',
     'cmd_server',
 ]
+
+
+def __getattr__(name):
+    """Import the groups of commands on first access."""
+    for lazy_path in ROOT_SUBCOMMANDS.values():
+        module_name, attribute = lazy_path.split(':')
+        if attribute == name:
+            return getattr(importlib.import_module(module_name), attribute)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
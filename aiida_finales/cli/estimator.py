@@ -0,0 +1,48 @@
+"""Commands for the conductivity estimator."""
+import click
+
+
+@click.group('estimator')
+def cmd_estimator():
+    """Handle the conductivity estimator."""
+
+
+@cmd_estimator.command('build-grid')
+@click.option(
+    '-o',
+    '--output-file',
+    help='Path of the `.npy` file (the axes are saved next to it as JSON).',
+    required=True,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    '--shape',
+    help='Points along the salt ratio, PC fraction and temperature axes.',
+    default=(101, 101, 91),
+    show_default=True,
+    nargs=3,
+    type=int,
+)
+@click.option(
+    '--num-samples',
+    help='Random points to measure the interpolation error at.',
+    default=100000,
+    show_default=True,
+    type=int,
+)
+@click.option('--seed', help='Seed for the random points.', type=int)
+def cmd_estimator_build_grid(output_file, shape, num_samples, seed):
+    """Precompute the conductivity on a grid for fast lookups.
+
+    Prints the maximum interpolation error against the exact model, to choose
+    the resolution of the grid.
+    """
+    from aiida_finales.utils.conductivity_grid import ConductivityGrid
+
+    grid = ConductivityGrid.build(shape)
+    grid.save(output_file)
+    errors = grid.max_error(num_samples, seed)
+    click.echo(f'Saved a grid of shape {grid.values.shape} '
+               f'({grid.values.nbytes / 2**20:.1f} MiB) to {output_file}')
+    click.echo(f'Maximum absolute error: {errors["max_abs_error"]:.3e}')
+    click.echo(f'Maximum relative error: {errors["max_rel_error"]:.3e}')
@@ -1,8 +1,43 @@
 """Topmost command line, kept separate to prevent import cycles."""
+import importlib
 
 import click
 
+# Groups of commands under the root, as `module:attribute` to import lazily.
+ROOT_SUBCOMMANDS = {
+    'estimator': 'aiida_finales.cli.estimator:cmd_estimator',
+    'server': 'aiida_finales.cli.server:cmd_server',
+    'tenant': 'aiida_finales.cli.tenant:cmd_tenant',
+    'test': 'aiida_finales.cli.test:cmd_test',
+}
 
-@click.group('aiida-finale')
+
+class LazyGroup(click.Group):
+    """Group that only imports the module of a subcommand when it is used.
+
+    The subcommands are given as `module:attribute` strings in
+    `lazy_subcommands`, so running one command does not pay for importing
+    the others (and their dependencies, such as AiiDA).
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        """Initialize internal variables."""
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx):
+        """Return the names of the eager and lazy subcommands."""
+        return sorted(
+            set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        """Return the subcommand, importing its module if it is lazy."""
+        if cmd_name in self.lazy_subcommands:
+            module_name, attribute = self.lazy_subcommands[cmd_name].split(':')
+            return getattr(importlib.import_module(module_name), attribute)
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group('aiida-finale', cls=LazyGroup, lazy_subcommands=ROOT_SUBCOMMANDS)
 def cmd_root():
     """Command line interface for aiida-finale."""
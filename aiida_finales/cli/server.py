@@ -3,12 +3,8 @@ import getpass
 
 import click
 
-from aiida_finales.engine.client import FinalesClientConfig
 
-from .root import cmd_root
-
-
-@cmd_root.group('server')
+@click.group('server')
 def cmd_server():
     """Direct queries to the server."""
 
@@ -23,6 +19,8 @@ def cmd_server():
 )
 def cmd_tenant_start(config_file):
     """Start up the client (blocks the terminal)."""
+    from aiida_finales.engine.client import FinalesClientConfig
+
     finales_client_config = FinalesClientConfig.load_from_yaml_file(
         config_file)
     connection_manager = finales_client_config.create_client()
@@ -39,3 +37,50 @@ def cmd_tenant_start(config_file):
         quantity = capability_data['quantity']
         method = capability_data['method']
         click.echo(f' > Quantity: `{quantity}` --> Method: `{method}`')
+
+
+@cmd_server.command('standin')
+@click.option('--host', default='127.0.0.1', show_default=True, type=str)
+@click.option('--port', default=8000, show_default=True, type=int)
+@click.option(
+    '-n',
+    '--num-requests',
+    help='Number of random requests to seed the server with.',
+    default=0,
+    show_default=True,
+    type=int,
+)
+@click.option('--seed',
+              help='Seed for the random requests and errors.',
+              type=int)
+@click.option('--latency',
+              help='Seconds to delay every call.',
+              default=0.0,
+              show_default=True,
+              type=float)
+@click.option('--jitter',
+              help='Maximum random seconds added to the latency.',
+              default=0.0,
+              show_default=True,
+              type=float)
+@click.option('--error-rate',
+              help='Probability of replying to a call with an error.',
+              default=0.0,
+              show_default=True,
+              type=float)
+def cmd_server_standin(host, port, num_requests, seed, latency, jitter,
+                       error_rate):
+    """Run a local stand-in for a FINALES server (blocks the terminal)."""
+    from aiida_finales.engine.standin import StandinServer
+
+    standin_server = StandinServer(host,
+                                   port,
+                                   latency=latency,
+                                   jitter=jitter,
+                                   error_rate=error_rate,
+                                   seed=seed)
+    standin_server.state.seed_requests(num_requests, seed)
+    host, port = standin_server.server_address[:2]
+    click.echo(f'Serving a FINALES stand-in at http://{host}:{port} '
+               f'with {num_requests} pending requests...')
+    standin_server.serve_forever()
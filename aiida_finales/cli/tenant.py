@@ -4,15 +4,8 @@ import getpass
 
 import click
 
-from aiida import load_profile
 
-from aiida_finales.engine.client import FinalesClientConfig
-from aiida_finales.engine.tenant import AiidaTenant
-
-from .root import cmd_root
-
-
-@cmd_root.group('tenant')
+@click.group('tenant')
 def cmd_tenant():
     """Handle the tenant."""
 
@@ -32,8 +25,34 @@ def cmd_tenant():
     required=True,
     type=click.Path(exists=True, dir_okay=False),
 )
-def cmd_tenant_start(profile, config_file):
+@click.option(
+    '-t',
+    '--tenant-config-file',
+    help='Path to the file with the configuration for the tenant.',
+    required=False,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--instance-index',
+    help='Index of this instance among several (overrides the tenant config).',
+    required=False,
+    type=int,
+)
+@click.option(
+    '--instance-count',
+    help='Number of instances sharing the requests (overrides tenant config).',
+    required=False,
+    type=int,
+)
+def cmd_tenant_start(profile, config_file, tenant_config_file, instance_index,
+                     instance_count):
     """Start up the client (blocks the terminal)."""
+    from aiida import load_profile
+
+    from aiida_finales.engine.client import FinalesClientConfig
+    from aiida_finales.engine.logs import configure_logging
+    from aiida_finales.engine.tenant import AiidaTenantConfig
+
     load_profile(profile)
 
     finales_client_config = FinalesClientConfig.load_from_yaml_file(
@@ -45,5 +64,16 @@ def cmd_tenant_start(profile, config_file):
         prompt=f'Password for username `{username}` (hidden): ')
     connection_manager.authenticate(username, password)
 
-    aiida_tenant = AiidaTenant(connection_manager)
+    if tenant_config_file is None:
+        aiida_tenant_config = AiidaTenantConfig()
+    else:
+        aiida_tenant_config = AiidaTenantConfig.load_from_yaml_file(
+            tenant_config_file)
+    if instance_index is not None:
+        aiida_tenant_config.instance_index = instance_index
+    if instance_count is not None:
+        aiida_tenant_config.instance_count = instance_count
+    configure_logging(aiida_tenant_config.log_level,
+                      aiida_tenant_config.log_format)
+    aiida_tenant = aiida_tenant_config.create_tenant(connection_manager)
     aiida_tenant.start()
@@ -4,15 +4,8 @@ import getpass
 
 import click
 
-from aiida_finales.engine.client import FinalesClientConfig
-from aiida_finales.utils.conductivity_estimator import estimate_conductivity
-from aiida_finales.utils.create_request import create_request
-from aiida_finales.utils.create_result import create_result, wrap_results
 
-from .root import cmd_root
-
-
-@cmd_root.group('test')
+@click.group('test')
 def cmd_test():
     """Commands for testing purposes."""
 
@@ -28,6 +21,9 @@ def cmd_test():
 def cmd_test_connection(config_file):
     """Populate the server with test requests."""
     import requests
+
+    from aiida_finales.engine.client import FinalesClientConfig
+
     finales_client_config = FinalesClientConfig.load_from_yaml_file(
         config_file)
     host = finales_client_config.host
@@ -47,6 +43,9 @@ def cmd_test_connection(config_file):
 )
 def cmd_test_populate(config_file):
     """Populate the server with test requests."""
+    from aiida_finales.engine.client import FinalesClientConfig
+    from aiida_finales.utils.create_request import create_request
+
     finales_client_config = FinalesClientConfig.load_from_yaml_file(
         config_file)
     connection_manager = finales_client_config.create_client()
@@ -84,6 +83,10 @@ def cmd_test_postresult(request_uuid, config_file):
     """Post an example response."""
     import uuid
 
+    from aiida_finales.engine.client import FinalesClientConfig
+    from aiida_finales.utils.conductivity_estimator import estimate_conductivity
+    from aiida_finales.utils.create_result import create_result, wrap_results
+
     finales_client_config = FinalesClientConfig.load_from_yaml_file(
         config_file)
     connection_manager = finales_client_config.create_client()
@@ -125,3 +128,122 @@ def cmd_test_postresult(request_uuid, config_file):
                                                   request_id=request_uuid)
     print(server_reply.json)
     return
+
+
+@cmd_test.command('load')
+@click.option(
+    '-n',
+    '--num-requests',
+    help='Number of requests to post.',
+    default=100,
+    show_default=True,
+    type=int,
+)
+@click.option(
+    '--concurrency',
+    help='Number of requests posted at the same time.',
+    default=10,
+    show_default=True,
+    type=int,
+)
+@click.option(
+    '--mode',
+    help='How the parameters of the requests are generated.',
+    default='random',
+    show_default=True,
+    type=click.Choice(['random', 'grid']),
+)
+@click.option('--seed', help='Seed for the random requests.', type=int)
+@click.option(
+    '--port',
+    help='Port of the stand-in server (a free one by default).',
+    default=0,
+    type=int,
+)
+@click.option(
+    '--timeout',
+    help='Seconds to wait for the results.',
+    default=600.0,
+    show_default=True,
+    type=float,
+)
+@click.option(
+    '--run-tenant',
+    help='Run a tenant in this process instead of waiting for an external one.',
+    is_flag=True,
+)
+@click.option(
+    '-p',
+    '--profile',
+    help='Name of the AiiDA profile for the tenant (current one by default).',
+    type=str,
+)
+@click.option(
+    '-t',
+    '--tenant-config-file',
+    help='Path to the file with the configuration for the tenant.',
+    type=click.Path(exists=True, dir_okay=False),
+)
+def cmd_test_load(num_requests, concurrency, mode, seed, port, timeout,
+                  run_tenant, profile, tenant_config_file):
+    """Measure the throughput and latency of a tenant.
+
+    Starts a local stand-in server, posts the requests to it and waits until
+    the results come back. The report is printed as JSON.
+    """
+    import json
+
+    from aiida_finales.engine.loadtest import LoadTest
+    from aiida_finales.engine.standin import StandinServer
+
+    with StandinServer(port=port) as standin_server:
+        host, port = standin_server.server_address[:2]
+        click.echo(f'Stand-in server listening at http://{host}:{port}',
+                   err=True)
+        load_test = LoadTest(standin_server,
+                             num_requests,
+                             concurrency=concurrency,
+                             mode=mode,
+                             seed=seed)
+        load_test.post_requests()
+
+        step = None
+        if run_tenant:
+            step = create_tenant_step(host, port, profile, tenant_config_file)
+        else:
+            click.echo('Waiting for a tenant to report the results...',
+                       err=True)
+        load_test.wait_for_results(timeout=timeout, step=step)
+
+    click.echo(json.dumps(load_test.get_report(), indent=2))
+
+
+def create_tenant_step(host, port, profile, tenant_config_file):
+    """Create a tenant for the server and return a function running a cycle."""
+    import time
+
+    from aiida import load_profile
+
+    from aiida_finales.engine.client import FinalesClient
+    from aiida_finales.engine.tenant import AiidaTenantConfig
+
+    load_profile(profile)
+    if tenant_config_file is None:
+        tenant_config = AiidaTenantConfig()
+    else:
+        tenant_config = AiidaTenantConfig.load_from_yaml_file(
+            tenant_config_file)
+    # Never share the stores of a production tenant on the same profile
+    tenant_config.ledger_file = ':memory:'
+    tenant_config.outbox_file = ':memory:'
+    tenant = tenant_config.create_tenant(
+        FinalesClient(host, port, requests_per_second=None))
+
+    def step():
+        """Run a cycle of the tenant and post the results."""
+        cycle_record = tenant.run_cycle()
+        tenant.outbox_flusher.flush_all()
+        if cycle_record['num_submitted'] == cycle_record['num_reported'] == 0:
+            time.sleep(0.5)
+
+    return step
@@ -1,9 +1,24 @@
-"""Internal engine for the aiida-finales tenant."""
+"""Internal engine for the aiida-finales tenant.
 
-from .client import FinalesClient
-from .tenant import AiidaTenant
+The exported classes are imported on first access, so that using a light
+submodule (e.g. the client) does not import AiiDA through the tenant.
+"""
+import importlib
+
+_LAZY_EXPORTS = {
+    'FinalesClient': '.client',
+    'AiidaTenant': '.tenant',
+}
 
 __all__ = [
     'FinalesClient',
     'AiidaTenant',
 ]
+
+
+def __getattr__(name):
+    """Import the exported classes on first access."""
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
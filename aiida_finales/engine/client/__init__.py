@@ -1,8 +1,12 @@
 """Module containing the client object."""
 
+from .async_client import AsyncFinalesClient
 from .main import FinalesClient, FinalesClientConfig
+from .ratelimit import RateLimiter
 
 __all__ = [
+    'AsyncFinalesClient',
     'FinalesClient',
     'FinalesClientConfig',
+    'RateLimiter',
 ]
@@ -0,0 +1,180 @@
+"""Asynchronous version of the client to manage the connection with the server."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+
+from .main import RestapiConnection
+from .ratelimit import RateLimiter
+
+
+class AsyncFinalesClient:
+    """Asynchronous counterpart of `FinalesClient`.
+
+    The calls go through the same pooled `RestapiConnection` as the synchronous
+    client and are run in a thread pool, so at most `max_concurrency` of them
+    are in flight at any time (each using one of the pooled connections).
+    """
+
+    def __init__(self,
+                 host,
+                 port,
+                 max_concurrency=10,
+                 requests_per_second=10.0,
+                 burst=5,
+                 rate_limiter=None,
+                 connection=None,
+                 **connection_kwargs):
+        """Initialize internal variables.
+
+        An existing `connection` (and `rate_limiter`) can be given to share
+        them with a synchronous client; otherwise new ones are created with
+        a pool large enough for `max_concurrency` simultaneous calls.
+        """
+        self._owns_connection = connection is None
+        if connection is None:
+            connection_kwargs.setdefault('pool_maxsize', max_concurrency)
+            connection = RestapiConnection(host, port, **connection_kwargs)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(requests_per_second, burst)
+
+        self._connection = connection
+        self._rate_limiter = rate_limiter
+        self._max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='finales-client',
+        )
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    @classmethod
+    def from_client(cls, finales_client, max_concurrency=None):
+        """Create an asynchronous client sharing a synchronous one's pool.
+
+        The new client reuses the connection (including the authentication)
+        and the rate limiter of `finales_client`.
+        """
+        connection = finales_client._connection  # pylint: disable=protected-access
+        if max_concurrency is None:
+            max_concurrency = connection.pool_maxsize
+        return cls(
+            host=None,
+            port=None,
+            max_concurrency=max_concurrency,
+            rate_limiter=finales_client.rate_limiter,
+            connection=connection,
+        )
+
+    @property
+    def rate_limiter(self):
+        """Return the rate limiter used to throttle the calls."""
+        return self._rate_limiter
+
+    @property
+    def max_concurrency(self):
+        """Return the maximum number of calls in flight."""
+        return self._max_concurrency
+
+    def close(self):
+        """Release the worker threads (and the connection if it is owned)."""
+        self._executor.shutdown(wait=True)
+        if self._owns_connection:
+            self._connection.close()
+
+    async def authenticate(self, username, password):
+        """Authenticate the connection with the server."""
+        return await self._run(self._connection.authenticate, username,
+                               password)
+
+    async def get_capabilities(self, currently_available=False):
+        """Return the available capabilities."""
+        endpoint = '/capabilities/'
+        params = {'currently_available': currently_available}
+        return await self._run(self._get_json, endpoint, params=params)
+
+    async def get_pending_requests(self,
+                                   quantity=None,
+                                   method=None,
+                                   limit=None,
+                                   offset=None):
+        """Return the pending requests."""
+        endpoint = '/pending_requests/'
+        params = {
+            'quantity': quantity,
+            'method': method,
+            'limit': limit,
+            'offset': offset,
+        }
+        return await self._run(self._get_json, endpoint, params=params)
+
+    async def get_specific_request(self, request_uuid):
+        """Retrieve a specific request."""
+        endpoint = f'/requests/{request_uuid}'
+        return await self._run(self._get_json, endpoint)
+
+    async def post_request(self, data):
+        """Post a request to the server."""
+        endpoint = '/requests/'
+        return await self._run(self._post_json, endpoint, data_json=data)
+
+    async def post_result(self, data, request_id):
+        """Post a result to the server."""
+        endpoint = '/results/'
+        return await self._run(self._post_json, endpoint, data_json=data)
+
+    async def post_requests(self, data_list):
+        """Post many requests concurrently.
+
+        Returns the list of server replies in the same order as the input;
+        if a post fails, the exception takes the place of its reply.
+        """
+        return await asyncio.gather(
+            *(self.post_request(data) for data in data_list),
+            return_exceptions=True,
+        )
+
+    async def post_results(self, results):
+        """Post many results concurrently.
+
+        The `results` are `(data, request_id)` pairs. Returns the list of
+        server replies in the same order as the input; if a post fails, the
+        exception takes the place of its reply.
+        """
+        return await asyncio.gather(
+            *(self.post_result(data, request_id)
+              for data, request_id in results),
+            return_exceptions=True,
+        )
+
+    def _get_json(self, endpoint, params=None):
+        """GET and decode the reply (runs in a worker thread)."""
+        return self._connection.auth_get(endpoint, params=params).json()
+
+    def _post_json(self, endpoint, data_json=None):
+        """POST and decode the reply (runs in a worker thread).
+
+        Error replies of the server raise `requests.HTTPError`.
+        """
+        response = self._connection.auth_post(endpoint, data_json=data_json)
+        response.raise_for_status()
+        return response.json()
+
+    async def _run(self, function, *args, **kwargs):
+        """Run a blocking call within the concurrency and rate limits."""
+        async with self._get_semaphore():
+            await self._rate_limiter.acquire_async()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(function, *args, **kwargs))
+
+    def _get_semaphore(self):
+        """Return the semaphore for the running event loop.
+
+        The semaphore is recreated if the client is used from a new event loop
+        (e.g. in consecutive `asyncio.run` calls).
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
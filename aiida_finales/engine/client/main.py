@@ -1,18 +1,56 @@
 """Class to manage the connection with the server."""
 import time
+from typing import Optional
+import warnings
 
 from pydantic import BaseModel
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml  # consider strictyaml for automatic schema validation
 
+from ..metrics import REGISTRY
+from .ratelimit import RateLimiter
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'finales_client_request_seconds',
+    'Latency of the calls to the FINALES server (including retries).',
+    ('method', 'endpoint'))
+REQUEST_ERRORS = REGISTRY.counter(
+    'finales_client_errors_total',
+    'Calls to the FINALES server that failed or returned an error status.',
+    ('method', 'endpoint'))
+
 
 class RestapiConnection:
     """Internal auxiliary class that handles the base connection."""
 
-    def __init__(self, host, port):
+    def __init__(self,
+                 host,
+                 port,
+                 pool_maxsize=10,
+                 connect_timeout=5.0,
+                 read_timeout=30.0,
+                 max_retries=3,
+                 retry_backoff=0.5):
         """Initialize internal variables."""
         self._baseurl = f'http://{host}:{port}'
         self._auth_header = None
+        self._timeout = (connect_timeout, read_timeout)
+        self._pool_maxsize = pool_maxsize
+        self._session = create_session(pool_maxsize, max_retries,
+                                       retry_backoff)
+
+    @property
+    def pool_maxsize(self):
+        """Return the maximum number of connections kept in the pool."""
+        return self._pool_maxsize
+
+    def close(self):
+        """Close the pooled connections to the server."""
+        self._session.close()
 
     def authenticate(self, username, password):
         """Authenticate the connection with the server."""
@@ -26,15 +64,16 @@ class RestapiConnection:
             'accept': 'application/json',
             'Content-Type': 'application/x-www-form-urlencoded'
         }
-        token_response = requests.post(
+        token_response = self._session.post(
             request_url,
             data=request_data,
             headers=request_headers,
+            timeout=self._timeout,
         )
         if token_response.status_code == 401:
             raise ValueError('Wrong username / password.')
         elif token_response.status_code != 200:
-            raise RuntimeError()('Problem with authentication.')
+            raise RuntimeError('Problem with authentication.')
 
         token_response = token_response.json()
         token_object = token_response['access_token']
@@ -48,73 +87,219 @@ class RestapiConnection:
 
     def auth_get(self, endpoint, params=None):
         """GET with authorized credentials."""
-        full_url = self._baseurl + endpoint
-        kwargs = {'headers': self._auth_header}
+        kwargs = {'headers': self._auth_header, 'timeout': self._timeout}
         if params is not None:
             kwargs['params'] = params
-        return requests.get(full_url, **kwargs)
+        return self._send('GET', endpoint, **kwargs)
 
     def auth_post(self, endpoint, data_raw=None, data_json=None, params=None):
         """POST with authorized credentials."""
-        full_url = self._baseurl + endpoint
-        kwargs = {'headers': self._auth_header}
+        kwargs = {'headers': self._auth_header, 'timeout': self._timeout}
         if data_raw is not None:
             kwargs['data'] = data_raw
         if data_json is not None:
             kwargs['json'] = data_json
         if params is not None:
             kwargs['params'] = params
-        return requests.post(full_url, **kwargs)
+        return self._send('POST', endpoint, **kwargs)
+
+    def _send(self, method, endpoint, **kwargs):
+        """Send the request, recording its latency and errors."""
+        labels = {'method': method, 'endpoint': get_endpoint_label(endpoint)}
+        start = time.monotonic()
+        try:
+            response = self._session.request(method, self._baseurl + endpoint,
+                                             **kwargs)
+        except Exception:
+            REQUEST_ERRORS.inc(**labels)
+            raise
+        finally:
+            REQUEST_SECONDS.observe(time.monotonic() - start, **labels)
+        if response.status_code >= 400:
+            REQUEST_ERRORS.inc(**labels)
+        return response
+
+
+def get_endpoint_label(endpoint):
+    """Return the endpoint without identifiers (e.g. `/requests/`)."""
+    return '/' + endpoint.strip('/').split('/')[0] + '/'
+
+
+def get_requests_per_second(execution_delay):
+    """Convert the deprecated `execution_delay` into `requests_per_second`.
+
+    A delay of zero disables the throttling (`None`).
+    """
+    warnings.warn(
+        '`execution_delay` is deprecated, use `requests_per_second` instead',
+        DeprecationWarning,
+        stacklevel=3)
+    if not execution_delay:
+        return None
+    return 1.0 / execution_delay
+
+
+def create_session(pool_maxsize, max_retries, retry_backoff):
+    """Create a session that keeps a pool of connections alive.
+
+    Failed connections are retried with exponential backoff for all methods,
+    but 5xx replies are only retried for idempotent methods (so that a POST
+    that reached the server is never sent twice).
+    """
+    retry_strategy = Retry(
+        total=max_retries,
+        backoff_factor=retry_backoff,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry_strategy,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class FinalesClient:
     """Class to manage the connection with the server."""
 
-    def __init__(self, host, port, execution_delay=0.1):
-        """Initialize internal variables."""
-        self._execution_delay = execution_delay
-        self._connection = RestapiConnection(host, port)
+    def __init__(self,
+                 host,
+                 port,
+                 requests_per_second=10.0,
+                 burst=5,
+                 rate_limiter=None,
+                 execution_delay=None,
+                 **connection_kwargs):
+        """Initialize internal variables.
+
+        The calls to the server are throttled by a token bucket allowing
+        `requests_per_second` with bursts of up to `burst` calls; a
+        `rate_limiter` can be given instead to share the budget between
+        several clients. The deprecated `execution_delay` (seconds between
+        calls) is converted into `requests_per_second`. Any extra keyword
+        arguments (pool size, timeouts and retries) are passed on to the
+        underlying `RestapiConnection`.
+        """
+        if execution_delay is not None:
+            requests_per_second = get_requests_per_second(execution_delay)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(requests_per_second, burst)
+        self._rate_limiter = rate_limiter
+        self._connection = RestapiConnection(host, port, **connection_kwargs)
+
+    @property
+    def rate_limiter(self):
+        """Return the rate limiter used to throttle the calls."""
+        return self._rate_limiter
+
+    @property
+    def last_wait(self):
+        """Return the seconds the last call was throttled by the limiter."""
+        return self._rate_limiter.last_wait
+
+    def close(self):
+        """Close the connection with the server."""
+        self._connection.close()
 
     def authenticate(self, username, password):
         """Authenticate the connection with the server."""
-        time.sleep(self._execution_delay)
+        self._rate_limiter.acquire()
         return self._connection.authenticate(username, password)
 
     def get_capabilities(self, currently_available=False):
         """Return the available capabilities."""
-        time.sleep(self._execution_delay)
+        self._rate_limiter.acquire()
         endpoint = '/capabilities/'
         params = {'currently_available': currently_available}
         response = self._connection.auth_get(endpoint, params=params)
         return response.json()
 
-    def get_pending_requests(self, quantity=None, method=None):
-        """Return the pending requests."""
-        time.sleep(self._execution_delay)
+    def get_pending_requests(self,
+                             quantity=None,
+                             method=None,
+                             limit=None,
+                             offset=None):
+        """Return the pending requests.
+
+        The server filters them by `quantity` and `method` (if given) and
+        returns at most `limit` of them, skipping the first `offset`.
+        """
+        self._rate_limiter.acquire()
         endpoint = '/pending_requests/'
-        params = {'quantity': quantity, 'method': method}
+        params = {
+            'quantity': quantity,
+            'method': method,
+            'limit': limit,
+            'offset': offset,
+        }
         response = self._connection.auth_get(endpoint, params=params)
         return response.json()
 
+    def iter_pending_requests(self,
+                              quantity=None,
+                              method=None,
+                              page_size=None):
+        """Iterate over the pending requests, fetching them page by page.
+
+        Each page is requested only once the previous one was consumed. If
+        `page_size` is not given, all the requests are fetched in one call.
+        The iteration stops at the first page that is incomplete or that
+        doesn't bring new requests (in case the server ignores the offset).
+        """
+        if page_size is None:
+            yield from self.get_pending_requests(quantity, method)
+            return
+
+        offset = 0
+        seen_uuids = set()
+        while True:
+            page = self.get_pending_requests(quantity,
+                                             method,
+                                             limit=page_size,
+                                             offset=offset)
+            new_requests = [
+                request_data for request_data in page
+                if request_data['uuid'] not in seen_uuids
+            ]
+            for request_data in new_requests:
+                seen_uuids.add(request_data['uuid'])
+                yield request_data
+
+            if len(page) < page_size or not new_requests:
+                return
+            offset += len(page)
+
     def get_specific_request(self, request_uuid):
         """Retrieve a specific request."""
-        time.sleep(self._execution_delay)
+        self._rate_limiter.acquire()
         endpoint = f'/requests/{request_uuid}'
         response = self._connection.auth_get(endpoint)
         return response.json()
 
     def post_request(self, data):
-        """Post a request to the server."""
-        time.sleep(self._execution_delay)
+        """Post a request to the server.
+
+        Raises `requests.HTTPError` if the server replies with an error.
+        """
+        self._rate_limiter.acquire()
         endpoint = '/requests/'
         response = self._connection.auth_post(endpoint, data_json=data)
+        response.raise_for_status()
         return response.json()
 
     def post_result(self, data, request_id):
-        """Post a result to the server."""
-        time.sleep(self._execution_delay)
+        """Post a result to the server.
+
+        Raises `requests.HTTPError` if the server replies with an error.
+        """
+        self._rate_limiter.acquire()
         endpoint = '/results/'
         response = self._connection.auth_post(endpoint, data_json=data)
+        response.raise_for_status()
         return response.json()
 
 
@@ -124,7 +309,14 @@ class FinalesClientConfig(BaseModel):
     username: str
     host: str
     port: int
-    execution_delay: float = 0.1
+    requests_per_second: Optional[float] = 10.0
+    burst: int = 5
+    pool_maxsize: int = 10
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+    execution_delay: Optional[float] = None  # Deprecated
 
     @classmethod
     def load_from_yaml_file(cls, filepath):
@@ -139,8 +331,38 @@ class FinalesClientConfig(BaseModel):
 
         return FinalesClientConfig(**client_config)
 
+    def get_requests_per_second(self):
+        """Return the rate of calls, converting the deprecated delay."""
+        if self.execution_delay is not None:
+            return get_requests_per_second(self.execution_delay)
+        return self.requests_per_second
+
     def create_client(self):
         """Use the data to create a client."""
+        requests_per_second = self.get_requests_per_second()
         return FinalesClient(host=self.host,
                              port=self.port,
-                             execution_delay=self.execution_delay)
+                             requests_per_second=requests_per_second,
+                             burst=self.burst,
+                             pool_maxsize=self.pool_maxsize,
+                             connect_timeout=self.connect_timeout,
+                             read_timeout=self.read_timeout,
+                             max_retries=self.max_retries,
+                             retry_backoff=self.retry_backoff)
+
+    def create_async_client(self):
+        """Use the data to create an asynchronous client.
+
+        The number of concurrent calls is bounded by the size of the pool.
+        """
+        from .async_client import AsyncFinalesClient
+        requests_per_second = self.get_requests_per_second()
+        return AsyncFinalesClient(host=self.host,
+                                  port=self.port,
+                                  max_concurrency=self.pool_maxsize,
+                                  requests_per_second=requests_per_second,
+                                  burst=self.burst,
+                                  connect_timeout=self.connect_timeout,
+                                  read_timeout=self.read_timeout,
+                                  max_retries=self.max_retries,
+                                  retry_backoff=self.retry_backoff)
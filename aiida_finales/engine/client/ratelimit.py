@@ -0,0 +1,93 @@
+"""Rate limiter shared by the calls made to the server."""
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of requests sent to the server.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens per
+    second. Each call takes one token and only waits when the bucket is empty.
+    Tokens are reserved while holding a lock (so that concurrent threads and
+    coroutines are served in order) but the waiting itself happens outside of
+    it, either with `acquire` (blocking) or `acquire_async` (awaitable).
+
+    A `rate` of `None` (or zero) disables the limiter altogether.
+    """
+
+    def __init__(self, rate=10.0, burst=1, clock=time.monotonic):
+        """Initialize internal variables."""
+        if burst < 1:
+            raise ValueError(f'The burst must be at least 1, not {burst}')
+        self._rate = rate if rate else None
+        self._burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = clock()
+
+        self.last_wait = 0.0
+        self.total_wait = 0.0
+        self.total_calls = 0
+        self.throttled_calls = 0
+
+    @property
+    def rate(self):
+        """Return the number of requests per second allowed (or None)."""
+        return self._rate
+
+    @property
+    def burst(self):
+        """Return the number of requests that can be sent without waiting."""
+        return self._burst
+
+    def acquire(self):
+        """Take a token, sleeping if necessary; return the seconds waited."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self):
+        """Take a token without blocking the event loop."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    def get_stats(self):
+        """Return a dictionary with the accumulated waiting statistics."""
+        with self._lock:
+            return {
+                'last_wait': self.last_wait,
+                'total_wait': self.total_wait,
+                'total_calls': self.total_calls,
+                'throttled_calls': self.throttled_calls,
+            }
+
+    def _reserve(self):
+        """Reserve a token and return how long to wait until it is valid."""
+        with self._lock:
+            self.total_calls += 1
+            if self._rate is None:
+                self.last_wait = 0.0
+                return 0.0
+
+            now = self._clock()
+            elapsed = now - self._last_refill
+            self._last_refill = now
+            self._tokens = min(self._burst,
+                               self._tokens + elapsed * self._rate)
+
+            # The token count can go negative: that is the debt that later
+            # callers (queued behind this one) will have to wait out as well.
+            self._tokens -= 1.0
+            wait_time = 0.0
+            if self._tokens < 0:
+                wait_time = -self._tokens / self._rate
+                self.throttled_calls += 1
+
+            self.last_wait = wait_time
+            self.total_wait += wait_time
+            return wait_time
@@ -0,0 +1,192 @@
+"""Load test of the tenant against a local stand-in server."""
+import asyncio
+import itertools
+import math
+import random
+import statistics
+import time
+
+from aiida_finales.engine.client import AsyncFinalesClient
+from aiida_finales.utils.create_request import create_request
+
+from .standin import TEMPERATURE_RANGE, create_random_request
+
+REQUEST_MODES = ('random', 'grid')
+
+
+class LoadTest:
+    """Post requests to a stand-in server and time their results.
+
+    The requests are posted through `concurrency` simultaneous connections;
+    the latency of each request is the time from its posting until its
+    result arrives at the server (through whatever tenant is serving it).
+    """
+
+    def __init__(self,
+                 standin_server,
+                 num_requests,
+                 concurrency=10,
+                 mode='random',
+                 seed=None):
+        """Initialize internal variables."""
+        self._server = standin_server
+        self._requests_data = generate_requests(num_requests, mode, seed)
+        self._concurrency = concurrency
+        self._request_uuids = []
+        self._num_failed_posts = 0
+        self._post_duration = None
+        self._wait_start = None
+        self._wait_duration = None
+
+    @property
+    def request_uuids(self):
+        """Return the uuids of the requests posted."""
+        return list(self._request_uuids)
+
+    def post_requests(self):
+        """Post all the requests; return the uuids of the successful ones."""
+        host, port = self._server.server_address[:2]
+        client = AsyncFinalesClient(host,
+                                    port,
+                                    max_concurrency=self._concurrency,
+                                    requests_per_second=None)
+        post_start = time.monotonic()
+        try:
+            server_replies = asyncio.run(
+                client.post_requests(self._requests_data))
+        finally:
+            client.close()
+        self._post_duration = time.monotonic() - post_start
+
+        for server_reply in server_replies:
+            if isinstance(server_reply, Exception):
+                self._num_failed_posts += 1
+            else:
+                self._request_uuids.append(server_reply)
+        return self.request_uuids
+
+    def wait_for_results(self, timeout=600.0, step=None, interval=0.1):
+        """Wait until all the results arrived or the `timeout` is reached.
+
+        The `step` function (e.g. a cycle of a tenant running in the same
+        process) is called while waiting; otherwise the test just sleeps for
+        `interval` seconds between checks. Returns whether all the results
+        arrived.
+        """
+        self._wait_start = time.monotonic()
+        deadline = self._wait_start + timeout
+        while self.num_completed < len(self._request_uuids):
+            if time.monotonic() > deadline:
+                break
+            if step is not None:
+                step()
+            else:
+                time.sleep(interval)
+        self._wait_duration = time.monotonic() - self._wait_start
+        return self.num_completed == len(self._request_uuids)
+
+    @property
+    def num_completed(self):
+        """Return the number of requests whose result arrived."""
+        result_times = self._server.state.result_times
+        return sum(request_uuid in result_times
+                   for request_uuid in self._request_uuids)
+
+    def get_report(self):
+        """Return the throughput and latency statistics of the test."""
+        state = self._server.state
+        latencies = []
+        for request_uuid in self._request_uuids:
+            if request_uuid in state.result_times:
+                latencies.append(state.result_times[request_uuid] -
+                                 state.request_times[request_uuid])
+
+        throughput = None
+        if latencies:
+            first_request = min(state.request_times[request_uuid]
+                                for request_uuid in self._request_uuids)
+            last_result = max(state.result_times[request_uuid]
+                              for request_uuid in self._request_uuids
+                              if request_uuid in state.result_times)
+            throughput = safe_divide(len(latencies),
+                                     last_result - first_request)
+
+        num_posted = len(self._request_uuids)
+        return {
+            'num_requests': len(self._requests_data),
+            'num_posted': num_posted,
+            'num_failed_posts': self._num_failed_posts,
+            'num_completed': len(latencies),
+            'concurrency': self._concurrency,
+            'post_duration': self._post_duration,
+            'post_throughput': safe_divide(num_posted, self._post_duration),
+            'wait_duration': self._wait_duration,
+            'throughput': throughput,
+            'latency': summarize_latencies(latencies),
+        }
+
+
+def generate_requests(num_requests, mode='random', seed=None):
+    """Generate conductivity requests with random or gridded parameters.
+
+    In the `grid` mode the temperature, the fraction of LiPF6 and the share
+    of EC in the solvent are spread evenly in a grid with (about) the same
+    number of points per dimension.
+    """
+    if mode not in REQUEST_MODES:
+        raise ValueError(f'Unknown mode `{mode}`, options are: '
+                         f'{list(REQUEST_MODES)}')
+
+    if mode == 'random':
+        rng = random.Random(seed)
+        return [create_random_request(rng) for _ in range(num_requests)]
+
+    num_points = max(math.ceil(num_requests**(1 / 3)), 1)
+    temperatures = spread(*TEMPERATURE_RANGE, num_points)
+    fractions_li = spread(0.05, 0.3, num_points)
+    shares_ec = spread(0.0, 0.9, num_points)
+    requests_data = []
+    grid = itertools.product(temperatures, fractions_li, shares_ec)
+    for temp, conc_li, share_ec in itertools.islice(grid, num_requests):
+        conc_ec = round((1.0 - conc_li) * share_ec, 3)
+        requests_data.append(
+            create_request(temp=temp,
+                           conc_li=conc_li,
+                           conc_ec=conc_ec,
+                           conc_pc=round(1.0 - conc_li - conc_ec, 3)))
+    return requests_data
+
+
+def spread(start, stop, num_points):
+    """Return `num_points` evenly spaced values (rounded to 3 decimals)."""
+    if num_points == 1:
+        return [round(start, 3)]
+    step = (stop - start) / (num_points - 1)
+    return [round(start + index * step, 3) for index in range(num_points)]
+
+
+def summarize_latencies(latencies):
+    """Return the mean, maximum and percentiles of the latencies."""
+    if not latencies:
+        return None
+    sorted_latencies = sorted(latencies)
+    return {
+        'mean': statistics.fmean(sorted_latencies),
+        'p50': percentile(sorted_latencies, 0.50),
+        'p95': percentile(sorted_latencies, 0.95),
+        'p99': percentile(sorted_latencies, 0.99),
+        'max': sorted_latencies[-1],
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Return the percentile of sorted values (nearest-rank method)."""
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def safe_divide(numerator, denominator):
+    """Divide, returning `None` if the denominator is not positive."""
+    if not denominator or denominator <= 0:
+        return None
+    return numerator / denominator
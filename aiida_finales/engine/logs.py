@@ -0,0 +1,103 @@
+"""Logging helpers: structured output and sampling of the verbose messages."""
+import json
+import logging
+import random
+
+# Attributes of every `LogRecord`; anything else was passed with `extra`.
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message'}
+
+LOG_FORMATS = ('text', 'json')
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format the records with the fields passed in `extra`.
+
+    In the `text` format the fields are appended to the message as
+    `key=value` pairs; in the `json` format each record is a JSON object.
+    """
+
+    def __init__(self, log_format='text'):
+        """Initialize internal variables."""
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f'Unknown log format `{log_format}`, '
+                             f'options are: {list(LOG_FORMATS)}')
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        self._log_format = log_format
+
+    def format(self, record):
+        """Return the formatted record."""
+        fields = get_fields(record)
+        if self._log_format == 'json':
+            entry = {
+                'time': self.formatTime(record),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage(),
+            }
+            entry.update(fields)
+            if record.exc_info:
+                entry['exception'] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        formatted = super().format(record)
+        if fields:
+            formatted += ' ' + ' '.join(f'{key}={value}'
+                                        for key, value in fields.items())
+        return formatted
+
+
+class SampledLogger:
+    """Emit only a fraction `sample_rate` of the messages of a logger.
+
+    Meant for the messages repeated for every request in every cycle, which
+    are summarized per cycle anyway; the number of messages left out is kept
+    in `num_suppressed`.
+    """
+
+    def __init__(self, logger, sample_rate=1.0, rng=random.random):
+        """Initialize internal variables."""
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(
+                f'The sample rate must be between 0 and 1, not {sample_rate}')
+        self._logger = logger
+        self._sample_rate = sample_rate
+        self._rng = rng
+        self.num_suppressed = 0
+
+    def log(self, level, msg, *args, **kwargs):
+        """Log the message if it is enabled and sampled."""
+        if not self._logger.isEnabledFor(level):
+            return
+        if self._sample_rate < 1.0 and self._rng() >= self._sample_rate:
+            self.num_suppressed += 1
+            return
+        self._logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        """Log a sampled message with level `DEBUG`."""
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        """Log a sampled message with level `INFO`."""
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+
+def get_fields(record):
+    """Return the fields passed to the record with `extra`."""
+    return {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in RECORD_ATTRIBUTES and not key.startswith('_')
+    }
+
+
+def configure_logging(level='INFO', log_format='text'):
+    """Send the logs of `aiida_finales` to the standard error."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(log_format))
+    logger = logging.getLogger('aiida_finales')
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
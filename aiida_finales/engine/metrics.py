@@ -0,0 +1,307 @@
+"""Counters, gauges and histograms to instrument the tenant and the client."""
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+from typing import Optional
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0, 30.0, 60.0)
+
+
+class Metric:
+    """Base class of the metrics: values per combination of label values."""
+
+    kind: Optional[str] = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """Initialize internal variables."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _get_key(self, labels):
+        """Return the label values in the order of the label names."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'Metric `{self.name}` expects the labels '
+                             f'{self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[labelname]) for labelname in self.labelnames)
+
+    def get(self, **labels):
+        """Return the current value for the labels."""
+        return self._values.get(self._get_key(labels), 0.0)
+
+    def samples(self):
+        """Return the list of `(suffix, labels, value)` of the metric."""
+        with self._lock:
+            return [('', dict(zip(self.labelnames, key)), value)
+                    for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    """Value that only goes up (number of calls, errors...)."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter for the labels."""
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down (queue depths, workflows running...)."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """Set the gauge for the labels."""
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values (latencies, durations...)."""
+
+    kind = 'histogram'
+
+    def __init__(self,
+                 name,
+                 documentation,
+                 labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        """Initialize internal variables."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf, )
+
+    def observe(self, value, **labels):
+        """Record an observation for the labels."""
+        key = self._get_key(labels)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            entry = self._values[key]
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    entry['buckets'][index] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the context."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def get(self, **labels):
+        """Return the count, sum and cumulative buckets for the labels."""
+        key = self._get_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0
+                }
+            return {
+                'buckets': list(entry['buckets']),
+                'sum': entry['sum'],
+                'count': entry['count'],
+            }
+
+    def samples(self):
+        """Return the buckets, sum and count of every set of labels."""
+        samples = []
+        with self._lock:
+            for key, entry in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                for upper_bound, count in zip(self.buckets, entry['buckets']):
+                    bucket_labels = dict(labels, le=format_value(upper_bound))
+                    samples.append(('_bucket', bucket_labels, count))
+                samples.append(('_sum', labels, entry['sum']))
+                samples.append(('_count', labels, entry['count']))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics, rendered together for export."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        """Return the counter with the name, creating it if needed."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Return the gauge with the name, creating it if needed."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self,
+                  name,
+                  documentation,
+                  labelnames=(),
+                  buckets=DEFAULT_BUCKETS):
+        """Return the histogram with the name, creating it if needed."""
+        return self._get_or_create(Histogram,
+                                   name,
+                                   documentation,
+                                   labelnames,
+                                   buckets=buckets)
+
+    def __getitem__(self, name):
+        """Return the metric with the name."""
+        return self._metrics[name]
+
+    def render_prometheus(self):
+        """Return all the metrics in the Prometheus text format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for suffix, labels, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{format_labels(labels)} '
+                             f'{format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def as_dict(self):
+        """Return all the metrics as a JSON-serializable dictionary."""
+        metrics = {}
+        for metric in list(self._metrics.values()):
+            metrics[metric.name] = {
+                'type':
+                metric.kind,
+                'help':
+                metric.documentation,
+                'samples': [{
+                    'name': metric.name + suffix,
+                    'labels': labels,
+                    'value': value,
+                } for suffix, labels, value in metric.samples()],
+            }
+        return metrics
+
+    def dump_json(self, filepath):
+        """Write all the metrics in a JSON file."""
+        with open(filepath, 'w') as fileobj:
+            json.dump({
+                'time': time.time(),
+                'metrics': self.as_dict()
+            }, fileobj)
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        """Return the metric with the name, creating it if needed."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f'Metric `{name}` is already registered as a {metric.kind}'
+                )
+            return metric
+
+
+class MetricsServer:
+    """Serve the metrics of a registry over HTTP in a background thread.
+
+    The Prometheus text format is served at `/metrics` and the JSON format at
+    `/metrics.json`. By default the server only listens on the loopback
+    interface.
+    """
+
+    def __init__(self, registry, host='127.0.0.1', port=9464):
+        """Initialize internal variables."""
+        handler_class = type('MetricsHandler', (MetricsHandler, ),
+                             {'registry': registry})
+        self._server = ThreadingHTTPServer((host, port), handler_class)
+        self._thread = None
+
+    @property
+    def server_address(self):
+        """Return the host and port the server listens on."""
+        return self._server.server_address
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='metrics-server',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Reply to the requests for the metrics."""
+
+    registry = None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Return the metrics in the format of the path."""
+        if self.path == '/metrics':
+            body = self.registry.render_prometheus().encode()
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body = json.dumps(self.registry.as_dict()).encode()
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log every scrape."""
+
+
+def format_labels(labels):
+    """Return the labels in the Prometheus text format."""
+    if not labels:
+        return ''
+    formatted = ','.join(f'{name}="{escape_label_value(value)}"'
+                         for name, value in labels.items())
+    return '{' + formatted + '}'
+
+
+def escape_label_value(value):
+    """Escape the backslashes, quotes and new lines of a label value."""
+    return str(value).replace('\\',
+                              '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    """Return the value in the Prometheus text format."""
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+# Registry shared by the client and the tenant.
+REGISTRY = MetricsRegistry()
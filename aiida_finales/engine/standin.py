@@ -0,0 +1,327 @@
+"""In-process stand-in for a FINALES server, for offline tests and load tests.
+
+It implements the endpoints used by the client, keeping the requests and
+results in memory, and can simulate a slow or unreliable server.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+import uuid
+
+from pydantic import BaseModel, ValidationError
+
+from aiida_finales.engine.client.schemas import Token
+from aiida_finales.utils.create_request import create_request
+
+DEFAULT_CAPABILITIES = ({
+    'quantity': 'conductivity',
+    'method': 'molecular_dynamics',
+}, )
+
+# Temperatures covered by the conductivity estimator (in K).
+TEMPERATURE_RANGE = (243.0, 333.0)
+
+
+class RequestModel(BaseModel):
+    """Request posted to the server."""
+
+    quantity: str
+    methods: List[str]
+    parameters: Dict[str, Dict[str, Any]]
+    tenant_uuid: str
+
+
+class ResultModel(BaseModel):
+    """Result posted to the server."""
+
+    data: Dict[str, Any]
+    quantity: str
+    method: List[str]
+    parameters: Dict[str, Dict[str, Any]]
+    tenant_uuid: str
+    request_uuid: str
+
+
+class StandinState:
+    """Requests, results and users of the stand-in server.
+
+    The time when each request was posted and when its result arrived are
+    recorded, so the end-to-end latency can be measured.
+    """
+
+    def __init__(self, capabilities=DEFAULT_CAPABILITIES, users=None):
+        """Initialize internal variables.
+
+        If `users` (a dictionary of passwords per username) are given, all
+        the endpoints require authentication.
+        """
+        self.capabilities = [dict(capability) for capability in capabilities]
+        self.users = dict(users or {})
+        self.tokens = set()
+        self.requests = {}
+        self.results = {}
+        self.request_times = {}
+        self.result_times = {}
+        self.lock = threading.Lock()
+
+    def add_request(self, request_data):
+        """Store a new pending request and return its uuid."""
+        request_uuid = str(uuid.uuid4())
+        with self.lock:
+            self.requests[request_uuid] = {
+                'uuid': request_uuid,
+                'status': 'pending',
+                'request': request_data,
+            }
+            self.request_times[request_uuid] = time.monotonic()
+        return request_uuid
+
+    def add_result(self, result_data):
+        """Store the result of a pending request and return its uuid.
+
+        Raises a `KeyError` if the request is unknown or already resolved.
+        """
+        request_uuid = result_data['request_uuid']
+        with self.lock:
+            request_object = self.requests.get(request_uuid)
+            if request_object is None or request_object['status'] != 'pending':
+                raise KeyError(request_uuid)
+            request_object['status'] = 'resolved'
+            self.results[request_uuid] = result_data
+            self.result_times[request_uuid] = time.monotonic()
+        return str(uuid.uuid4())
+
+    def get_pending(self, quantity=None, method=None):
+        """Return the pending requests, optionally filtered."""
+        pending = []
+        with self.lock:
+            for request_object in self.requests.values():
+                request_data = request_object['request']
+                if request_object['status'] != 'pending':
+                    continue
+                if quantity is not None and request_data[
+                        'quantity'] != quantity:
+                    continue
+                if method is not None and method not in request_data['methods']:
+                    continue
+                pending.append(request_object)
+        return pending
+
+    def seed_requests(self, num_requests, seed=None):
+        """Add `num_requests` random conductivity requests.
+
+        Returns the list of their uuids; the same `seed` always generates the
+        same parameters.
+        """
+        rng = random.Random(seed)
+        return [
+            self.add_request(create_random_request(rng))
+            for _ in range(num_requests)
+        ]
+
+
+class StandinServer:
+    """Serve a `StandinState` over HTTP in a background thread.
+
+    Every call is delayed by `latency` seconds plus a random jitter of up to
+    `jitter` seconds, and fails with a 503 status with probability
+    `error_rate` (the random choices are reproducible with `seed`).
+    """
+
+    def __init__(self,
+                 host='127.0.0.1',
+                 port=0,
+                 state=None,
+                 latency=0.0,
+                 jitter=0.0,
+                 error_rate=0.0,
+                 seed=None):
+        """Initialize internal variables (port 0 picks a free one)."""
+        self.state = state if state is not None else StandinState()
+        handler_class = type(
+            'BoundStandinHandler', (StandinHandler, ), {
+                'state': self.state,
+                'latency': latency,
+                'jitter': jitter,
+                'error_rate': error_rate,
+                'rng': random.Random(seed),
+                'rng_lock': threading.Lock(),
+            })
+        self._server = ThreadingHTTPServer((host, port), handler_class)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def server_address(self):
+        """Return the host and port the server listens on."""
+        return self._server.server_address
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='finales-standin',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self):
+        """Serve in the current thread (blocks the terminal)."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def __enter__(self):
+        """Start the server when entering the context."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the server when leaving the context."""
+        self.stop()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Reply to the calls of the client as a FINALES server would."""
+
+    protocol_version = 'HTTP/1.1'
+    # The headers and body are sent separately; without this, every reply
+    # over a kept-alive connection waits for the delayed ACK of the client.
+    disable_nagle_algorithm = True
+    state = None
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    rng = None
+    rng_lock = None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Dispatch the GET endpoints."""
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if not self._check_call():
+            return
+
+        if url.path == '/capabilities/':
+            self._reply(200, self.state.capabilities)
+        elif url.path == '/pending_requests/':
+            pending = self.state.get_pending(query.get('quantity'),
+                                             query.get('method'))
+            offset = int(query.get('offset', 0))
+            limit = query.get('limit')
+            end = None if limit is None else offset + int(limit)
+            self._reply(200, pending[offset:end])
+        elif url.path.startswith('/requests/'):
+            request_uuid = url.path[len('/requests/'):].strip('/')
+            request_object = self.state.requests.get(request_uuid)
+            if request_object is None:
+                self._reply(404, {'detail': 'Request not found'})
+            else:
+                self._reply(200, request_object)
+        else:
+            self._reply(404, {'detail': 'Not Found'})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Dispatch the POST endpoints."""
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if url.path == '/user_management/authenticate/':
+            self._authenticate(parse_qs(body.decode()))
+            return
+        if not self._check_call():
+            return
+
+        if url.path == '/requests/':
+            request_data = self._validate(RequestModel, body)
+            if request_data is not None:
+                self._reply(200, self.state.add_request(request_data))
+        elif url.path == '/results/':
+            result_data = self._validate(ResultModel, body)
+            if result_data is None:
+                return
+            try:
+                self._reply(200, self.state.add_result(result_data))
+            except KeyError:
+                self._reply(404, {'detail': 'No pending request found'})
+        else:
+            self._reply(404, {'detail': 'Not Found'})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log every call."""
+
+    def _authenticate(self, form_data):
+        """Reply with a token if the credentials are right."""
+        username = form_data.get('username', [None])[0]
+        password = form_data.get('password', [None])[0]
+        if self.state.users and self.state.users.get(username) != password:
+            self._reply(401, {'detail': 'Incorrect username or password'})
+            return
+        token = Token(access_token=str(uuid.uuid4()), token_type='bearer')
+        self.state.tokens.add(token.access_token)
+        self._reply(200, token.model_dump())
+
+    def _check_call(self):
+        """Simulate the latency and errors, and check the authentication.
+
+        Returns whether the call should go on (otherwise a reply was sent).
+        """
+        with self.rng_lock:
+            delay = self.latency + self.rng.uniform(0.0, self.jitter)
+            fail = self.rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._reply(503, {'detail': 'Injected error'})
+            return False
+
+        if self.state.users:
+            authorization = self.headers.get('Authorization', '')
+            token = authorization.partition(' ')[2]
+            if token not in self.state.tokens:
+                self._reply(401, {'detail': 'Not authenticated'})
+                return False
+        return True
+
+    def _validate(self, model_class, body):
+        """Return the validated data (or reply with a 422 and `None`)."""
+        try:
+            return model_class.model_validate_json(body).model_dump()
+        except ValidationError as exception:
+            self._reply(422, {'detail': json.loads(exception.json())})
+            return None
+
+    def _reply(self, status, data):
+        """Send the data as JSON."""
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_random_request(rng):
+    """Create a conductivity request with random parameters.
+
+    The parameters are within the range of validity of the conductivity
+    estimator, so every request can be answered.
+    """
+    conc_li = round(rng.uniform(0.05, 0.3), 3)
+    conc_ec = round(rng.uniform(0.0, 0.9 * (1.0 - conc_li)), 3)
+    return create_request(temp=round(rng.uniform(*TEMPERATURE_RANGE), 1),
+                          conc_li=conc_li,
+                          conc_ec=conc_ec,
+                          conc_pc=round(1.0 - conc_li - conc_ec, 3))
@@ -1,7 +1,8 @@
 """Module containing the tenant object."""
 
-from .main import AiidaTenant
+from .main import AiidaTenant, AiidaTenantConfig
 
 __all__ = [
     'AiidaTenant',
+    'AiidaTenantConfig',
 ]
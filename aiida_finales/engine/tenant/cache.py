@@ -0,0 +1,138 @@
+"""Content-addressed cache of the results computed by the tenant."""
+import hashlib
+import json
+import time
+
+from .storage import SqliteStore
+
+
+class ResultCache(SqliteStore):
+    """Persistent cache of results keyed by the normalized request parameters.
+
+    Requests asking for the same quantity, method, formulation and temperature
+    share a key, so their result can be reused without running a new process.
+    Entries older than `ttl` seconds are discarded when accessed, and once
+    there are more than `max_entries` the least recently used are evicted.
+    A `max_entries` of zero disables the cache.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+    """
+
+    def __init__(self,
+                 filepath=None,
+                 max_entries=10000,
+                 ttl=None,
+                 precision=6,
+                 clock=time.time):
+        """Initialize internal variables."""
+        super().__init__(filepath)
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._precision = precision
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        """Return whether the cache stores any results."""
+        return self._max_entries > 0
+
+    def get_key(self, request_data, method):
+        """Return the cache key for the request and method."""
+        method_params = request_data['request']['parameters'][method]
+        normalized = normalize_parameters(method_params, self._precision)
+        normalized['quantity'] = request_data['request']['quantity']
+        normalized['method'] = method
+        serialized = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def lookup(self, request_data, method):
+        """Return the cached result for the request, or `None` if missing."""
+        if not self.enabled:
+            return None
+
+        key = self.get_key(request_data, method)
+        now = self._clock()
+        rows = self._execute(
+            'SELECT result, created_at FROM results WHERE key = ?', (key, ))
+
+        if rows and self._ttl is not None and rows[0][1] + self._ttl < now:
+            self._execute('DELETE FROM results WHERE key = ?', (key, ))
+            rows = []
+
+        if not rows:
+            self.misses += 1
+            return None
+
+        self._execute('UPDATE results SET last_used = ? WHERE key = ?',
+                      (now, key))
+        self.hits += 1
+        return json.loads(rows[0][0])
+
+    def store(self, request_data, method, result_data):
+        """Store the result for the request."""
+        if not self.enabled:
+            return
+
+        key = self.get_key(request_data, method)
+        now = self._clock()
+        self._execute(
+            'INSERT OR REPLACE INTO results (key, result, created_at, last_used) '
+            'VALUES (?, ?, ?, ?)', (key, json.dumps(result_data), now, now))
+        self._evict()
+
+    def get_stats(self):
+        """Return the hits, misses, hit rate and size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self),
+        }
+
+    def __len__(self):
+        """Return the number of results in the cache."""
+        return self._execute('SELECT COUNT(*) FROM results')[0][0]
+
+    def _evict(self):
+        """Remove the expired and least recently used entries."""
+        if self._ttl is not None:
+            self._execute('DELETE FROM results WHERE created_at < ?',
+                          (self._clock() - self._ttl, ))
+
+        excess = len(self) - self._max_entries
+        if excess > 0:
+            self._execute(
+                'DELETE FROM results WHERE key IN '
+                '(SELECT key FROM results ORDER BY last_used ASC LIMIT ?)',
+                (excess, ))
+
+
+def normalize_parameters(method_params, precision=6):
+    """Return the parameters of a method in a canonical form.
+
+    The components of the formulation are sorted by InChIKey and the fractions
+    and temperature rounded to `precision` decimals, so that equivalent
+    requests are normalized to the same data.
+    """
+    formulation = sorted((component['chemical']['InChIKey'],
+                          round(float(component['fraction']), precision),
+                          component.get('fraction_type', ''))
+                         for component in method_params.get('formulation', []))
+    temperature = method_params.get('temperature')
+    if temperature is not None:
+        temperature = round(float(temperature), precision)
+    return {
+        'formulation': [list(component) for component in formulation],
+        'temperature': temperature,
+    }
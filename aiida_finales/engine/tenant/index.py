@@ -0,0 +1,169 @@
+"""Incremental index of the workflows submitted by the tenant."""
+import datetime
+
+from aiida import orm
+
+from aiida_finales.utils.request_labels import get_request_uuids
+
+# Margin when querying for modified nodes: a node can be committed a little
+# after its `mtime` was set, so the window overlaps with the previous poll.
+MTIME_OVERLAP = datetime.timedelta(seconds=10)
+
+# Process states of the processes that take up a slot of the daemon.
+ACTIVE_STATES = ('created', 'waiting', 'running')
+
+
+class ProcessIndex:
+    """In-memory index from `request_uuid` to the workflows that handle it.
+
+    Workflows handling a single request are labelled with its uuid, batch
+    workflows list the uuids of their requests in the description (see
+    `aiida_finales.utils.request_labels`); both are set on creation. The
+    extras used to tag the workflows of earlier versions are read as a
+    fallback.
+
+    The first `refresh` loads the whole history of the relevant process types;
+    subsequent ones only query the nodes that were modified since the previous
+    poll, so the cost of each refresh is proportional to the activity in the
+    database instead of its size. Only the columns needed to classify the
+    processes are projected (no ORM objects are loaded).
+
+    If a `group` is given, only its members are considered, so the index
+    ignores the workflows of other tenants or users in the same profile.
+    """
+
+    def __init__(self, process_types, group=None, mtime_overlap=MTIME_OVERLAP):
+        """Initialize internal variables."""
+        self._process_types = list(process_types)
+        self._group = group
+        self._mtime_overlap = mtime_overlap
+        self._last_mtime = None
+        self._node_entries = {}
+        self._active_pks = set()
+        self._submitted_requests = {
+            'ongoing': {},
+            'finished': {},
+            'excepted': {},
+        }
+
+    @property
+    def submitted_requests(self):
+        """Return the pks of the workflows per state and `request_uuid`.
+
+        The `ongoing` and `finished` states map each request to a single pk,
+        the `excepted` state maps it to a list of pks.
+        """
+        return self._submitted_requests
+
+    def __len__(self):
+        """Return the number of workflows in the index."""
+        return len(self._node_entries)
+
+    @property
+    def num_active(self):
+        """Return the number of relevant processes that are still running."""
+        return len(self._active_pks)
+
+    def refresh(self):
+        """Update the index with the workflows modified since the last poll.
+
+        :return: number of workflows that were added or changed state.
+        """
+        filters = {'process_type': {'in': self._process_types}}
+        if self._last_mtime is not None:
+            filters['mtime'] = {'>=': self._last_mtime - self._mtime_overlap}
+
+        queryb = orm.QueryBuilder()
+        node_kwargs = {}
+        if self._group is not None:
+            queryb.append(orm.Group,
+                          filters={'id': self._group.pk},
+                          tag='group')
+            node_kwargs['with_group'] = 'group'
+        queryb.append(
+            orm.WorkflowNode,
+            filters=filters,
+            project=[
+                'id',
+                'label',
+                'description',
+                'extras.request_uuid',
+                'extras.request_uuids',
+                'attributes.process_state',
+                'attributes.exit_status',
+                'mtime',
+            ],
+            **node_kwargs,
+        )
+
+        num_updated = 0
+        for row in queryb.iterall():
+            (pk, label, description, extra_uuid, extra_uuids, process_state,
+             exit_status, mtime) = row
+            if self._last_mtime is None or mtime > self._last_mtime:
+                self._last_mtime = mtime
+            if process_state in ACTIVE_STATES:
+                self._active_pks.add(pk)
+            else:
+                self._active_pks.discard(pk)
+            request_uuids = get_request_uuids(label, description, extra_uuid,
+                                              extra_uuids)
+            if request_uuids is None:
+                continue  # Not submitted by the tenant
+            state = classify_process(process_state, exit_status)
+            if self._update_entry(pk, tuple(request_uuids), state):
+                num_updated += 1
+
+        return num_updated
+
+    def mark_excepted(self, request_uuid, pk):
+        """Classify a request of a finished workflow as excepted.
+
+        A batch workflow can finish successfully while listing some of its
+        requests under `errors`; those requests have no result to report.
+        """
+        if self._submitted_requests['finished'].get(request_uuid) != pk:
+            return
+        del self._submitted_requests['finished'][request_uuid]
+        self._submitted_requests['excepted'].setdefault(request_uuid,
+                                                        []).append(pk)
+
+    def _update_entry(self, pk, request_uuids, state):
+        """Move the workflow to the given state; return whether it changed."""
+        old_entry = self._node_entries.get(pk)
+        if old_entry == (request_uuids, state):
+            return False
+
+        if old_entry is not None:
+            old_uuids, old_state = old_entry
+            for old_uuid in old_uuids:
+                self._remove_request(pk, old_uuid, old_state)
+
+        for request_uuid in request_uuids:
+            if state == 'excepted':
+                self._submitted_requests['excepted'].setdefault(
+                    request_uuid, []).append(pk)
+            else:
+                self._submitted_requests[state][request_uuid] = pk
+
+        self._node_entries[pk] = (request_uuids, state)
+        return True
+
+    def _remove_request(self, pk, request_uuid, state):
+        """Remove the workflow from the entry of the request."""
+        if state == 'excepted':
+            pk_list = self._submitted_requests['excepted'][request_uuid]
+            pk_list.remove(pk)
+            if not pk_list:
+                del self._submitted_requests['excepted'][request_uuid]
+        elif self._submitted_requests[state].get(request_uuid) == pk:
+            del self._submitted_requests[state][request_uuid]
+
+
+def classify_process(process_state, exit_status):
+    """Classify a process as `ongoing`, `finished` or `excepted`."""
+    if process_state == 'excepted':
+        return 'excepted'
+    if process_state == 'finished':
+        return 'finished' if exit_status == 0 else 'excepted'
+    return 'ongoing'
@@ -0,0 +1,60 @@
+"""Metrics of the tenant and helpers to time the phases of its cycle."""
+import collections
+import contextlib
+import time
+
+from ..metrics import REGISTRY
+
+PHASE_SECONDS = REGISTRY.histogram(
+    'aiida_finales_tenant_phase_seconds',
+    'Time spent in each phase of a cycle of the tenant.', ('phase', ))
+CYCLE_SECONDS = REGISTRY.histogram('aiida_finales_tenant_cycle_seconds',
+                                   'Duration of the cycles of the tenant.')
+REQUESTS_TOTAL = REGISTRY.counter(
+    'aiida_finales_tenant_requests_total',
+    'Requests handled by the tenant, by outcome.', ('outcome', ))
+CYCLE_REQUESTS = REGISTRY.gauge(
+    'aiida_finales_tenant_cycle_requests',
+    'Requests handled in the last cycle of the tenant, by outcome.',
+    ('outcome', ))
+ACTIVE_PROCESSES = REGISTRY.gauge(
+    'aiida_finales_tenant_active_processes',
+    'Processes of the tenant that are created, waiting or running.')
+QUEUE_DEPTH = REGISTRY.gauge('aiida_finales_tenant_queue_depth',
+                             'Items waiting in the queues of the tenant.',
+                             ('queue', ))
+ERRORS_TOTAL = REGISTRY.counter('aiida_finales_tenant_errors_total',
+                                'Errors in the stages of the tenant.',
+                                ('stage', ))
+
+
+class PhaseTimer:
+    """Accumulate the time spent in each phase of a cycle."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.durations = collections.defaultdict(float)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Add the seconds spent in the context to the phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[name] += time.monotonic() - start
+
+    def iter_timed(self, name, iterable):
+        """Iterate, adding the time spent waiting for each item to the phase."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    def observe(self):
+        """Record the duration of every phase in the histogram."""
+        for name, duration in self.durations.items():
+            PHASE_SECONDS.observe(duration, phase=name)
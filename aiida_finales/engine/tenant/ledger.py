@@ -0,0 +1,64 @@
+"""Ledger of the results that the tenant has already reported."""
+import json
+import time
+
+from .storage import SqliteStore
+
+
+class ReportLedger(SqliteStore):
+    """Persistent record of the requests whose results were posted.
+
+    The uuids of the reported requests are also kept in memory, so checking
+    whether a request was already reported takes constant time. When backed
+    by a file, the ledger survives restarts of the tenant.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reported (
+            request_uuid TEXT PRIMARY KEY,
+            server_reply TEXT,
+            reported_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, filepath=None, clock=time.time):
+        """Initialize internal variables."""
+        super().__init__(filepath)
+        self._clock = clock
+        self._reported_uuids = {
+            row[0]
+            for row in self._execute('SELECT request_uuid FROM reported')
+        }
+
+    def __contains__(self, request_uuid):
+        """Return whether the result of the request was already reported."""
+        return request_uuid in self._reported_uuids
+
+    def __len__(self):
+        """Return the number of requests reported."""
+        return len(self._reported_uuids)
+
+    def record(self, request_uuid, server_reply):
+        """Record that the result of the request was posted."""
+        self.record_many([(request_uuid, server_reply)])
+
+    def record_many(self, replies):
+        """Record many `(request_uuid, server_reply)` pairs at once."""
+        now = self._clock()
+        self._executemany(
+            'INSERT OR REPLACE INTO reported (request_uuid, server_reply, reported_at) '
+            'VALUES (?, ?, ?)',
+            [(request_uuid, json.dumps(server_reply), now)
+             for request_uuid, server_reply in replies],
+        )
+        self._reported_uuids.update(request_uuid
+                                    for request_uuid, _ in replies)
+
+    def get_reply(self, request_uuid):
+        """Return the reply of the server when the result was posted."""
+        rows = self._execute(
+            'SELECT server_reply FROM reported WHERE request_uuid = ?',
+            (request_uuid, ))
+        if not rows:
+            raise KeyError(request_uuid)
+        return json.loads(rows[0][0])
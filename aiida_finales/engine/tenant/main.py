@@ -1,19 +1,56 @@
 """Main client."""
+import collections
+import logging
+import os
 import time
+from typing import Optional
 import uuid
 
+from pydantic import BaseModel
+import yaml
+
 from aiida import orm
-from aiida.engine import submit
 
-from aiida_finales.workflows import ConductivityEstimationWorkchain
+from aiida_finales.calculations import conductivity_estimation_batch
+from aiida_finales.engine.client import AsyncFinalesClient
+from aiida_finales.engine.logs import SampledLogger
+from aiida_finales.engine.metrics import REGISTRY, MetricsServer
+from aiida_finales.workflows import ConductivityEstimationBatchWorkchain, ConductivityEstimationWorkchain
+
+from . import instrumentation
+from .cache import ResultCache
+from .index import ProcessIndex
+from .ledger import ReportLedger
+from .outbox import OutboxFlusher, ResultOutbox
+from .pipeline import RequestPoller, iter_chunks
+from .polling import POLLING_POLICIES, AdaptivePolling
+from .sharding import RequestSharding
+from .submission import SubmissionQueue, get_daemon_capacity
+
+LOGGER = logging.getLogger(__name__)
+
+CYCLE_HISTORY_SIZE = 100
+TENANT_GROUP_PREFIX = 'aiida_finales/tenant/'
+
+# Label of the calculations evaluating requests inline; the uuids of their
+# requests are listed in the description, one per line.
+INLINE_LABEL = 'finales-inline'
+
+# Seconds without inline evaluations after one fails, doubling with every
+# consecutive failure up to the maximum.
+INLINE_BACKOFF_BASE = 10.0
+INLINE_BACKOFF_MAX = 600.0
 
 TENANT_CAPABILITIES = {
     'conductivity': {
         'molecular_dynamics': {
-            'class':
-            ConductivityEstimationWorkchain,
+            'class': ConductivityEstimationWorkchain,
             'process_type':
             'aiida_finales.workflows.conductivity_estimation.ConductivityEstimationWorkchain',
+            'batch_class': ConductivityEstimationBatchWorkchain,
+            'batch_process_type':
+            'aiida_finales.workflows.conductivity_estimation.ConductivityEstimationBatchWorkchain',
+            'inline_function': conductivity_estimation_batch,
         }
     },
 }
@@ -22,100 +59,446 @@ TENANT_CAPABILITIES = {
 class AiidaTenant:
     """Main tenant class."""
 
-    def __init__(self, finales_client, tenant_uuid=None):
-        """Initialize the tenant."""
+    def __init__(self,
+                 finales_client,
+                 tenant_uuid=None,
+                 polling_policy=None,
+                 batch_size=0,
+                 result_cache=None,
+                 page_size=None,
+                 report_ledger=None,
+                 result_outbox=None,
+                 flush_batch_size=50,
+                 flush_interval=1.0,
+                 max_ongoing_processes=None,
+                 submit_batch_size=None,
+                 sharding=None,
+                 pipelined=True,
+                 metrics_port=None,
+                 metrics_host='127.0.0.1',
+                 metrics_file=None,
+                 log_sample_rate=1.0,
+                 conductivity_grid_file=None,
+                 inline=False):
+        """Initialize the tenant.
+
+        The options are described in `AiidaTenantConfig` and the README.
+        """
         self._client = finales_client
+        self._async_client = AsyncFinalesClient.from_client(finales_client)
         self._tenant_uuid = tenant_uuid
+        self._group = None
         if self._tenant_uuid is None:
             self._tenant_uuid = str(uuid.uuid4())
+        else:
+            self._group = get_tenant_group(self._tenant_uuid)
+        self._process_index = ProcessIndex(get_relevant_process_types(),
+                                           group=self._group)
+        self._polling_policy = polling_policy
+        if self._polling_policy is None:
+            self._polling_policy = AdaptivePolling()
+        self._cycle_history = collections.deque(maxlen=CYCLE_HISTORY_SIZE)
+        self._batch_size = batch_size
+        self._result_cache = result_cache
+        if self._result_cache is None:
+            self._result_cache = ResultCache()
+        self._page_size = page_size
+        self._report_ledger = report_ledger
+        if self._report_ledger is None:
+            self._report_ledger = ReportLedger()
+        self._result_outbox = result_outbox
+        if self._result_outbox is None:
+            self._result_outbox = ResultOutbox()
+        self._outbox_flusher = OutboxFlusher(
+            self._result_outbox,
+            self._async_client,
+            self._report_ledger,
+            batch_size=flush_batch_size,
+            interval=flush_interval,
+        )
+        if max_ongoing_processes is None:
+            max_ongoing_processes = get_daemon_capacity()
+        self._submission_queue = SubmissionQueue(max_ongoing_processes,
+                                                 batch_size=submit_batch_size,
+                                                 group=self._group)
+        self._sharding = sharding
+        if self._sharding is None:
+            self._sharding = RequestSharding()
+        self._chunk_size = self._page_size if self._page_size else 100
+        self._request_poller = None
+        if pipelined:
+            self._request_poller = RequestPoller(self.iter_pending_requests,
+                                                 chunk_size=self._chunk_size)
+        self._metrics_port = metrics_port
+        self._metrics_host = metrics_host
+        self._metrics_file = metrics_file
+        self._request_logger = SampledLogger(LOGGER, log_sample_rate)
+        self._inline = inline
+        self._inline_failures = 0
+        self._inline_resume_time = 0.0
+        self._conductivity_grid_file = None
+        if conductivity_grid_file is not None:
+            # The daemon workers don't share the working directory
+            self._conductivity_grid_file = os.path.abspath(
+                conductivity_grid_file)
 
     def start(self):
-        """Start up the client (blocks the terminal)."""
-        while True:
-
-            print(' > Waiting to start the next loop...')
-            time.sleep(3)
-
-            print(' > Querying AiiDA processes...')
-            requests_submitted = self.query_requests_submitted()
+        """Start up the client (blocks the terminal).
+
+        The results are posted and, if pipelined, the pending requests are
+        fetched in background threads; the processes are queried and
+        submitted in the main thread, which owns the AiiDA storage session.
+        """
+        metrics_server = None
+        if self._metrics_port is not None:
+            metrics_server = MetricsServer(REGISTRY, self._metrics_host,
+                                           self._metrics_port)
+            metrics_server.start()
+        self._outbox_flusher.start()
+        if self._request_poller is not None:
+            self._request_poller.start()
+        try:
+            while True:
+                try:
+                    cycle_record = self.run_cycle()
+                except Exception:
+                    instrumentation.ERRORS_TOTAL.inc(stage='cycle')
+                    raise
+                if self._metrics_file is not None:
+                    REGISTRY.dump_json(self._metrics_file)
+                sleep_time = self._polling_policy.next_interval(cycle_record)
+                cycle_record['sleep_time'] = sleep_time
+                self._log_cycle(cycle_record)
+                time.sleep(sleep_time)
+        finally:
+            if self._request_poller is not None:
+                self._request_poller.stop()
+            self._outbox_flusher.stop()
+            if metrics_server is not None:
+                metrics_server.stop()
+
+    def run_cycle(self):
+        """Run a single cycle of the tenant and return a record of it.
+
+        The pending requests are handled in chunks as they arrive: the
+        results of each chunk are queued to be reported and its processes
+        are submitted before the next chunk is consumed. The record is also
+        appended to the `cycle_history`, and the time spent in each phase is
+        recorded in `phase_durations`.
+        """
+        cycle_start = time.monotonic()
+        timer = instrumentation.PhaseTimer()
+        cycle_record = {
+            'start_time': time.time(),
+            'num_pending': 0,
+            'num_submitted': 0,
+            'num_reported': 0,
+            'num_updated': 0,
+            'num_ongoing': 0,
+            'num_queued': 0,
+            'num_cache_hits': 0,
+            'num_inline': 0,
+            'num_already_reported': 0,
+            'num_not_owned': 0,
+            'num_excepted': 0,
+            'fetch_wait': 0.0,
+        }
 
-            print(' > Looking for requests in the server...')
-            pending_requests = self._client.get_pending_requests()
-            print(f' >>> Received {len(pending_requests)} requests!')
+        poller = self._request_poller
+        if poller is not None and poller.running:
+            poller.request_poll()
+            pending_chunks = poller.iter_poll_chunks()
+        else:
+            pending_chunks = iter_chunks(self.iter_pending_requests(),
+                                         self._chunk_size)
+        pending_chunks = timer.iter_timed('get_pending_requests',
+                                          pending_chunks)
+
+        with timer.phase('query_requests_submitted'):
+            cycle_record['num_updated'] = self._process_index.refresh()
+        requests_submitted = self._process_index.submitted_requests
+
+        batchable_requests = []
+        submitted = []
+        for chunk in pending_chunks:
+            sorted_requests = self._sort_requests(chunk, requests_submitted,
+                                                  cycle_record, timer)
+            # Only full batches are prepared until the last chunk arrives
+            batchable_requests.extend(sorted_requests['batchable'])
+            num_batched = 0
+            if self._batch_size > 1:
+                num_batched = len(batchable_requests) - len(
+                    batchable_requests) % self._batch_size
+            sorted_requests['batchable'] = batchable_requests[:num_batched]
+            batchable_requests = batchable_requests[num_batched:]
+            submitted.extend(
+                self._dispatch_requests(sorted_requests, cycle_record, timer,
+                                        len(submitted)))
+
+        if batchable_requests:
+            sorted_requests = {'batchable': batchable_requests}
+            submitted.extend(
+                self._dispatch_requests(sorted_requests, cycle_record, timer,
+                                        len(submitted)))
+
+        cycle_record['fetch_wait'] = timer.durations['get_pending_requests']
+        cycle_record['num_submitted'] = sum(
+            len(request_ids) for request_ids, _ in submitted)
+        cycle_record['num_queued'] = self._submission_queue.num_requests
+        cycle_record['num_ongoing'] = len(requests_submitted['ongoing'])
+        cycle_record['duration'] = time.monotonic() - cycle_start
+        cycle_record['phase_durations'] = dict(timer.durations)
+        self._cycle_history.append(cycle_record)
+        self._record_metrics(cycle_record, timer)
+        return cycle_record
+
+    def _sort_requests(self, requests_data, requests_submitted, cycle_record,
+                       timer):
+        """Sort a chunk of pending requests by how they should be handled.
+
+        Returns a dictionary with the `finished` pairs of `(request_data,
+        workflow_node)`, the `cached` pairs of `(request_data, result_data)`,
+        the requests to evaluate `inline`, the `batchable` requests and the
+        `outstanding` submissions per request uuid. The requests that are
+        skipped are counted in the `cycle_record`.
+        """
+        sorted_requests = {
+            'finished': [],
+            'cached': [],
+            'inline': [],
+            'batchable': [],
+            'outstanding': {},
+        }
+        inline = self._inline and time.monotonic() >= self._inline_resume_time
+        for request_data in requests_data:
 
-            print(' > Updating finished requests...')
-            outstanding_requests = {}
-            for request_data in pending_requests:
+            cycle_record['num_pending'] += 1
+            request_id = request_data['uuid']
 
-                request_id = request_data['uuid']
+            if not self._sharding.owns(request_id):
+                cycle_record['num_not_owned'] += 1
+                continue
 
-                if request_id in requests_submitted['excepted']:
-                    workflow_node = requests_submitted['excepted'][request_id]
-                    print(
-                        f' >>> Request {request_id} had a problem in workflow {workflow_node.pk}'
-                    )
-                    continue
+            if self.is_reported(request_id):
+                cycle_record['num_already_reported'] += 1
+                continue
 
-                if request_id in requests_submitted['ongoing']:
-                    workflow_node = requests_submitted['ongoing'][request_id]
-                    print(
-                        f' >>> Request {request_id} already in process by workflow {workflow_node.pk}'
-                    )
-                    continue
+            if request_id in requests_submitted['excepted']:
+                cycle_record['num_excepted'] += 1
+                self._request_logger.debug(
+                    'Request had a problem in its workflows',
+                    extra={
+                        'request_uuid': request_id,
+                        'workflow_pks':
+                        requests_submitted['excepted'][request_id],
+                    })
+                continue
 
-                if request_id in requests_submitted['finished']:
-                    workflow_node = requests_submitted['finished'][request_id]
-                    print(
-                        f' >>> Reporting back workflow {workflow_node.pk} for request {request_id}'
-                    )
-                    self.submit_results(request_data, workflow_node)
-                    continue
+            if request_id in requests_submitted['ongoing']:
+                self._request_logger.debug(
+                    'Request already in process',
+                    extra={
+                        'request_uuid': request_id,
+                        'workflow_pk':
+                        requests_submitted['ongoing'][request_id],
+                    })
+                continue
 
-                prepared_submission = self.prepare_submission(request_data)
-                if prepared_submission is not None:
-                    outstanding_requests[request_id] = prepared_submission
+            if request_id in self._submission_queue:
+                continue
 
-            print(' > Launching new requests...')
-            for request_id, request_process in outstanding_requests.items():
-                print(f' >>> Launching processs for request {request_id}')
-                process_node = submit(request_process)
-                process_node.base.extras.set('request_uuid', request_id)
+            if request_id in requests_submitted['finished']:
+                workflow_pk = requests_submitted['finished'][request_id]
+                self._request_logger.debug('Reporting back workflow',
+                                           extra={
+                                               'request_uuid': request_id,
+                                               'workflow_pk': workflow_pk,
+                                           })
+                workflow_node = orm.load_node(workflow_pk)
+                sorted_requests['finished'].append(
+                    (request_data, workflow_node))
+                continue
 
-    def query_requests_submitted(self):
-        """Get all processes that have already been submitted."""
-        relevant_types = []
-        for key_q, methods in TENANT_CAPABILITIES.items():
-            for key_m, data in methods.items():
-                relevant_types.append(data['process_type'])
-
-        queryb = orm.QueryBuilder()
-        queryb.append(orm.WorkflowNode,
-                      filters={'process_type': {
-                          'in': relevant_types
-                      }})
-
-        submitted_requests = {
-            'ongoing': {},
-            'finished': {},
-            'excepted': {},
-        }
-        for workflow_node in queryb.all(flat=True):
+            cached_result = self.lookup_cached_result(request_data)
+            if cached_result is not None:
+                self._request_logger.debug('Reusing cached result',
+                                           extra={'request_uuid': request_id})
+                sorted_requests['cached'].append((request_data, cached_result))
+                cycle_record['num_cache_hits'] += 1
+                continue
 
-            request_id = workflow_node.extras['request_uuid']
+            if inline and can_inline(request_data):
+                sorted_requests['inline'].append(request_data)
+                continue
 
-            if workflow_node.is_finished_ok:
-                submitted_requests['finished'][request_id] = workflow_node
+            if self._batch_size > 1 and can_batch(request_data):
+                sorted_requests['batchable'].append(request_data)
+                continue
 
-            elif workflow_node.is_excepted or workflow_node.is_failed:
-                if request_id not in submitted_requests['excepted']:
-                    submitted_requests['excepted'][request_id] = []
-                submitted_requests['excepted'][request_id].append(
-                    workflow_node)
+            with timer.phase('prepare_submission'):
+                prepared_submission = self.prepare_submission(request_data)
+            if prepared_submission is not None:
+                sorted_requests['outstanding'][
+                    request_id] = prepared_submission
+
+        return sorted_requests
+
+    def _dispatch_requests(self, sorted_requests, cycle_record, timer,
+                           num_submitted):
+        """Report the results of sorted requests and submit their processes.
+
+        The `sorted_requests` are as returned by `_sort_requests` (missing
+        keys are taken as empty); `num_submitted` is the number of processes
+        already submitted in the cycle, which don't appear in the index yet.
+        Returns the list of `(request_uuids, process_node)` submitted.
+        """
+        inline_requests = sorted_requests.get('inline', [])
+        with timer.phase('evaluate_inline'):
+            inline_results = self.evaluate_inline(inline_requests)
+
+        # The requests without an inline result go through the workflows
+        batchable_requests = list(sorted_requests.get('batchable', []))
+        outstanding_requests = dict(sorted_requests.get('outstanding', {}))
+        inline_uuids = {
+            request_data['uuid']
+            for request_data, _ in inline_results
+        }
+        with timer.phase('prepare_submission'):
+            for request_data in inline_requests:
+                if request_data['uuid'] in inline_uuids:
+                    continue
+                if self._batch_size > 1 and can_batch(request_data):
+                    batchable_requests.append(request_data)
+                    continue
+                prepared_submission = self.prepare_submission(request_data)
+                if prepared_submission is not None:
+                    outstanding_requests[
+                        request_data['uuid']] = prepared_submission
+            outstanding_batches = self.prepare_batch_submissions(
+                batchable_requests)
+
+        request_results = list(sorted_requests.get('cached', []))
+        request_results.extend(inline_results)
+        with timer.phase('submit_results'):
+            finished_requests = sorted_requests.get('finished', [])
+            collected_results = self.collect_results(finished_requests)
+            cycle_record['num_excepted'] += (len(finished_requests) -
+                                             len(collected_results))
+            request_results.extend(collected_results)
+            if request_results:
+                self.report_results(request_results)
+        cycle_record['num_inline'] += len(inline_results)
+        cycle_record['num_reported'] += len(request_results)
+
+        for request_id, request_process in outstanding_requests.items():
+            self._submission_queue.put([request_id], request_process)
+        for request_ids, batch_process in outstanding_batches:
+            self._submission_queue.put(request_ids, batch_process)
+
+        num_active = self._process_index.num_active
+        with timer.phase('submit'):
+            submitted = self._submission_queue.submit_available(
+                num_active, num_submitted)
+        for request_ids, process_node in submitted:
+            self._request_logger.debug('Launched process',
+                                       extra={
+                                           'workflow_pk': process_node.pk,
+                                           'num_requests': len(request_ids),
+                                       })
+        return submitted
+
+    def _log_cycle(self, cycle_record):
+        """Log the summary of a cycle in a single message."""
+        cache_stats = self._result_cache.get_stats()
+        outbox_stats = self._outbox_flusher.get_stats()
+        LOGGER.info(
+            'Cycle took %.3fs: %d pending, %d submitted, %d reported; '
+            'waiting %.1fs for the next one',
+            cycle_record['duration'],
+            cycle_record['num_pending'],
+            cycle_record['num_submitted'],
+            cycle_record['num_reported'],
+            cycle_record['sleep_time'],
+            extra={
+                'num_ongoing':
+                cycle_record['num_ongoing'],
+                'num_excepted':
+                cycle_record['num_excepted'],
+                'num_queued':
+                cycle_record['num_queued'],
+                'num_cache_hits':
+                cycle_record['num_cache_hits'],
+                'num_inline':
+                cycle_record['num_inline'],
+                'num_already_reported':
+                cycle_record['num_already_reported'],
+                'num_not_owned':
+                cycle_record['num_not_owned'],
+                'fetch_wait':
+                round(cycle_record['fetch_wait'], 3),
+                'cache_size':
+                cache_stats['size'],
+                'cache_hit_rate':
+                round(cache_stats['hit_rate'], 3),
+                'outbox_depth':
+                outbox_stats['depth'],
+                'last_flush_duration':
+                round(outbox_stats['last_flush_duration'], 3),
+            })
+
+    def _record_metrics(self, cycle_record, timer):
+        """Update the metrics with the record of a cycle."""
+        timer.observe()
+        instrumentation.CYCLE_SECONDS.observe(cycle_record['duration'])
+        outcomes = {
+            'seen': cycle_record['num_pending'],
+            'submitted': cycle_record['num_submitted'],
+            'reported': cycle_record['num_reported'],
+            'cache_hit': cycle_record['num_cache_hits'],
+            'inline': cycle_record['num_inline'],
+            'already_reported': cycle_record['num_already_reported'],
+        }
+        for outcome, count in outcomes.items():
+            instrumentation.REQUESTS_TOTAL.inc(count, outcome=outcome)
+            instrumentation.CYCLE_REQUESTS.set(count, outcome=outcome)
+        instrumentation.ACTIVE_PROCESSES.set(self._process_index.num_active)
+        instrumentation.QUEUE_DEPTH.set(cycle_record['num_queued'],
+                                        queue='submission')
+        instrumentation.QUEUE_DEPTH.set(len(self._result_outbox),
+                                        queue='outbox')
+
+    @property
+    def cycle_history(self):
+        """Return the records of the most recent cycles (oldest first)."""
+        return list(self._cycle_history)
+
+    def iter_pending_requests(self):
+        """Iterate over the pending requests the tenant can deal with.
+
+        The requests are filtered by the server for each quantity and method
+        in the capabilities of the tenant, and fetched page by page.
+        """
+        seen_uuids = set()
+        for quantity, methods in TENANT_CAPABILITIES.items():
+            for method in methods:
+                for request_data in self._client.iter_pending_requests(
+                        quantity=quantity,
+                        method=method,
+                        page_size=self._page_size):
+                    if request_data['uuid'] in seen_uuids:
+                        continue  # Requests can match several methods
+                    seen_uuids.add(request_data['uuid'])
+                    yield request_data
 
-            else:
-                submitted_requests['ongoing'][request_id] = workflow_node
+    def query_requests_submitted(self):
+        """Get all processes that have already been submitted.
 
-        return submitted_requests
+        Returns the pks of the workflows per state (`ongoing`, `finished` or
+        `excepted`) and `request_uuid`; the index is updated incrementally
+        with only the workflows that changed since the last call.
+        """
+        self._process_index.refresh()
+        return self._process_index.submitted_requests
 
     def prepare_submission(self, request_data):
         """Check if the tenant can deal with the request."""
@@ -132,20 +515,405 @@ class AiidaTenant:
 
             MethodClass = TENANT_CAPABILITIES[request_quantity][method_name][
                 'class']
-            builder = MethodClass.get_builder_from_inputs(request_data)
+            builder = MethodClass.get_builder_from_inputs(
+                request_data, grid_file=self._conductivity_grid_file)
 
             if builder is not None:
                 return builder
 
         return None
 
+    def prepare_batch_submissions(self, requests_data):
+        """Group the requests in batches and prepare their submissions.
+
+        Returns a list of `(request_uuids, builder)` pairs.
+        """
+        requests_per_class = {}
+        for request_data in requests_data:
+            _, capability = get_capability(request_data)
+            batch_class = capability['batch_class']
+            requests_per_class.setdefault(batch_class, []).append(request_data)
+
+        prepared_batches = []
+        for BatchClass, class_requests in requests_per_class.items():
+            for index in range(0, len(class_requests), self._batch_size):
+                batch_requests = class_requests[index:index + self._batch_size]
+                builder = BatchClass.get_builder_from_batch(
+                    batch_requests, grid_file=self._conductivity_grid_file)
+                if builder is None:
+                    continue
+                request_uuids = [
+                    request_data['uuid'] for request_data in
+                    builder.input_data.get_dict()['requests']
+                ]
+                prepared_batches.append((request_uuids, builder))
+
+        return prepared_batches
+
     def submit_results(self, request_data, workflow_node):
         """Submit the results to the server."""
+        self.submit_results_batch([(request_data, workflow_node)])
+
+    def submit_results_batch(self, finished_requests):
+        """Submit the results of many workflows to the server concurrently.
+
+        The `finished_requests` are `(request_data, workflow_node)` pairs.
+        """
+        self.report_results(self.collect_results(finished_requests))
+
+    def collect_results(self, finished_requests):
+        """Extract the results of the finished workflows.
+
+        The `finished_requests` are `(request_data, workflow_node)` pairs;
+        returns the list of `(request_data, result_data)` pairs, and stores
+        the results in the cache for future requests. The requests that a
+        batch workflow lists under its `errors` are classified as excepted in
+        the index, so they are not collected again.
+        """
+        request_results = []
+        output_cache = {}
+        for request_data, workflow_node in finished_requests:
+            if workflow_node.pk not in output_cache:
+                output_cache[workflow_node.pk] = (
+                    workflow_node.outputs.output_data.get_dict())
+            result_data = get_result_data(output_cache[workflow_node.pk],
+                                          request_data['uuid'])
+            if result_data is None:
+                error = output_cache[workflow_node.pk].get('errors', {}).get(
+                    request_data['uuid'])
+                LOGGER.warning('Workflow has no result for the request',
+                               extra={
+                                   'request_uuid': request_data['uuid'],
+                                   'workflow_pk': workflow_node.pk,
+                                   'error': error,
+                               })
+                self._process_index.mark_excepted(request_data['uuid'],
+                                                  workflow_node.pk)
+                continue
+            method_name, _ = get_capability(request_data)
+            self._result_cache.store(request_data, method_name, result_data)
+            request_results.append((request_data, result_data))
+        return request_results
+
+    def evaluate_inline(self, requests_data):
+        """Evaluate the requests in the tenant process, without workflows.
+
+        The requests of each capability are evaluated at once by its
+        `inline_function`, which records their provenance in a single
+        calculation node (added to the group of the tenant). Returns the list
+        of `(request_data, result_data)` pairs, and stores the results in the
+        cache; the requests without a result are left out.
+
+        If an evaluation raises, no more are attempted until a backoff period
+        has passed (doubling with every consecutive failure), so a broken
+        setup doesn't create a failed calculation every cycle.
+        """
+        requests_per_function = {}
+        for request_data in requests_data:
+            _, capability = get_capability(request_data)
+            requests_per_function.setdefault(capability['inline_function'],
+                                             []).append(request_data)
+
+        request_results = []
+        for function, function_requests in requests_per_function.items():
+            request_uuids = [
+                request_data['uuid'] for request_data in function_requests
+            ]
+            inputs = {
+                'input_node': orm.Dict(dict={'requests': function_requests}),
+                'metadata': {
+                    'label': INLINE_LABEL,
+                    'description': '\n'.join(request_uuids),
+                },
+            }
+            if self._conductivity_grid_file is not None:
+                inputs['grid_file'] = orm.Str(self._conductivity_grid_file)
+            try:
+                output_node, process_node = function.run_get_node(**inputs)
+            except Exception:  # pylint: disable=broad-except
+                instrumentation.ERRORS_TOTAL.inc(stage='inline')
+                delay = min(INLINE_BACKOFF_BASE * 2**self._inline_failures,
+                            INLINE_BACKOFF_MAX)
+                self._inline_failures += 1
+                self._inline_resume_time = time.monotonic() + delay
+                LOGGER.exception(
+                    'Inline evaluation failed, submitting workflows for %.0fs',
+                    delay,
+                    extra={'num_requests': len(request_uuids)})
+                break
+            self._inline_failures = 0
+            if self._group is not None:
+                self._group.add_nodes(process_node)
+
+            output_data = output_node.get_dict()
+            for request_data in function_requests:
+                request_uuid = request_data['uuid']
+                result_data = get_result_data(output_data, request_uuid)
+                if result_data is None:
+                    self._request_logger.debug('Request has no inline result',
+                                               extra={
+                                                   'request_uuid':
+                                                   request_uuid,
+                                                   'calculation_pk':
+                                                   process_node.pk,
+                                               })
+                    continue
+                method_name, _ = get_capability(request_data)
+                self._result_cache.store(request_data, method_name,
+                                         result_data)
+                request_results.append((request_data, result_data))
+        return request_results
+
+    def report_results(self, request_results):
+        """Queue the results in the outbox to be posted to the server.
+
+        The `request_results` are `(request_data, result_data)` pairs.
+        """
         from aiida_finales.utils.create_result import wrap_results
-        result_data = workflow_node.outputs.output_data.get_dict()
-        method = 'molecular_dynamics'  # This should be generalized...
-        wrapped_results = wrap_results(request_data, result_data, method,
-                                       self._tenant_uuid)
-        server_reply = self._client.post_result(
-            data=wrapped_results, request_id=request_data['uuid'])
-        print(server_reply)
+        results = []
+        for request_data, result_data in request_results:
+            method_name, _ = get_capability(request_data)
+            wrapped_results = wrap_results(request_data, result_data,
+                                           method_name, self._tenant_uuid)
+            results.append((request_data['uuid'], wrapped_results))
+        self._result_outbox.enqueue_many(results)
+
+    def is_reported(self, request_uuid):
+        """Return whether the result of the request was already reported.
+
+        Results waiting in the outbox count as reported as well.
+        """
+        return (request_uuid
+                in self._report_ledger) or (request_uuid
+                                            in self._result_outbox)
+
+    def lookup_cached_result(self, request_data):
+        """Return the cached result for the request (`None` if missing)."""
+        method_name, _ = get_capability(request_data)
+        if method_name is None:
+            return None
+        return self._result_cache.lookup(request_data, method_name)
+
+    @property
+    def group(self):
+        """Return the group of the workflows of the tenant (or `None`)."""
+        return self._group
+
+    @property
+    def request_poller(self):
+        """Return the stage fetching the requests (`None` if not pipelined)."""
+        return self._request_poller
+
+    @property
+    def result_cache(self):
+        """Return the cache of results."""
+        return self._result_cache
+
+    @property
+    def report_ledger(self):
+        """Return the ledger of reported results."""
+        return self._report_ledger
+
+    @property
+    def outbox_flusher(self):
+        """Return the flusher posting the results queued in the outbox."""
+        return self._outbox_flusher
+
+    @property
+    def submission_queue(self):
+        """Return the queue of processes waiting to be submitted."""
+        return self._submission_queue
+
+
+class AiidaTenantConfig(BaseModel):
+    """Configuration data for the AiiDA tenant."""
+
+    tenant_uuid: Optional[str] = None
+    polling: str = 'adaptive'
+    polling_interval: float = 3.0
+    polling_min_interval: float = 0.5
+    polling_max_interval: float = 60.0
+    polling_backoff_factor: float = 2.0
+    batch_size: int = 0
+    cache_file: Optional[str] = None
+    cache_max_entries: int = 10000
+    cache_ttl: Optional[float] = None
+    page_size: Optional[int] = None
+    ledger_file: Optional[str] = None
+    outbox_file: Optional[str] = None
+    flush_batch_size: int = 50
+    flush_interval: float = 1.0
+    max_ongoing_processes: Optional[int] = None
+    submit_batch_size: Optional[int] = None
+    instance_index: int = 0
+    instance_count: int = 1
+    pipelined: bool = True
+    metrics_port: Optional[int] = None
+    metrics_host: str = '127.0.0.1'
+    metrics_file: Optional[str] = None
+    log_level: str = 'INFO'
+    log_format: str = 'text'
+    log_sample_rate: float = 1.0
+    conductivity_grid_file: Optional[str] = None
+    inline: bool = False
+
+    @classmethod
+    def load_from_yaml_file(cls, filepath):
+        """Load the configuration from a yaml file."""
+        with open(filepath) as fileobj:
+            try:
+                tenant_config = yaml.load(fileobj, Loader=yaml.FullLoader)
+            except yaml.YAMLError as exc:
+                raise yaml.YAMLError(
+                    'Error while trying to read the yaml from tenant-config-file'
+                ) from exc
+
+        return AiidaTenantConfig(**(tenant_config or {}))
+
+    def create_polling_policy(self):
+        """Use the data to create the polling policy."""
+        if self.polling not in POLLING_POLICIES:
+            raise ValueError(f'Unknown polling policy `{self.polling}`, '
+                             f'options are: {list(POLLING_POLICIES)}')
+
+        if self.polling == 'fixed':
+            return POLLING_POLICIES['fixed'](interval=self.polling_interval)
+
+        return POLLING_POLICIES['adaptive'](
+            interval=self.polling_interval,
+            min_interval=self.polling_min_interval,
+            max_interval=self.polling_max_interval,
+            backoff_factor=self.polling_backoff_factor,
+        )
+
+    def create_result_cache(self):
+        """Use the data to create the cache of results."""
+        return ResultCache(filepath=self.cache_file,
+                           max_entries=self.cache_max_entries,
+                           ttl=self.cache_ttl)
+
+    def get_ledger_file(self):
+        """Return the file of the ledger of reported results.
+
+        By default the ledger is kept in the AiiDA configuration folder (see
+        `get_default_store_file`); `:memory:` keeps it in memory instead.
+        """
+        if self.ledger_file is not None:
+            return self.ledger_file
+        return get_default_store_file('ledger', self.tenant_uuid,
+                                      self.instance_index)
+
+    def get_outbox_file(self):
+        """Return the file of the outbox of results waiting to be posted.
+
+        By default the outbox is kept in the AiiDA configuration folder (see
+        `get_default_store_file`); `:memory:` keeps it in memory instead.
+        """
+        if self.outbox_file is not None:
+            return self.outbox_file
+        return get_default_store_file('outbox', self.tenant_uuid,
+                                      self.instance_index)
+
+    def create_tenant(self, finales_client):
+        """Use the data to create a tenant."""
+        return AiidaTenant(finales_client,
+                           tenant_uuid=self.tenant_uuid,
+                           polling_policy=self.create_polling_policy(),
+                           batch_size=self.batch_size,
+                           result_cache=self.create_result_cache(),
+                           page_size=self.page_size,
+                           report_ledger=ReportLedger(self.get_ledger_file()),
+                           result_outbox=ResultOutbox(self.get_outbox_file()),
+                           flush_batch_size=self.flush_batch_size,
+                           flush_interval=self.flush_interval,
+                           max_ongoing_processes=self.max_ongoing_processes,
+                           submit_batch_size=self.submit_batch_size,
+                           sharding=RequestSharding(self.instance_index,
+                                                    self.instance_count),
+                           pipelined=self.pipelined,
+                           metrics_port=self.metrics_port,
+                           metrics_host=self.metrics_host,
+                           metrics_file=self.metrics_file,
+                           log_sample_rate=self.log_sample_rate,
+                           conductivity_grid_file=self.conductivity_grid_file,
+                           inline=self.inline)
+
+
+def get_default_store_file(name, tenant_uuid=None, instance_index=0):
+    """Return the default file of a local store of the tenant.
+
+    The stores are kept in the folder of the AiiDA configuration, separately
+    for each profile, tenant and instance (e.g.
+    `~/.aiida/finales/<profile>/<tenant_uuid>/instance-0/ledger.sqlite`);
+    tenants without a `tenant_uuid` share the `default` folder.
+    """
+    from aiida.manage.configuration import get_config, get_profile
+    dirpath = os.path.join(get_config().dirpath, 'finales',
+                           get_profile().name, tenant_uuid or 'default',
+                           f'instance-{instance_index}')
+    os.makedirs(dirpath, exist_ok=True)
+    return os.path.join(dirpath, f'{name}.sqlite')
+
+
+def get_tenant_group(tenant_uuid):
+    """Return the group of the workflows submitted by the tenant.
+
+    The group is created the first time the tenant is started.
+    """
+    group, _ = orm.Group.collection.get_or_create(
+        label=f'{TENANT_GROUP_PREFIX}{tenant_uuid}')
+    return group
+
+
+def get_relevant_process_types():
+    """Return the process types of all the capabilities of the tenant."""
+    relevant_types = []
+    for methods in TENANT_CAPABILITIES.values():
+        for data in methods.values():
+            relevant_types.append(data['process_type'])
+            if 'batch_process_type' in data:
+                relevant_types.append(data['batch_process_type'])
+    return relevant_types
+
+
+def get_capability(request_data):
+    """Return the first capability of the tenant that matches the request.
+
+    Returns the pair `(method_name, capability)`, or `(None, None)` if the
+    tenant can't deal with the request.
+    """
+    request_quantity = request_data['request']['quantity']
+    methods = TENANT_CAPABILITIES.get(request_quantity, {})
+    for method_name in request_data['request']['methods']:
+        if method_name in methods:
+            return method_name, methods[method_name]
+    return None, None
+
+
+def can_batch(request_data):
+    """Return whether the request can be processed in a batch."""
+    _, capability = get_capability(request_data)
+    return capability is not None and 'batch_class' in capability
+
+
+def can_inline(request_data):
+    """Return whether the request can be evaluated in the tenant process.
+
+    Requests that the workflows can't process either (e.g. without a
+    formulation) are not evaluated, so no calculation is created for them.
+    """
+    _, capability = get_capability(request_data)
+    if capability is None or 'inline_function' not in capability:
+        return False
+    return capability['class'].can_process(request_data)
+
+
+def get_result_data(output_data, request_uuid):
+    """Extract the result for the request from the output of a workflow.
+
+    The outputs of the batch workflows contain the `results` of every request
+    of the batch; returns `None` if there is no result for the request.
+    """
+    if 'results' in output_data:
+        return output_data['results'].get(request_uuid)
+    return output_data
@@ -0,0 +1,266 @@
+"""Durable outbox of the results waiting to be posted to the server."""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import requests
+
+from .instrumentation import ERRORS_TOTAL
+from .storage import SqliteStore
+
+LOGGER = logging.getLogger(__name__)
+
+# Client errors that may succeed if the post is repeated later.
+TRANSIENT_CLIENT_ERRORS = (408, 425, 429)
+
+
+class ResultOutbox(SqliteStore):
+    """Persistent queue of the results that still have to be posted.
+
+    Results stay in the outbox until they are successfully posted; failed
+    posts are rescheduled for a later attempt. The uuids of the queued
+    requests are also kept in memory for constant-time membership checks.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            request_uuid TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            enqueued_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS outbox_next_attempt_at
+            ON outbox (next_attempt_at);
+    """
+
+    def __init__(self, filepath=None, clock=time.time):
+        """Initialize internal variables."""
+        super().__init__(filepath)
+        self._clock = clock
+        self._queued_uuids = {
+            row[0]
+            for row in self._execute('SELECT request_uuid FROM outbox')
+        }
+
+    def __contains__(self, request_uuid):
+        """Return whether the result of the request is waiting in the outbox."""
+        return request_uuid in self._queued_uuids
+
+    def __len__(self):
+        """Return the number of results waiting to be posted."""
+        return len(self._queued_uuids)
+
+    def enqueue_many(self, results):
+        """Queue many `(request_uuid, payload)` pairs at once.
+
+        Results for requests that are already queued are ignored.
+        """
+        now = self._clock()
+        with self._lock:
+            self._executemany(
+                'INSERT OR IGNORE INTO outbox '
+                '(request_uuid, payload, enqueued_at, next_attempt_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(request_uuid, json.dumps(payload), now, now)
+                 for request_uuid, payload in results],
+            )
+            self._queued_uuids.update(request_uuid
+                                      for request_uuid, _ in results)
+
+    def get_due(self, limit):
+        """Return up to `limit` results whose next attempt is due.
+
+        The results are returned as `(request_uuid, payload, attempts)`
+        tuples, oldest first.
+        """
+        rows = self._execute(
+            'SELECT request_uuid, payload, attempts FROM outbox '
+            'WHERE next_attempt_at <= ? ORDER BY enqueued_at, rowid LIMIT ?',
+            (self._clock(), limit))
+        return [(request_uuid, json.loads(payload), attempts)
+                for request_uuid, payload, attempts in rows]
+
+    def complete(self, request_uuids):
+        """Remove the results that were successfully posted."""
+        with self._lock:
+            self._executemany('DELETE FROM outbox WHERE request_uuid = ?',
+                              [(request_uuid, )
+                               for request_uuid in request_uuids])
+            self._queued_uuids.difference_update(request_uuids)
+
+    def reschedule(self, request_uuid, delay):
+        """Schedule a new attempt for the result after `delay` seconds."""
+        self._execute(
+            'UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? '
+            'WHERE request_uuid = ?', (self._clock() + delay, request_uuid))
+
+    def oldest_age(self):
+        """Return the seconds the oldest result has been waiting (or 0)."""
+        rows = self._execute('SELECT MIN(enqueued_at) FROM outbox')
+        if rows[0][0] is None:
+            return 0.0
+        return self._clock() - rows[0][0]
+
+
+class OutboxFlusher:
+    """Drain the outbox in the background, posting results in batches.
+
+    Every batch of up to `batch_size` due results is posted concurrently
+    through the asynchronous client (which bounds the number of calls in
+    flight). Posted results are recorded in the `report_ledger` and removed
+    from the outbox; failed ones are retried with exponential backoff, from
+    `backoff_base` up to `backoff_max` seconds. Results that the server
+    rejects for good (see `is_rejection`) are dropped from the outbox as dead
+    letters, without being recorded in the ledger.
+    """
+
+    def __init__(self,
+                 outbox,
+                 async_client,
+                 report_ledger,
+                 batch_size=50,
+                 interval=1.0,
+                 backoff_base=1.0,
+                 backoff_max=300.0):
+        """Initialize internal variables."""
+        self._outbox = outbox
+        self._async_client = async_client
+        self._report_ledger = report_ledger
+        self._batch_size = batch_size
+        self._interval = interval
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.num_posted = 0
+        self.num_failed = 0
+        self.num_rejected = 0
+        self.last_flush_duration = 0.0
+
+    def start(self):
+        """Start draining the outbox in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='outbox-flusher',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background thread after the current batch."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def flush_once(self):
+        """Post one batch of due results; return how many were posted."""
+        due_results = self._outbox.get_due(self._batch_size)
+        if not due_results:
+            return 0
+
+        flush_start = time.monotonic()
+        server_replies = asyncio.run(
+            self._async_client.post_results([
+                (payload, request_uuid)
+                for request_uuid, payload, _ in due_results
+            ]))
+
+        reported = []
+        rejected = []
+        failures = []
+        for index, (request_uuid, _, attempts) in enumerate(due_results):
+            server_reply = server_replies[index]
+            if is_rejection(server_reply):
+                LOGGER.warning('Result rejected by the server, dropping it',
+                               extra={
+                                   'request_uuid': request_uuid,
+                                   'error': repr(server_reply),
+                               })
+                rejected.append(request_uuid)
+                ERRORS_TOTAL.inc(stage='reject')
+                continue
+            if isinstance(server_reply, Exception):
+                LOGGER.debug('Failed to report request',
+                             extra={
+                                 'request_uuid': request_uuid,
+                                 'attempt': attempts + 1,
+                                 'error': repr(server_reply),
+                             })
+                failures.append(server_reply)
+                delay = min(self._backoff_base * 2**attempts,
+                            self._backoff_max)
+                self._outbox.reschedule(request_uuid, delay)
+                self.num_failed += 1
+                ERRORS_TOTAL.inc(stage='report')
+                continue
+            reported.append((request_uuid, server_reply))
+
+        if failures:
+            LOGGER.warning('Failed to report %d of %d results, retrying later',
+                           len(failures),
+                           len(due_results),
+                           extra={'first_error': repr(failures[0])})
+
+        self._report_ledger.record_many(reported)
+        completed = [request_uuid for request_uuid, _ in reported]
+        self._outbox.complete(completed + rejected)
+        self.num_posted += len(reported)
+        self.num_rejected += len(rejected)
+        self.last_flush_duration = time.monotonic() - flush_start
+        return len(reported)
+
+    def flush_all(self):
+        """Post batches until there are no due results left."""
+        num_posted = 0
+        while True:
+            num_flushed = self.flush_once()
+            if num_flushed == 0:
+                return num_posted
+            num_posted += num_flushed
+
+    def get_stats(self):
+        """Return the depth of the outbox and the flushing statistics."""
+        return {
+            'depth': len(self._outbox),
+            'oldest_age': self._outbox.oldest_age(),
+            'num_posted': self.num_posted,
+            'num_failed': self.num_failed,
+            'num_rejected': self.num_rejected,
+            'last_flush_duration': self.last_flush_duration,
+        }
+
+    def _run(self):
+        """Flush batches until stopped, waiting while there is nothing due."""
+        while not self._stop_event.is_set():
+            try:
+                num_flushed = self.flush_once()
+            except Exception as exception:  # pylint: disable=broad-except
+                LOGGER.exception('Error while flushing the outbox: %r',
+                                 exception)
+                ERRORS_TOTAL.inc(stage='report')
+                num_flushed = 0
+            if num_flushed == 0:
+                self._stop_event.wait(self._interval)
+
+
+def is_rejection(server_reply):
+    """Return whether a failed post should not be repeated.
+
+    That is the case of the client errors (4xx) of the server, e.g. a 404 for
+    a request that is not pending anymore, except those in
+    `TRANSIENT_CLIENT_ERRORS`; connection errors and 5xx replies are retried.
+    """
+    if not isinstance(server_reply, requests.HTTPError):
+        return False
+    response = server_reply.response
+    if response is None:
+        return False
+    if response.status_code in TRANSIENT_CLIENT_ERRORS:
+        return False
+    return 400 <= response.status_code < 500
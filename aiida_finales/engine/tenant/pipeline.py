@@ -0,0 +1,125 @@
+"""Stage of the tenant fetching the pending requests in the background."""
+import queue
+import threading
+import time
+
+from .instrumentation import ERRORS_TOTAL
+
+# Marker put in the queue after the last request of a poll.
+END_OF_POLL = object()
+
+
+class RequestPoller:
+    """Fetch the pending requests in a background thread.
+
+    Every call to `request_poll` makes the thread go through the requests
+    yielded by `iter_function`, putting them in a bounded queue in chunks of
+    `chunk_size` while the tenant consumes them with `iter_poll_chunks`. This
+    way the tenant can refresh its index, and classify and submit the first
+    requests while the next pages are still being downloaded. When the queue holds `max_chunks`,
+    the thread waits for the tenant to catch up.
+    """
+
+    def __init__(self, iter_function, chunk_size=100, max_chunks=10):
+        """Initialize internal variables."""
+        self._iter_function = iter_function
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._poll_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.last_wait = 0.0
+
+    @property
+    def running(self):
+        """Return whether the background thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def depth(self):
+        """Return the number of chunks waiting to be consumed."""
+        return self._queue.qsize()
+
+    def start(self):
+        """Start the background thread."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='request-poller',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background thread after the current chunk."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request_poll(self):
+        """Ask the background thread to fetch the pending requests."""
+        self._poll_event.set()
+
+    def iter_poll(self):
+        """Iterate over the requests of the poll as they are fetched."""
+        for chunk in self.iter_poll_chunks():
+            yield from chunk
+
+    def iter_poll_chunks(self):
+        """Iterate over the chunks of requests of the poll as they are fetched.
+
+        Errors while fetching are raised here, in the consuming thread. The
+        time spent waiting for the requests is stored in `last_wait`.
+        """
+        self.last_wait = 0.0
+        while True:
+            wait_start = time.monotonic()
+            chunk = self._queue.get()
+            self.last_wait += time.monotonic() - wait_start
+            if chunk is END_OF_POLL:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def _run(self):
+        """Fetch the requests every time a poll is requested, until stopped."""
+        while not self._stop_event.is_set():
+            if not self._poll_event.wait(timeout=0.1):
+                continue
+            self._poll_event.clear()
+            try:
+                for chunk in iter_chunks(self._iter_function(),
+                                         self._chunk_size):
+                    if not self._put(chunk):
+                        return
+            except Exception as exception:  # pylint: disable=broad-except
+                ERRORS_TOTAL.inc(stage='fetch')
+                if not self._put(exception):
+                    return
+                continue
+            if not self._put(END_OF_POLL):
+                return
+
+    def _put(self, item):
+        """Put the item in the queue; return `False` if stopped meanwhile."""
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def iter_chunks(iterable, chunk_size):
+    """Iterate over the items in lists of up to `chunk_size`."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,71 @@
+"""Policies deciding how long the tenant waits between cycles."""
+
+
+class FixedPolling:
+    """Always wait the same interval between cycles."""
+
+    def __init__(self, interval=3.0):
+        """Initialize internal variables."""
+        self._interval = interval
+
+    def next_interval(self, cycle_record):  # pylint: disable=unused-argument
+        """Return the seconds to wait before the next cycle."""
+        return self._interval
+
+
+class AdaptivePolling:
+    """Adapt the interval between cycles to the load of the tenant.
+
+    - If the last cycle found work (requests submitted or reported) the next
+      cycle starts after `min_interval`, since more work is likely to follow.
+      Workflows that changed state in the index don't count: the finished
+      ones are already reported in the same cycle.
+    - If there are workflows running but nothing changed, the tenant waits the
+      regular `interval` for them to progress.
+    - If there is nothing pending nor running, the interval grows by
+      `backoff_factor` every idle cycle, up to `max_interval`.
+    """
+
+    def __init__(self,
+                 interval=3.0,
+                 min_interval=0.5,
+                 max_interval=60.0,
+                 backoff_factor=2.0):
+        """Initialize internal variables."""
+        if backoff_factor < 1.0:
+            raise ValueError(
+                f'The backoff factor must be at least 1, not {backoff_factor}')
+        self._interval = interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self._idle_interval = None
+
+    def next_interval(self, cycle_record):
+        """Return the seconds to wait before the next cycle."""
+        if found_work(cycle_record):
+            self._idle_interval = None
+            return self._min_interval
+
+        if cycle_record['num_ongoing'] > 0 or cycle_record['num_pending'] > 0:
+            self._idle_interval = None
+            return self._interval
+
+        if self._idle_interval is None:
+            self._idle_interval = self._interval
+        else:
+            self._idle_interval = min(
+                self._idle_interval * self._backoff_factor, self._max_interval)
+        return self._idle_interval
+
+
+def found_work(cycle_record):
+    """Return whether the cycle did anything besides looking around."""
+    activity_keys = ('num_submitted', 'num_reported')
+    return any(cycle_record[key] > 0 for key in activity_keys)
+
+
+POLLING_POLICIES = {
+    'fixed': FixedPolling,
+    'adaptive': AdaptivePolling,
+}
@@ -0,0 +1,51 @@
+"""Split the pending requests between several instances of the tenant."""
+import hashlib
+
+
+class RequestSharding:
+    """Assign every request to exactly one of `instance_count` instances.
+
+    Requests are assigned with rendezvous (highest random weight) hashing of
+    their uuid: every instance computes the same assignment without any
+    coordination, and if the number of instances changes only the requests
+    of the added or removed instances move to a different one.
+    """
+
+    def __init__(self, instance_index=0, instance_count=1):
+        """Initialize internal variables."""
+        if instance_count < 1:
+            raise ValueError(
+                f'The number of instances must be at least 1, not {instance_count}'
+            )
+        if not 0 <= instance_index < instance_count:
+            raise ValueError(f'The instance index must be between 0 and '
+                             f'{instance_count - 1}, not {instance_index}')
+        self._instance_index = instance_index
+        self._instance_count = instance_count
+
+    @property
+    def instance_index(self):
+        """Return the index of this instance."""
+        return self._instance_index
+
+    @property
+    def instance_count(self):
+        """Return the total number of instances."""
+        return self._instance_count
+
+    def get_owner(self, request_uuid):
+        """Return the index of the instance that processes the request."""
+        return max(range(self._instance_count),
+                   key=lambda index: get_weight(index, request_uuid))
+
+    def owns(self, request_uuid):
+        """Return whether this instance processes the request."""
+        if self._instance_count == 1:
+            return True
+        return self.get_owner(request_uuid) == self._instance_index
+
+
+def get_weight(instance_index, request_uuid):
+    """Return the weight of the pair of instance and request."""
+    digest = hashlib.sha256(f'{instance_index}:{request_uuid}'.encode())
+    return int.from_bytes(digest.digest()[:8], 'big')
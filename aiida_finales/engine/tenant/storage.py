@@ -0,0 +1,48 @@
+"""Base class for the local stores the tenant keeps on disk."""
+import sqlite3
+import threading
+
+
+class SqliteStore:
+    """Small thread-safe wrapper around a SQLite database.
+
+    Subclasses define the tables they need in `SCHEMA`. If no `filepath` is
+    given, the database is kept in memory (and is lost when the tenant stops).
+    """
+
+    SCHEMA = ''
+
+    def __init__(self, filepath=None):
+        """Initialize internal variables."""
+        self._filepath = filepath
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            filepath or ':memory:',
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        if filepath is not None:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(self.SCHEMA)
+
+    @property
+    def filepath(self):
+        """Return the path of the database file (`None` if in memory)."""
+        return self._filepath
+
+    def close(self):
+        """Close the connection to the database."""
+        with self._lock:
+            self._connection.close()
+
+    def _execute(self, statement, parameters=()):
+        """Execute a statement and return all the rows it produces."""
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchall()
+
+    def _executemany(self, statement, parameters_list):
+        """Execute a statement for each set of parameters in one transaction."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.executemany(statement, parameters_list)
@@ -0,0 +1,106 @@
+"""Submission stage of the tenant, with a cap on the processes in flight."""
+import collections
+
+from aiida.engine import submit
+
+
+class SubmissionQueue:
+    """Queue of the processes waiting to be submitted by the tenant.
+
+    Processes are submitted in FIFO order, only while the number of ongoing
+    processes is below `max_ongoing`, and at most `batch_size` per call to
+    `submit_available` (all the available slots by default). The rest stay
+    queued for the next cycle, so a burst of requests does not flood the
+    broker and the daemon. The submitted processes are added to the `group`
+    if one is given.
+    """
+
+    def __init__(self,
+                 max_ongoing,
+                 batch_size=None,
+                 group=None,
+                 submit_function=submit):
+        """Initialize internal variables."""
+        if max_ongoing < 1:
+            raise ValueError(
+                f'The maximum of ongoing processes must be at least 1, not {max_ongoing}'
+            )
+        self._max_ongoing = max_ongoing
+        self._batch_size = batch_size
+        self._group = group
+        self._submit_function = submit_function
+        self._queue = collections.OrderedDict()
+        self._queued_uuids = set()
+
+    @property
+    def max_ongoing(self):
+        """Return the maximum number of processes in flight."""
+        return self._max_ongoing
+
+    def __len__(self):
+        """Return the number of processes waiting to be submitted."""
+        return len(self._queue)
+
+    def __contains__(self, request_uuid):
+        """Return whether the request is waiting to be submitted."""
+        return request_uuid in self._queued_uuids
+
+    @property
+    def num_requests(self):
+        """Return the number of requests waiting to be submitted."""
+        return len(self._queued_uuids)
+
+    def put(self, request_uuids, builder):
+        """Queue the process handling the requests."""
+        key = tuple(request_uuids)
+        if key in self._queue:
+            return
+        self._queue[key] = builder
+        self._queued_uuids.update(request_uuids)
+
+    def submit_available(self, num_ongoing, num_submitted=0):
+        """Submit queued processes while there are free slots.
+
+        The `num_submitted` processes that were already submitted in the same
+        cycle (e.g. for a previous chunk of requests) count both as ongoing
+        and towards the `batch_size`. Returns the list of `(request_uuids,
+        process_node)` submitted.
+        """
+        num_available = self._max_ongoing - num_ongoing - num_submitted
+        if self._batch_size is not None:
+            num_available = min(num_available,
+                                self._batch_size - num_submitted)
+        num_available = max(num_available, 0)
+
+        submitted = []
+        while self._queue and len(submitted) < num_available:
+            request_uuids, builder = self._queue.popitem(last=False)
+            self._queued_uuids.difference_update(request_uuids)
+            process_node = self._submit_function(builder)
+            # Added one by one, so that the processes already submitted are
+            # still tracked by the tenant if a later submission fails
+            if self._group is not None:
+                self._group.add_nodes(process_node)
+            submitted.append((list(request_uuids), process_node))
+        return submitted
+
+
+def get_daemon_capacity():
+    """Return the number of processes the daemon can run at the same time.
+
+    That is the number of daemon workers times the slots per worker (if the
+    daemon can't be reached, it is assumed to have a single worker).
+    """
+    from aiida.manage import get_manager
+    from aiida.manage.configuration import get_config_option
+
+    worker_slots = get_config_option('daemon.worker_process_slots')
+    try:
+        daemon_client = get_manager().get_daemon_client()
+        num_workers = daemon_client.get_numprocesses().get('numprocesses')
+    except Exception:  # pylint: disable=broad-except
+        num_workers = None
+
+    if not isinstance(num_workers, int) or num_workers < 1:
+        num_workers = 1
+    return num_workers * worker_slots
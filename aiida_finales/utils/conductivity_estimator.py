@@ -1,6 +1,34 @@
 """CONDUCTIVITY ESTIMATOR."""
+import functools
+
+import numpy as np
 from scipy.interpolate import interp1d
 
+COEFS_CACHE_SIZE = 256
+
+TEMPERATURE_GRID = np.array([243, 253, 263, 273, 283, 293, 303, 313, 323, 333],
+                            dtype=float)
+
+COEFFICIENT_TABLE = np.array([
+    [1.0, 1.2, 1.4, 1.5, 1.5, 1.6, 1.6, 1.6, 1.6, 1.6],
+    [-0.3, -0.3, 1.0, 0.4, 1.2, 1.7, 2.7, 3.0, 3.2, 3.0],
+    [5.6, 8.9, 12.1, 15.9, 20.4, 25.0, 29.7, 35.1, 41.3, 47.4],
+    [0.9, 0.9, 0.1, -0.1, -0.9, -1.4, -3.2, -3.2, -3.2, -2.5],
+    [-2.3, -3.2, -3.9, -4.9, -5.9, -6.8, -6.9, -7.3, -7.6, -6.9],
+    [-9.7, -13.6, -17.1, -21.2, -26.1, -31.0, -35.8, -41.9, -49.5, -57.2],
+    [-0.6, -0.7, -0.3, -0.4, -0.4, -0.3, 0.4, 1.0, 0.0, -0.7],
+    [1.4, 1.9, 2.4, 3.3, 4.2, 5.1, 5.6, 6.2, 6.4, 6.6],
+    [0.6, 0.8, 0.9, 0.9, 0.7, 0.5, 0.0, -0.6, -0.7, -1.8],
+    [4.0, 5.1, 6.1, 7.3, 8.8, 10.5, 12.2, 14.6, 17.6, 21.1],
+])
+TEMPERATURE_GRID.flags.writeable = False
+COEFFICIENT_TABLE.flags.writeable = False
+
+# Interpolates all the coefficients at once: shape (10, len(temperatures))
+_COEFFICIENT_INTERPOLATOR = interp1d(TEMPERATURE_GRID,
+                                     COEFFICIENT_TABLE,
+                                     axis=1)
+
 
 def estimate_conductivity(value_lpf, value_ecs, value_pcs, temp):
     """Calculate the conductivity of LiPF6 in EC+PC mixtures."""
@@ -13,47 +41,97 @@ def estimate_conductivity(value_lpf, value_ecs, value_pcs, temp):
     lpf1 = value_pcs / (value_ecs + value_pcs)
 
     coefs = calculate_coefs(temp)
+    sigma = evaluate_polynomial(coefs, rpc1, lpf1)
+
+    result = sigma * 1e-3
+    return result
+
+
+def estimate_conductivity_batch(values_lpf, values_ecs, values_pcs, temps):
+    """Calculate the conductivity for many compositions at once.
+
+    All inputs are broadcast against each other into 1-D arrays. Instead of
+    raising on the first invalid entry (as `estimate_conductivity` does), the
+    function returns a boolean mask with the validity of each row next to the
+    array of conductivities, where the invalid rows are set to NaN.
+
+    :return: tuple `(conductivities, valid_mask)` of 1-D numpy arrays.
+    """
+    values_lpf, values_ecs, values_pcs, temps = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(values, dtype=float))
+          for values in (values_lpf, values_ecs, values_pcs, temps)))
+    values_lpf = values_lpf.ravel()
+    values_ecs = values_ecs.ravel()
+    values_pcs = values_pcs.ravel()
+    temps = temps.ravel()
+
+    valid_mask = validate_batch(values_lpf, values_ecs, values_pcs, temps)
+    conductivities = np.full(values_lpf.shape, np.nan)
+    if not valid_mask.any():
+        return conductivities, valid_mask
+
+    values_solv = values_ecs[valid_mask] + values_pcs[valid_mask]
+    rpc1 = values_lpf[valid_mask] / values_solv
+    lpf1 = values_pcs[valid_mask] / values_solv
+
+    coefs = calculate_coefs_batch(temps[valid_mask])
+    sigma = evaluate_polynomial(coefs, rpc1, lpf1)
+
+    conductivities[valid_mask] = sigma * 1e-3
+    return conductivities, valid_mask
 
+
+def validate_batch(values_lpf, values_ecs, values_pcs, temps):
+    """Return the mask of rows that the model can be evaluated on."""
+    with np.errstate(invalid='ignore'):
+        valid_mask = np.isfinite(values_lpf) & np.isfinite(values_ecs)
+        valid_mask &= np.isfinite(values_pcs) & np.isfinite(temps)
+        valid_mask &= (values_lpf > 0.0) & (values_pcs > 0.0)
+        valid_mask &= (values_ecs + values_pcs) > 0.0
+        valid_mask &= (temps >= TEMPERATURE_GRID[0])
+        valid_mask &= (temps <= TEMPERATURE_GRID[-1])
+    return valid_mask
+
+
+def evaluate_polynomial(coefs, rpc1, lpf1):
+    """Evaluate the cubic polynomial of the model (scalars or arrays)."""
     sigma = (coefs[0] + coefs[1] * rpc1 + coefs[2] * lpf1 +
              coefs[3] * rpc1 * rpc1 + coefs[4] * rpc1 * lpf1 +
              coefs[5] * lpf1 * lpf1 + coefs[6] * rpc1 * rpc1 * rpc1 +
              coefs[7] * rpc1 * rpc1 * lpf1 + coefs[8] * rpc1 * lpf1 * lpf1 +
              coefs[9] * lpf1 * lpf1 * lpf1)
-
-    result = sigma * 1e-3
-    return result
+    return sigma
 
 
 def calculate_coefs(temperature):
-    """Calculate the coeficients."""
-    templist = [243, 253, 263, 273, 283, 293, 303, 313, 323, 333]
-    coef_lists = [
-        [1.0, 1.2, 1.4, 1.5, 1.5, 1.6, 1.6, 1.6, 1.6, 1.6],
-        [-0.3, -0.3, 1.0, 0.4, 1.2, 1.7, 2.7, 3.0, 3.2, 3.0],
-        [5.6, 8.9, 12.1, 15.9, 20.4, 25.0, 29.7, 35.1, 41.3, 47.4],
-        [0.9, 0.9, 0.1, -0.1, -0.9, -1.4, -3.2, -3.2, -3.2, -2.5],
-        [-2.3, -3.2, -3.9, -4.9, -5.9, -6.8, -6.9, -7.3, -7.6, -6.9],
-        [-9.7, -13.6, -17.1, -21.2, -26.1, -31.0, -35.8, -41.9, -49.5, -57.2],
-        [
-            -0.6,
-            -0.7,
-            -0.3,
-            -0.4,
-            -0.4,
-            -0.3,
-            0.4,
-            1.0,
-            0.0,
-            -0.7,
-        ],
-        [1.4, 1.9, 2.4, 3.3, 4.2, 5.1, 5.6, 6.2, 6.4, 6.6],
-        [0.6, 0.8, 0.9, 0.9, 0.7, 0.5, 0.0, -0.6, -0.7, -1.8],
-        [4.0, 5.1, 6.1, 7.3, 8.8, 10.5, 12.2, 14.6, 17.6, 21.1],
-    ]
-
-    interpolators = [interp1d(templist, coef_list) for coef_list in coef_lists]
-    coefs = [
-        float(interpolator(temperature)) for interpolator in interpolators
-    ]
-    # coefs = [1.5, 0.4, 15.9, -0.1, -4.9, -21.2, -0.4, 3.3, 0.9, 7.3]
-    return coefs
+    """Calculate the coeficients.
+
+    The interpolated coefficients are memoized per temperature in a bounded
+    LRU cache (see `coefs_cache_info` for the hit/miss counters).
+    """
+    return list(_interpolate_coefs(float(temperature)))
+
+
+def calculate_coefs_batch(temperatures):
+    """Calculate the coefficients for an array of temperatures at once.
+
+    Returns an array of shape `(10, len(temperatures))`.
+    """
+    return _COEFFICIENT_INTERPOLATOR(temperatures)
+
+
+@functools.lru_cache(maxsize=COEFS_CACHE_SIZE)
+def _interpolate_coefs(temperature):
+    """Interpolate the coefficients for a single temperature."""
+    return tuple(
+        float(coef) for coef in _COEFFICIENT_INTERPOLATOR(temperature))
+
+
+def coefs_cache_info():
+    """Return the hits, misses, maxsize and currsize of the coefficient cache."""
+    return _interpolate_coefs.cache_info()
+
+
+def clear_coefs_cache():
+    """Empty the coefficient cache and reset its counters."""
+    _interpolate_coefs.cache_clear()
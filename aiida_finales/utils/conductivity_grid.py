@@ -0,0 +1,202 @@
+"""Precomputed grid of the conductivity estimator, for fast lookups.
+
+The conductivity is tabulated over the salt ratio (LiPF6 over solvent), the
+fraction of PC in the solvent and the temperature, and stored as a `.npy`
+file (next to a `.json` file describing the axes). The file is memory-mapped
+when loaded, so several processes (e.g. daemon workers) share a single copy
+of the table through the page cache.
+"""
+import functools
+import json
+import pathlib
+
+import numpy as np
+
+from . import conductivity_estimator as estimator
+
+AXIS_NAMES = ('salt_ratio', 'pc_fraction', 'temperature')
+
+DEFAULT_RANGES = {
+    'salt_ratio': (0.0, 0.5),
+    'pc_fraction': (0.0, 1.0),
+    'temperature':
+    (estimator.TEMPERATURE_GRID[0], estimator.TEMPERATURE_GRID[-1]),
+}
+
+# Ten points per degree of the polynomial in the composition, and the
+# temperature every degree (a multiple of the 10 K of the coefficient table,
+# where the model is already linear).
+DEFAULT_SHAPE = (101, 101, 91)
+
+
+class ConductivityGrid:
+    """Conductivity tabulated on a regular grid, with trilinear lookups.
+
+    The `axes` map each name in `AXIS_NAMES` to its `(start, stop, num)`;
+    the `values` have shape `(num_salt_ratio, num_pc_fraction,
+    num_temperature)`.
+    """
+
+    def __init__(self, values, axes):
+        """Initialize internal variables."""
+        self._axes = {
+            name:
+            (float(axes[name][0]), float(axes[name][1]), int(axes[name][2]))
+            for name in AXIS_NAMES
+        }
+        shape = tuple(self._axes[name][2] for name in AXIS_NAMES)
+        if values.shape != shape:
+            raise ValueError(f'The values have shape {values.shape}, but '
+                             f'the axes describe a grid of shape {shape}')
+        if min(shape) < 2:
+            raise ValueError('The grid needs at least two points per axis')
+        self._values = values
+
+    @classmethod
+    def build(cls, shape=DEFAULT_SHAPE, ranges=None):
+        """Evaluate the model on a grid of the given shape and ranges."""
+        ranges = dict(DEFAULT_RANGES, **(ranges or {}))
+        axes = {
+            name: (ranges[name][0], ranges[name][1], num)
+            for name, num in zip(AXIS_NAMES, shape)
+        }
+        salt_ratios, pc_fractions, temperatures = (np.linspace(*axes[name])
+                                                   for name in AXIS_NAMES)
+
+        coefs = estimator.calculate_coefs_batch(temperatures)
+        sigma = estimator.evaluate_polynomial(coefs, salt_ratios[:, None,
+                                                                 None],
+                                              pc_fractions[None, :, None])
+        return cls(sigma * 1e-3, axes)
+
+    @classmethod
+    def load(cls, filepath, mmap=True):
+        """Load a grid saved with `save` (memory-mapped and read-only)."""
+        filepath = pathlib.Path(filepath)
+        with open(filepath.with_suffix('.json')) as fileobj:
+            axes = json.load(fileobj)['axes']
+        values = np.load(filepath, mmap_mode='r' if mmap else None)
+        return cls(values, axes)
+
+    def save(self, filepath):
+        """Save the values to `filepath` and the axes next to it as JSON."""
+        filepath = pathlib.Path(filepath)
+        np.save(filepath, np.ascontiguousarray(self._values))
+        with open(filepath.with_suffix('.json'), 'w') as fileobj:
+            json.dump({'axes': self._axes}, fileobj, indent=2)
+
+    @property
+    def axes(self):
+        """Return the `(start, stop, num)` of each axis."""
+        return dict(self._axes)
+
+    @property
+    def values(self):
+        """Return the tabulated conductivities."""
+        return self._values
+
+    def interpolate(self, salt_ratios, pc_fractions, temperatures):
+        """Interpolate the conductivity at the given points.
+
+        The inputs are broadcast against each other into 1-D arrays; points
+        outside of the grid are set to NaN.
+        """
+        coordinates = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(values, dtype=float))
+              for values in (salt_ratios, pc_fractions, temperatures)))
+
+        inside = np.ones(coordinates[0].size, dtype=bool)
+        lower_indices = []
+        weights = []
+        for name, values in zip(AXIS_NAMES, coordinates):
+            start, stop, num = self._axes[name]
+            with np.errstate(invalid='ignore'):
+                positions = (values.ravel() - start) * ((num - 1) /
+                                                        (stop - start))
+                inside &= (positions >= 0.0) & (positions <= num - 1)
+            positions = np.where(inside, positions, 0.0)
+            lower = np.minimum(positions.astype(np.intp), num - 2)
+            lower_indices.append(lower)
+            weights.append(positions - lower)
+
+        # Gather the corners of the cells from the flattened table
+        num_pc, num_temp = self._values.shape[1:]
+        flat_values = self._values.reshape(-1)
+        base_indices = (
+            (lower_indices[0] * num_pc + lower_indices[1]) * num_temp +
+            lower_indices[2])
+        result = np.zeros(inside.shape)
+        for corner in np.ndindex(2, 2, 2):
+            corner_weight = np.ones(inside.shape)
+            for axis, offset in enumerate(corner):
+                corner_weight *= (weights[axis] if offset else 1.0 -
+                                  weights[axis])
+            offset = (corner[0] * num_pc + corner[1]) * num_temp + corner[2]
+            result += corner_weight * flat_values[base_indices + offset]
+
+        result[~inside] = np.nan
+        return result
+
+    def estimate_batch(self, values_lpf, values_ecs, values_pcs, temps):
+        """Estimate the conductivity as `estimate_conductivity_batch` does.
+
+        The compositions within the grid are interpolated, the rest are
+        evaluated with the exact model.
+
+        :return: tuple `(conductivities, valid_mask)` of 1-D numpy arrays.
+        """
+        values_lpf, values_ecs, values_pcs, temps = (np.atleast_1d(
+            np.asarray(values,
+                       dtype=float)).ravel() for values in np.broadcast_arrays(
+                           values_lpf, values_ecs, values_pcs, temps))
+        valid_mask = estimator.validate_batch(values_lpf, values_ecs,
+                                              values_pcs, temps)
+        conductivities = np.full(values_lpf.shape, np.nan)
+        if not valid_mask.any():
+            return conductivities, valid_mask
+
+        values_solv = values_ecs[valid_mask] + values_pcs[valid_mask]
+        conductivities[valid_mask] = self.interpolate(
+            values_lpf[valid_mask] / values_solv,
+            values_pcs[valid_mask] / values_solv, temps[valid_mask])
+
+        outside_mask = valid_mask & np.isnan(conductivities)
+        if outside_mask.any():
+            conductivities[outside_mask], _ = (
+                estimator.estimate_conductivity_batch(values_lpf[outside_mask],
+                                                      values_ecs[outside_mask],
+                                                      values_pcs[outside_mask],
+                                                      temps[outside_mask]))
+        return conductivities, valid_mask
+
+    def max_error(self, num_samples=100000, seed=None):
+        """Compare the interpolation with the exact model at random points.
+
+        Returns the maximum absolute and relative errors over `num_samples`
+        points spread uniformly over the grid.
+        """
+        rng = np.random.default_rng(seed)
+        samples = [
+            rng.uniform(self._axes[name][0], self._axes[name][1], num_samples)
+            for name in AXIS_NAMES
+        ]
+        salt_ratios, pc_fractions, temperatures = samples
+        interpolated = self.interpolate(salt_ratios, pc_fractions,
+                                        temperatures)
+
+        coefs = estimator.calculate_coefs_batch(temperatures)
+        exact = estimator.evaluate_polynomial(coefs, salt_ratios,
+                                              pc_fractions) * 1e-3
+        errors = np.abs(interpolated - exact)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative_errors = errors / np.abs(exact)
+        return {
+            'max_abs_error': float(np.max(errors)),
+            'max_rel_error': float(np.nanmax(relative_errors)),
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def load_grid(filepath):
+    """Load the grid in `filepath` once per process (memory-mapped)."""
+    return ConductivityGrid.load(filepath)
@@ -0,0 +1,47 @@
+"""Module with utility functions to tag processes with the requests they handle."""
+
+# Prefix of the label of the processes that handle a single request, followed
+# by the uuid of the request.
+REQUEST_LABEL_PREFIX = 'finales-request:'
+
+# Label of the processes that handle a batch of requests; their uuids are
+# listed in the description, one per line.
+BATCH_LABEL = 'finales-batch'
+
+
+def get_request_label(request_uuid):
+    """Return the label of the process that handles the request."""
+    return f'{REQUEST_LABEL_PREFIX}{request_uuid}'
+
+
+def set_request_labels(builder, request_uuids):
+    """Tag the process of the builder with the uuids of its requests.
+
+    A process for a single request is labelled with its uuid (after the
+    `REQUEST_LABEL_PREFIX`). The tags are part of the metadata, so they are
+    stored together with the node on submission.
+    """
+    if len(request_uuids) == 1:
+        builder.metadata.label = get_request_label(request_uuids[0])
+    else:
+        builder.metadata.label = BATCH_LABEL
+        builder.metadata.description = '\n'.join(request_uuids)
+
+
+def get_request_uuids(label,
+                      description,
+                      extra_request_uuid=None,
+                      extra_request_uuids=None):
+    """Return the uuids of the requests handled by a process (or `None`).
+
+    Processes submitted by earlier versions were tagged afterwards with the
+    extras `request_uuid` or `request_uuids`; their values are used if the
+    label doesn't identify the requests.
+    """
+    if label and label.startswith(REQUEST_LABEL_PREFIX):
+        return [label[len(REQUEST_LABEL_PREFIX):]]
+    if label == BATCH_LABEL:
+        return description.split()
+    if extra_request_uuid is not None:
+        return [extra_request_uuid]
+    return extra_request_uuids
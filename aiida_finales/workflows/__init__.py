@@ -1,6 +1,7 @@
 """Workflows for aiida-finale."""
-from .conductivity_estimation import ConductivityEstimationWorkchain
+from .conductivity_estimation import ConductivityEstimationBatchWorkchain, ConductivityEstimationWorkchain
 
 __all__ = [
+    'ConductivityEstimationBatchWorkchain',
     'ConductivityEstimationWorkchain',
 ]
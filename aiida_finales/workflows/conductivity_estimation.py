@@ -3,7 +3,8 @@ from aiida import orm
 # from aiida.engine import ToContext
 from aiida.engine import WorkChain
 
-from aiida_finales.calculations import conductivity_estimation
+from aiida_finales.calculations import conductivity_estimation, conductivity_estimation_batch
+from aiida_finales.utils.request_labels import set_request_labels
 
 
 class ConductivityEstimationWorkchain(WorkChain):
@@ -20,6 +21,12 @@ class ConductivityEstimationWorkchain(WorkChain):
             valid_type=orm.Dict,
             help='Input data.'
         )
+        spec.input(
+            'grid_file',
+            valid_type=orm.Str,
+            required=False,
+            help='Path of a precomputed conductivity grid to interpolate from.'
+        )
 
         spec.output(
             'output_data',
@@ -33,19 +40,106 @@ class ConductivityEstimationWorkchain(WorkChain):
         )
 
     @classmethod
-    def get_builder_from_inputs(cls, input_data):
-        """Create the builder from the inputs."""
-        builder = cls.get_builder()
-        parameters = input_data['request']['parameters']['molecular_dynamics']
-        if len(parameters['formulation']) == 0:
+    def can_process(cls, input_data):
+        """Return whether a process can be created for the request."""
+        return has_formulation(input_data)
+
+    @classmethod
+    def get_builder_from_inputs(cls, input_data, grid_file=None):
+        """Create the builder from the inputs.
+
+        The process is labelled with the uuid of the request, and uses the
+        precomputed conductivity grid in `grid_file` if one is given.
+        """
+        if not has_formulation(input_data):
             return None
+        builder = cls.get_builder()
         builder.input_data = orm.Dict(dict=input_data)
+        if grid_file is not None:
+            builder.grid_file = orm.Str(grid_file)
+        set_request_labels(builder, [input_data['uuid']])
         return builder
 
     def execute_procedure(self):
         """Submit the calculation."""
-        output_node = conductivity_estimation(input_node=self.inputs.input_data)
+        output_node = conductivity_estimation(**get_calculation_inputs(self.inputs))
+        self.out('output_data', output_node)
+
+
+class ConductivityEstimationBatchWorkchain(WorkChain):
+    """This workflow estimates the conductivity for many requests at once."""
+
+    @classmethod
+    def define(cls, spec):
+        """Define the process specification."""
+        # yapf: disable
+        super().define(spec)
+
+        spec.input(
+            'input_data',
+            valid_type=orm.Dict,
+            help='Input data, with the list of `requests` to process.'
+        )
+        spec.input(
+            'grid_file',
+            valid_type=orm.Str,
+            required=False,
+            help='Path of a precomputed conductivity grid to interpolate from.'
+        )
+
+        spec.output(
+            'output_data',
+            valid_type=orm.Dict,
+            help='Output data, with the `results` and `errors` per request uuid.'
+        )
+
+        spec.outline(
+            cls.execute_procedure,
+        )
+
+    @classmethod
+    def get_builder_from_batch(cls, requests_data, grid_file=None):
+        """Create the builder from the data of many requests.
+
+        Requests without a formulation are left out of the batch; returns
+        `None` if none of them can be processed. The process is tagged with
+        the uuids of the requests in the batch, and uses the precomputed
+        conductivity grid in `grid_file` if one is given.
+        """
+        requests_valid = []
+        for request_data in requests_data:
+            if has_formulation(request_data):
+                requests_valid.append(request_data)
+
+        if len(requests_valid) == 0:
+            return None
+
+        builder = cls.get_builder()
+        builder.input_data = orm.Dict(dict={'requests': requests_valid})
+        if grid_file is not None:
+            builder.grid_file = orm.Str(grid_file)
+        set_request_labels(
+            builder, [request_data['uuid'] for request_data in requests_valid])
+        return builder
+
+    def execute_procedure(self):
+        """Run the calculation for the whole batch."""
+        output_node = conductivity_estimation_batch(**get_calculation_inputs(self.inputs))
         self.out('output_data', output_node)
+
+
+def has_formulation(request_data):
+    """Return whether the request has a formulation to estimate."""
+    parameters = request_data['request']['parameters']['molecular_dynamics']
+    return len(parameters['formulation']) > 0
+
+
+def get_calculation_inputs(inputs):
+    """Return the inputs of the workflow to pass on to the calculation."""
+    calculation_inputs = {'input_node': inputs.input_data}
+    if 'grid_file' in inputs:
+        calculation_inputs['grid_file'] = inputs.grid_file
+    return calculation_inputs
 #
 # I get a 'cannot submit a process function'. What is up with that???
 #
@@ -0,0 +1,68 @@
+"""Fixtures for the benchmarks."""
+import datetime
+import os
+
+from plumpy import ProcessState
+import pytest
+
+from aiida import orm
+from aiida.common.timezone import now
+from aiida.manage import get_manager
+from aiida.orm.entities import EntityTypes
+
+from aiida_finales.engine.standin import StandinServer
+from aiida_finales.engine.tenant.main import get_relevant_process_types
+from aiida_finales.utils.request_labels import get_request_label
+
+# Sizes of the database for the benchmarks of the tenant, overridable with
+# a comma separated list (e.g. `1000,10000` for a quick local run).
+NUM_NODES = [
+    int(num_nodes) for num_nodes in os.environ.get(
+        'AIIDA_FINALES_BENCHMARK_NODES', '10000,100000').split(',')
+]
+
+
+@pytest.fixture
+def standin_server():
+    """Run a stand-in server in a background thread."""
+    with StandinServer() as server:
+        yield server
+
+
+@pytest.fixture
+def populate_workflows():
+    """Return a function inserting workflow nodes of the tenant in bulk.
+
+    The nodes are inserted directly in the storage (going through the ORM
+    would take longer than the benchmarks), labelled with the given request
+    uuids and marked as running or finished. Their modification times are
+    one second apart and end an hour ago, as in a long history of workflows
+    of which only the first refresh of the index loads the bulk.
+    """
+
+    def _populate(request_uuids, process_state=ProcessState.FINISHED):
+        request_uuids = list(request_uuids)
+        process_type = get_relevant_process_types()[0]
+        user_id = orm.User.collection.get_default().pk
+        attributes = {'process_state': process_state.value}
+        if process_state == ProcessState.FINISHED:
+            attributes['exit_status'] = 0
+        start_time = now() - datetime.timedelta(hours=1,
+                                                seconds=len(request_uuids))
+        rows = []
+        for index, request_uuid in enumerate(request_uuids):
+            timestamp = start_time + datetime.timedelta(seconds=index)
+            rows.append({
+                'node_type': 'process.workflow.workchain.WorkChainNode.',
+                'process_type': process_type,
+                'label': get_request_label(request_uuid),
+                'description': '',
+                'attributes': attributes,
+                'user_id': user_id,
+                'ctime': timestamp,
+                'mtime': timestamp,
+            })
+        storage = get_manager().get_profile_storage()
+        return storage.bulk_insert(EntityTypes.NODE, rows, allow_defaults=True)
+
+    return _populate
@@ -0,0 +1,48 @@
+"""Benchmarks of the round trips of the client to the server."""
+import pytest
+
+from aiida_finales.engine.client import FinalesClient
+from aiida_finales.utils.create_request import create_request
+from aiida_finales.utils.create_result import wrap_results
+
+
+def create_client(server):
+    """Create a client for the stand-in server, without throttling."""
+    return FinalesClient('127.0.0.1',
+                         server.server_address[1],
+                         requests_per_second=None,
+                         max_retries=0)
+
+
+def test_get_capabilities(benchmark, standin_server):
+    """Get the capabilities of the server (the cheapest round trip)."""
+    client = create_client(standin_server)
+    assert benchmark(client.get_capabilities)
+
+
+@pytest.mark.parametrize('num_pending', [100, 10000])
+def test_get_pending_requests(benchmark, standin_server, num_pending):
+    """Download the pending requests, as every cycle of the tenant does."""
+    standin_server.state.seed_requests(num_pending, seed=0)
+    client = create_client(standin_server)
+    pending = benchmark(client.get_pending_requests,
+                        quantity='conductivity',
+                        method='molecular_dynamics')
+    assert len(pending) == num_pending
+
+
+def test_post_request_and_result(benchmark, standin_server):
+    """Post a request and its result."""
+    client = create_client(standin_server)
+    request_data = create_request(temp=298.0, conc_li=0.1, conc_pc=0.9)
+
+    def post_request_and_result():
+        request_uuid = client.post_request(request_data)
+        request_object = {'uuid': request_uuid, 'request': request_data}
+        client.post_result(
+            wrap_results(request_object, {'value': 1.0}, 'molecular_dynamics',
+                         'tenant-uuid'), request_uuid)
+        return request_uuid
+
+    request_uuid = benchmark(post_request_and_result)
+    assert request_uuid in standin_server.state.result_times
@@ -0,0 +1,60 @@
+"""Benchmarks of the conductivity estimator."""
+import numpy as np
+import pytest
+
+from aiida_finales.utils import conductivity_estimator as estimator
+from aiida_finales.utils.conductivity_grid import ConductivityGrid
+
+
+def create_compositions(num_rows):
+    """Return random compositions and temperatures within the model."""
+    rng = np.random.default_rng(0)
+    values_lpf = rng.uniform(0.05, 0.3, num_rows)
+    values_ecs = rng.uniform(0.0, 0.9, num_rows) * (1.0 - values_lpf)
+    values_pcs = 1.0 - values_lpf - values_ecs
+    temps = rng.uniform(243.0, 333.0, num_rows)
+    return values_lpf, values_ecs, values_pcs, temps
+
+
+def test_estimate_conductivity(benchmark):
+    """Estimate the conductivity of a single composition."""
+    result = benchmark(estimator.estimate_conductivity, 0.1, 0.25, 0.65, 298.0)
+    assert result > 0
+
+
+def test_calculate_coefs_cached(benchmark):
+    """Look up the coefficients of a temperature already in the cache."""
+    estimator.calculate_coefs(298.0)
+    assert len(benchmark(estimator.calculate_coefs, 298.0)) == 10
+
+
+def test_calculate_coefs_uncached(benchmark):
+    """Interpolate the coefficients of a temperature not in the cache."""
+
+    def calculate_uncached():
+        estimator.clear_coefs_cache()
+        return estimator.calculate_coefs(298.0)
+
+    assert len(benchmark(calculate_uncached)) == 10
+
+
+@pytest.mark.parametrize('num_rows', [100, 10000])
+def test_estimate_conductivity_batch(benchmark, num_rows):
+    """Estimate the conductivity of many compositions at once."""
+    conductivities, valid_mask = benchmark(
+        estimator.estimate_conductivity_batch, *create_compositions(num_rows))
+    assert valid_mask.all()
+    assert conductivities.shape == (num_rows, )
+
+
+@pytest.mark.parametrize('num_rows', [100, 10000])
+def test_estimate_conductivity_grid(benchmark, tmp_path, num_rows):
+    """Interpolate the conductivity of many compositions from the grid."""
+    filepath = tmp_path / 'grid.npy'
+    ConductivityGrid.build().save(filepath)
+    grid = ConductivityGrid.load(filepath)
+
+    conductivities, valid_mask = benchmark(grid.estimate_batch,
+                                           *create_compositions(num_rows))
+    assert valid_mask.all()
+    assert conductivities.shape == (num_rows, )
@@ -0,0 +1,34 @@
+"""Benchmarks of the creation of the requests and results."""
+from aiida_finales.utils.create_request import create_request
+from aiida_finales.utils.create_result import create_result, wrap_results
+
+
+def test_create_request(benchmark):
+    """Create the data of a conductivity request."""
+    request_data = benchmark(create_request,
+                             temp=298.0,
+                             conc_li=0.1,
+                             conc_ec=0.25,
+                             conc_pc=0.65)
+    assert request_data['quantity'] == 'conductivity'
+
+
+def test_create_result(benchmark):
+    """Create the data of a conductivity result."""
+    formulation = create_request(
+        conc_li=0.1, conc_ec=0.25,
+        conc_pc=0.65)['parameters']['molecular_dynamics']['formulation']
+    result_object = benchmark(create_result, 1.0e-3, 298.0, formulation,
+                              'calcjob-uuid')
+    assert result_object['conductivity']['values'] == [1.0e-3]
+
+
+def test_wrap_results(benchmark):
+    """Wrap a result to be posted to the server."""
+    request_object = {
+        'uuid': 'request-uuid',
+        'request': create_request(temp=298.0, conc_li=0.1, conc_pc=0.9),
+    }
+    result_message = benchmark(wrap_results, request_object, {'value': 1.0},
+                               'molecular_dynamics', 'tenant-uuid')
+    assert result_message['request_uuid'] == 'request-uuid'
@@ -0,0 +1,98 @@
+"""Benchmarks of the tenant against databases of increasing size."""
+import uuid
+
+from plumpy import ProcessState
+import pytest
+
+from aiida_finales.engine.client import FinalesClient
+from aiida_finales.engine.tenant import AiidaTenant
+
+from .conftest import NUM_NODES
+
+# Pending requests on the server in the benchmark of the full cycle.
+NUM_PENDING = 1000
+
+
+def create_tenant(server=None):
+    """Create a tenant that fetches the requests in the main thread."""
+    port = 0 if server is None else server.server_address[1]
+    client = FinalesClient('127.0.0.1', port, requests_per_second=None)
+    return AiidaTenant(client, pipelined=False, max_ongoing_processes=1)
+
+
+@pytest.mark.parametrize('num_nodes', NUM_NODES)
+def test_query_requests_submitted_full(benchmark, populate_workflows,
+                                       num_nodes):
+    """Load the whole history of workflows, as a (re)started tenant does."""
+    populate_workflows(str(uuid.uuid4()) for _ in range(num_nodes))
+
+    submitted_requests = benchmark.pedantic(
+        lambda tenant: tenant.query_requests_submitted(),
+        setup=lambda: ((create_tenant(), ), {}),
+        rounds=3)
+    assert len(submitted_requests['finished']) == num_nodes
+
+
+@pytest.mark.parametrize('num_nodes', NUM_NODES)
+def test_query_requests_submitted_incremental(benchmark, populate_workflows,
+                                              num_nodes):
+    """Refresh the index of a running tenant when nothing changed."""
+    populate_workflows(str(uuid.uuid4()) for _ in range(num_nodes))
+    tenant = create_tenant()
+    tenant.query_requests_submitted()
+
+    submitted_requests = benchmark(tenant.query_requests_submitted)
+    assert len(submitted_requests['finished']) == num_nodes
+
+
+@pytest.mark.parametrize('num_nodes', NUM_NODES)
+def test_run_cycle(benchmark, standin_server, populate_workflows, num_nodes):
+    """Run a cycle with pending requests both in process and new.
+
+    Half of the pending requests have running workflows and the other half
+    are prepared and queued (the running workflows take up all the slots, so
+    nothing is submitted); the rest of the database is finished workflows.
+    """
+    pending_uuids = standin_server.state.seed_requests(NUM_PENDING, seed=0)
+    populate_workflows(pending_uuids[:NUM_PENDING // 2],
+                       process_state=ProcessState.RUNNING)
+    populate_workflows(
+        str(uuid.uuid4()) for _ in range(num_nodes - NUM_PENDING // 2))
+
+    cycle_record = benchmark.pedantic(lambda tenant: tenant.run_cycle(),
+                                      setup=lambda:
+                                      ((create_tenant(standin_server), ), {}),
+                                      rounds=3)
+    assert cycle_record['num_pending'] == NUM_PENDING
+    assert cycle_record['num_queued'] == NUM_PENDING // 2
+    assert cycle_record['num_submitted'] == 0
+
+
+def test_run_cycle_inline(benchmark, standin_server):
+    """Evaluate the pending requests inline and post their results.
+
+    Every round runs a cycle on new pending requests and then flushes the
+    outbox, so the time includes posting all the results to the server.
+    """
+    port = standin_server.server_address[1]
+
+    def create_inline_tenant():
+        standin_server.state.seed_requests(NUM_PENDING)
+        client = FinalesClient('127.0.0.1', port, requests_per_second=None)
+        tenant = AiidaTenant(client,
+                             inline=True,
+                             pipelined=False,
+                             max_ongoing_processes=1)
+        return (tenant, ), {}
+
+    def run_cycle_and_flush(tenant):
+        cycle_record = tenant.run_cycle()
+        cycle_record['num_posted'] = tenant.outbox_flusher.flush_all()
+        return cycle_record
+
+    cycle_record = benchmark.pedantic(run_cycle_and_flush,
+                                      setup=create_inline_tenant,
+                                      rounds=3)
+    assert cycle_record['num_inline'] == NUM_PENDING
+    assert cycle_record['num_posted'] == NUM_PENDING
+    assert not standin_server.state.get_pending()
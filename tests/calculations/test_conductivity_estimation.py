@@ -0,0 +1,85 @@
+"""Tests for the conductivity estimation calculations."""
+import pytest
+
+from aiida import orm
+
+from aiida_finales.calculations import conductivity_estimation, conductivity_estimation_batch
+from aiida_finales.utils.conductivity_grid import ConductivityGrid
+from aiida_finales.utils.create_request import create_request
+
+
+def create_request_data(request_uuid, **kwargs):
+    """Create the data of a request as it is received from the server."""
+    return {'uuid': request_uuid, 'request': create_request(**kwargs)}
+
+
+def test_batch_matches_single():
+    """The batch calculation gives the same results as the single one."""
+    requests_data = [
+        create_request_data('request-1',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_ec=0.25,
+                            conc_pc=0.65),
+        create_request_data('request-2',
+                            temp=300,
+                            conc_li=0.05,
+                            conc_ec=0.5,
+                            conc_pc=0.45),
+    ]
+    batch_node = conductivity_estimation_batch(
+        orm.Dict(dict={'requests': requests_data}))
+    batch_output = batch_node.get_dict()
+    assert batch_output['errors'] == {}
+
+    for request_data in requests_data:
+        single_node = conductivity_estimation(orm.Dict(dict=request_data))
+        single_value = single_node['conductivity']['values'][0]
+        batch_result = batch_output['results'][request_data['uuid']]
+        assert batch_result['conductivity']['values'][0] == pytest.approx(
+            single_value)
+
+
+def test_batch_reports_errors():
+    """Requests the model can't evaluate are reported as errors."""
+    requests_data = [
+        create_request_data('request-ok',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_ec=0.25,
+                            conc_pc=0.65),
+        create_request_data('request-no-pc',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_ec=0.9),
+    ]
+    batch_node = conductivity_estimation_batch(
+        orm.Dict(dict={'requests': requests_data}))
+    batch_output = batch_node.get_dict()
+    assert list(batch_output['results']) == ['request-ok']
+    assert list(batch_output['errors']) == ['request-no-pc']
+
+
+def test_estimation_with_grid(tmp_path):
+    """The calculations can interpolate from a precomputed grid."""
+    filepath = tmp_path / 'grid.npy'
+    ConductivityGrid.build((51, 51, 46)).save(filepath)
+    request_data = create_request_data('request-1',
+                                       temp=250,
+                                       conc_li=0.1,
+                                       conc_ec=0.25,
+                                       conc_pc=0.65)
+
+    exact_node = conductivity_estimation(orm.Dict(dict=request_data))
+    grid_node = conductivity_estimation(orm.Dict(dict=request_data),
+                                        grid_file=orm.Str(str(filepath)))
+    batch_node = conductivity_estimation_batch(
+        orm.Dict(dict={'requests': [request_data]}),
+        grid_file=orm.Str(str(filepath)))
+
+    exact_value = exact_node['conductivity']['values'][0]
+    grid_value = grid_node['conductivity']['values'][0]
+    batch_result = batch_node['results']['request-1']
+    batch_value = batch_result['conductivity']['values'][0]
+    assert grid_value == pytest.approx(exact_value, rel=1e-2)
+    assert batch_value == pytest.approx(grid_value)
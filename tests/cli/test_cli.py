@@ -1,10 +1,44 @@
 """Tests for command line interface."""
+import json
+import subprocess
+import sys
+
 from click.testing import CliRunner
 
 from aiida_finales.cli import cmd_root
 
+# Seconds allowed to import the command line and load all its groups.
+IMPORT_TIME_BUDGET = 0.5
+
+# Imports the command line and the client as the light commands do, and
+# reports the time it took and which heavy packages were imported.
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import click
+from aiida_finales.cli import cmd_root
+context = click.Context(cmd_root)
+for name in cmd_root.list_commands(context):
+    cmd_root.get_command(context, name)
+elapsed = time.perf_counter() - start
+from aiida_finales.engine.client import FinalesClientConfig
+heavy = sorted({name.split('.')[0] for name in sys.modules} & {'aiida', 'scipy'})
+print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))
+"""
+
 
 def test_cli():
     """Initial test function."""
     runner = CliRunner()
     runner.invoke(cmd_root, '--help', catch_exceptions=False)
+
+
+def test_import_time():
+    """The command line and the client do not import AiiDA nor scipy."""
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT],
+                            check=True,
+                            capture_output=True,
+                            text=True).stdout
+    report = json.loads(output)
+    assert report['heavy'] == []
+    assert report['elapsed'] < IMPORT_TIME_BUDGET
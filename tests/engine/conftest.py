@@ -0,0 +1,66 @@
+"""Fixtures for the tests of the engine."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Handler that records the client ports and fails on demand."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Reply with an empty list (or an error if scheduled)."""
+        self.server.client_ports.add(self.client_address[1])
+        self.server.get_count += 1
+        if self.server.failures_left > 0:
+            self.server.failures_left -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        query = parse_qs(urlparse(self.path).query)
+        self.server.queries.append(query)
+        pending = self.server.pending
+        if 'offset' in query and self.server.paginate:
+            offset = int(query['offset'][0])
+            pending = pending[offset:offset + int(query['limit'][0])]
+        body = json.dumps(pending).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Echo back the posted data."""
+        length = int(self.headers['Content-Length'])
+        body = self.rfile.read(length)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output clean."""
+
+
+@pytest.fixture
+def recording_server():
+    """Run a recording server in a background thread."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.client_ports = set()
+    server.get_count = 0
+    server.failures_left = 0
+    server.queries = []
+    server.pending = []
+    server.paginate = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,113 @@
+"""Tests for the cache of results."""
+from aiida_finales.engine.tenant.cache import ResultCache, normalize_parameters
+from aiida_finales.utils.create_request import create_request
+
+METHOD = 'molecular_dynamics'
+
+
+class FakeClock:
+    """Clock that only advances when told to."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def create_request_data(**kwargs):
+    """Create the data of a request as it is received from the server."""
+    return {'uuid': 'request-uuid', 'request': create_request(**kwargs)}
+
+
+def test_normalize_parameters():
+    """Equivalent parameters are normalized to the same data."""
+    params_one = create_request(temp=250.0000001,
+                                conc_li=0.1,
+                                conc_ec=0.25,
+                                conc_pc=0.65)['parameters'][METHOD]
+    params_two = create_request(temp=250,
+                                conc_li=0.1,
+                                conc_ec=0.25,
+                                conc_pc=0.65)['parameters'][METHOD]
+    params_two['formulation'].reverse()
+
+    assert normalize_parameters(params_one) == normalize_parameters(params_two)
+
+
+def test_cache_hits_and_misses():
+    """Results are reused for requests with the same parameters."""
+    cache = ResultCache()
+    request_data = create_request_data(temp=250, conc_li=0.1, conc_pc=0.9)
+
+    assert cache.lookup(request_data, METHOD) is None
+    cache.store(request_data, METHOD, {'value': 1.0})
+    assert cache.lookup(request_data, METHOD) == {'value': 1.0}
+
+    other_request = create_request_data(temp=260, conc_li=0.1, conc_pc=0.9)
+    assert cache.lookup(other_request, METHOD) is None
+
+    assert cache.get_stats() == {
+        'hits': 1,
+        'misses': 2,
+        'hit_rate': 1 / 3,
+        'size': 1,
+    }
+
+
+def test_cache_ttl():
+    """Expired results are not reused."""
+    clock = FakeClock()
+    cache = ResultCache(ttl=10.0, clock=clock)
+    request_data = create_request_data(temp=250, conc_li=0.1, conc_pc=0.9)
+
+    cache.store(request_data, METHOD, {'value': 1.0})
+    clock.now = 5.0
+    assert cache.lookup(request_data, METHOD) == {'value': 1.0}
+    clock.now = 11.0
+    assert cache.lookup(request_data, METHOD) is None
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    """The least recently used results are evicted first."""
+    clock = FakeClock()
+    cache = ResultCache(max_entries=2, clock=clock)
+    requests_data = [
+        create_request_data(temp=temp, conc_li=0.1, conc_pc=0.9)
+        for temp in (250, 260, 270)
+    ]
+
+    cache.store(requests_data[0], METHOD, {'value': 0})
+    clock.now = 1.0
+    cache.store(requests_data[1], METHOD, {'value': 1})
+    clock.now = 2.0
+    cache.lookup(requests_data[0], METHOD)
+    clock.now = 3.0
+    cache.store(requests_data[2], METHOD, {'value': 2})
+
+    assert len(cache) == 2
+    assert cache.lookup(requests_data[1], METHOD) is None
+    assert cache.lookup(requests_data[0], METHOD) == {'value': 0}
+
+
+def test_cache_persistence(tmp_path):
+    """The results survive closing and reopening the cache."""
+    filepath = str(tmp_path / 'cache.sqlite')
+    request_data = create_request_data(temp=250, conc_li=0.1, conc_pc=0.9)
+
+    cache = ResultCache(filepath)
+    cache.store(request_data, METHOD, {'value': 1.0})
+    cache.close()
+
+    assert ResultCache(filepath).lookup(request_data, METHOD) == {'value': 1.0}
+
+
+def test_cache_disabled():
+    """A cache without entries never stores anything."""
+    cache = ResultCache(max_entries=0)
+    request_data = create_request_data(temp=250, conc_li=0.1, conc_pc=0.9)
+    cache.store(request_data, METHOD, {'value': 1.0})
+    assert cache.lookup(request_data, METHOD) is None
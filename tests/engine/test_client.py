@@ -0,0 +1,112 @@
+"""Tests for the FINALES client."""
+import asyncio
+
+import pytest
+
+from aiida_finales.engine.client import AsyncFinalesClient, FinalesClient, FinalesClientConfig
+
+
+def test_connection_reuse(recording_server):
+    """Consecutive calls share a single keep-alive connection."""
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    for _ in range(3):
+        assert client.get_pending_requests() == []
+    client.close()
+
+    assert recording_server.get_count == 3
+    assert len(recording_server.client_ports) == 1
+
+
+def test_retry_on_server_error(recording_server):
+    """GET requests are retried when the server replies with a 5xx."""
+    recording_server.failures_left = 2
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None,
+                           retry_backoff=0)
+
+    assert client.get_pending_requests() == []
+    assert recording_server.get_count == 3
+
+
+def test_config_connection_options():
+    """The connection options are read from the configuration."""
+    config = FinalesClientConfig(username='user',
+                                 host='localhost',
+                                 port=1234,
+                                 pool_maxsize=4,
+                                 read_timeout=2.5)
+    client = config.create_client()
+    assert client._connection._timeout == (5.0, 2.5)  # pylint: disable=protected-access
+
+
+def test_execution_delay_deprecated():
+    """The deprecated `execution_delay` is converted into a rate of calls."""
+    with pytest.warns(DeprecationWarning):
+        client = FinalesClient('localhost', 1234, execution_delay=0.25)
+    assert client.rate_limiter.rate == 4.0
+
+    config = FinalesClientConfig(username='user',
+                                 host='localhost',
+                                 port=1234,
+                                 execution_delay=0.5)
+    with pytest.warns(DeprecationWarning):
+        client = config.create_client()
+    assert client.rate_limiter.rate == 2.0
+
+    with pytest.warns(DeprecationWarning):
+        client = FinalesClient('localhost', 1234, execution_delay=0)
+    assert client.rate_limiter.rate is None
+
+
+def test_async_post_results(recording_server):
+    """Results are posted concurrently and replies keep the input order."""
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None,
+                           pool_maxsize=4)
+    async_client = AsyncFinalesClient.from_client(client)
+    assert async_client.max_concurrency == 4
+
+    results = [({'index': index}, f'request-{index}') for index in range(10)]
+    replies = asyncio.run(async_client.post_results(results))
+    assert replies == [{'index': index} for index in range(10)]
+
+    assert asyncio.run(async_client.get_pending_requests()) == []
+    async_client.close()
+    client.close()
+
+
+def test_iter_pending_requests_pages(recording_server):
+    """The pending requests are fetched page by page."""
+    recording_server.pending = [{'uuid': str(index)} for index in range(5)]
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+
+    iterator = client.iter_pending_requests(quantity='conductivity',
+                                            page_size=2)
+    assert next(iterator) == {'uuid': '0'}
+    assert recording_server.get_count == 1
+
+    assert [data['uuid'] for data in iterator] == ['1', '2', '3', '4']
+    assert recording_server.get_count == 3
+    assert recording_server.queries[-1]['quantity'] == ['conductivity']
+    assert recording_server.queries[-1]['offset'] == ['4']
+
+
+def test_iter_pending_requests_no_pagination(recording_server):
+    """The iteration stops if the server ignores the pagination."""
+    recording_server.pending = [{'uuid': str(index)} for index in range(5)]
+    recording_server.paginate = False
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+
+    uuids = [
+        data['uuid'] for data in client.iter_pending_requests(page_size=2)
+    ]
+    assert uuids == ['0', '1', '2', '3', '4']
+    assert recording_server.get_count == 2
@@ -0,0 +1,146 @@
+"""Tests for the incremental index of submitted workflows."""
+from plumpy import ProcessState
+
+from aiida import orm
+
+from aiida_finales.engine.tenant.index import ProcessIndex, classify_process
+from aiida_finales.utils import request_labels
+
+PROCESS_TYPE = 'aiida_finales.workflows.conductivity_estimation.ConductivityEstimationWorkchain'
+
+
+def create_workflow_node(request_uuid, process_type=PROCESS_TYPE):
+    """Create a stored workflow node that is still running."""
+    node = orm.WorkflowNode()
+    node.process_type = process_type
+    node.set_process_state(ProcessState.RUNNING)
+    if request_uuid is not None:
+        node.label = request_labels.get_request_label(request_uuid)
+    node.store()
+    return node
+
+
+def finish_workflow_node(node, exit_status=0):
+    """Mark the workflow node as finished."""
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(exit_status)
+
+
+def test_classify_process():
+    """The process state and exit status map to the tenant categories."""
+    assert classify_process('running', None) == 'ongoing'
+    assert classify_process('waiting', None) == 'ongoing'
+    assert classify_process('finished', 0) == 'finished'
+    assert classify_process('finished', 300) == 'excepted'
+    assert classify_process('excepted', None) == 'excepted'
+
+
+def test_index_incremental_updates():
+    """The index follows the workflows through their state changes."""
+    node_one = create_workflow_node('request-1')
+    node_two = create_workflow_node('request-2')
+    create_workflow_node('request-3', process_type='other.process.Type')
+    create_workflow_node(None)
+
+    index = ProcessIndex([PROCESS_TYPE])
+    assert index.refresh() == 2
+    assert index.submitted_requests['ongoing'] == {
+        'request-1': node_one.pk,
+        'request-2': node_two.pk,
+    }
+
+    finish_workflow_node(node_one)
+    finish_workflow_node(node_two, exit_status=1)
+    assert index.refresh() == 2
+    assert index.submitted_requests['ongoing'] == {}
+    assert index.submitted_requests['finished'] == {'request-1': node_one.pk}
+    assert index.submitted_requests['excepted'] == {'request-2': [node_two.pk]}
+
+    assert index.refresh() == 0
+    assert len(index) == 2
+
+    # Nodes modified without changing state are not counted as updated
+    node_one.base.extras.set('touched', True)
+    assert index.refresh() == 0
+
+
+def test_index_batch_workflows():
+    """Batch workflows are indexed under each of their requests."""
+    node = orm.WorkflowNode()
+    node.process_type = PROCESS_TYPE
+    node.set_process_state(ProcessState.RUNNING)
+    node.label = request_labels.BATCH_LABEL
+    node.description = 'request-1\nrequest-2'
+    node.store()
+
+    index = ProcessIndex([PROCESS_TYPE])
+    index.refresh()
+    assert index.submitted_requests['ongoing'] == {
+        'request-1': node.pk,
+        'request-2': node.pk,
+    }
+
+    finish_workflow_node(node)
+    index.refresh()
+    assert index.submitted_requests['ongoing'] == {}
+    assert set(
+        index.submitted_requests['finished']) == {'request-1', 'request-2'}
+
+
+def test_get_request_uuids():
+    """The requests are recovered from the label and description."""
+    get_request_uuids = request_labels.get_request_uuids
+    assert get_request_uuids('', '') is None
+    assert get_request_uuids('request-1', '') is None
+    assert get_request_uuids(request_labels.get_request_label('request-1'),
+                             '') == ['request-1']
+    batch_uuids = get_request_uuids(request_labels.BATCH_LABEL,
+                                    'request-1\nrequest-2')
+    assert batch_uuids == ['request-1', 'request-2']
+    assert get_request_uuids('', '', 'request-1') == ['request-1']
+    assert get_request_uuids('', '', None, ['request-1']) == ['request-1']
+
+
+def test_index_legacy_extras():
+    """Workflows tagged with extras by earlier versions are still indexed."""
+    node_one = create_workflow_node(None)
+    node_one.base.extras.set('request_uuid', 'request-1')
+    node_two = create_workflow_node(None)
+    node_two.base.extras.set('request_uuids', ['request-2', 'request-3'])
+
+    index = ProcessIndex([PROCESS_TYPE])
+    assert index.refresh() == 2
+    assert index.submitted_requests['ongoing'] == {
+        'request-1': node_one.pk,
+        'request-2': node_two.pk,
+        'request-3': node_two.pk,
+    }
+
+
+def test_index_group_scope():
+    """Only the members of the group are indexed."""
+    node_one = create_workflow_node('request-1')
+    create_workflow_node('request-2')
+    group = orm.Group(label='tenant-group').store()
+    group.add_nodes(node_one)
+
+    index = ProcessIndex([PROCESS_TYPE], group=group)
+    assert index.refresh() == 1
+    assert index.submitted_requests['ongoing'] == {'request-1': node_one.pk}
+    assert index.num_active == 1
+
+
+def test_index_mark_excepted():
+    """Requests without a result in a finished batch are moved to excepted."""
+    node = create_workflow_node('request-1')
+    finish_workflow_node(node)
+
+    index = ProcessIndex([PROCESS_TYPE])
+    index.refresh()
+    index.mark_excepted('request-1', node.pk)
+    index.mark_excepted('request-1', node.pk)
+    assert index.submitted_requests['finished'] == {}
+    assert index.submitted_requests['excepted'] == {'request-1': [node.pk]}
+
+    assert index.refresh() == 0
+    assert index.submitted_requests['excepted'] == {'request-1': [node.pk]}
@@ -0,0 +1,47 @@
+"""Tests for the ledger of reported results."""
+import os
+
+import pytest
+
+from aiida_finales.engine.tenant import AiidaTenantConfig
+from aiida_finales.engine.tenant.ledger import ReportLedger
+
+
+def test_ledger_record():
+    """Reported requests are found in the ledger with their replies."""
+    ledger = ReportLedger()
+    assert 'request-1' not in ledger
+
+    ledger.record('request-1', {'message': 'ok'})
+    ledger.record_many([('request-2', None), ('request-3', [1, 2])])
+
+    assert 'request-1' in ledger
+    assert len(ledger) == 3
+    assert ledger.get_reply('request-1') == {'message': 'ok'}
+    assert ledger.get_reply('request-3') == [1, 2]
+    with pytest.raises(KeyError):
+        ledger.get_reply('request-4')
+
+
+def test_ledger_survives_restarts(tmp_path):
+    """The ledger is reloaded from its file."""
+    filepath = str(tmp_path / 'ledger.sqlite')
+    ledger = ReportLedger(filepath)
+    ledger.record('request-1', {'message': 'ok'})
+    ledger.close()
+
+    ledger = ReportLedger(filepath)
+    assert 'request-1' in ledger
+    assert ledger.get_reply('request-1') == {'message': 'ok'}
+
+
+def test_ledger_default_file():
+    """The tenant configuration keeps the ledger in a file by default."""
+    filepath = AiidaTenantConfig(tenant_uuid='tenant-1',
+                                 instance_index=1).get_ledger_file()
+    assert filepath.endswith(
+        os.path.join('tenant-1', 'instance-1', 'ledger.sqlite'))
+    assert os.path.isdir(os.path.dirname(filepath))
+
+    tenant_config = AiidaTenantConfig(ledger_file=':memory:')
+    assert tenant_config.get_ledger_file() == ':memory:'
@@ -0,0 +1,57 @@
+"""Tests for the load test against the stand-in server."""
+import threading
+
+import numpy as np
+
+from aiida_finales.engine.loadtest import LoadTest, generate_requests, percentile
+from aiida_finales.engine.standin import StandinServer
+from aiida_finales.utils.conductivity_estimator import validate_batch
+from aiida_finales.utils.create_result import wrap_results
+
+
+def test_percentile():
+    """Percentiles follow the nearest-rank method."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([3.0], 0.95) == 3.0
+
+
+def test_generate_grid_requests():
+    """The grid requests are unique and within the range of the model."""
+    requests_data = generate_requests(30, mode='grid')
+    assert len(requests_data) == 30
+
+    parameters = [
+        request_data['parameters']['molecular_dynamics']
+        for request_data in requests_data
+    ]
+    assert len({repr(params) for params in parameters}) == 30
+    fractions = np.array(
+        [[component['fraction'] for component in params['formulation']]
+         for params in parameters])
+    temperatures = np.array([params['temperature'] for params in parameters])
+    assert validate_batch(*fractions.T, temperatures).all()
+
+
+def test_load_test_report():
+    """The latency of every request is measured until its result arrives."""
+    with StandinServer() as server:
+        load_test = LoadTest(server, 20, concurrency=4, seed=0)
+        assert len(load_test.post_requests()) == 20
+
+        def answer_requests():
+            """Answer all the pending requests, as a tenant would."""
+            for request_object in server.state.get_pending():
+                server.state.add_result(
+                    wrap_results(request_object, {'value': 1.0},
+                                 'molecular_dynamics', 'tenant-1'))
+
+        threading.Timer(0.05, answer_requests).start()
+        assert load_test.wait_for_results(timeout=10.0)
+
+    report = load_test.get_report()
+    assert report['num_completed'] == 20
+    assert report['throughput'] > 0
+    latency = report['latency']
+    assert 0 < latency['p50'] <= latency['p95'] <= latency['p99']
@@ -0,0 +1,42 @@
+"""Tests for the logging helpers."""
+import json
+import logging
+
+from aiida_finales.engine.logs import SampledLogger, StructuredFormatter
+
+
+def create_record(**fields):
+    """Create a log record with extra fields."""
+    record = logging.LogRecord('aiida_finales.test', logging.INFO, __file__, 1,
+                               'Cycle took %.1fs', (1.25, ), None)
+    record.__dict__.update(fields)
+    return record
+
+
+def test_structured_formatter():
+    """The extra fields are included in both formats."""
+    record = create_record(num_pending=3)
+    text = StructuredFormatter('text').format(record)
+    assert text.endswith('aiida_finales.test: Cycle took 1.2s num_pending=3')
+
+    entry = json.loads(StructuredFormatter('json').format(record))
+    assert entry['message'] == 'Cycle took 1.2s'
+    assert entry['level'] == 'INFO'
+    assert entry['num_pending'] == 3
+
+
+def test_sampled_logger(caplog):
+    """Only the sampled messages are emitted."""
+    samples = iter([0.05, 0.5, 0.2, 0.01])
+    logger = logging.getLogger('aiida_finales.test')
+    sampled_logger = SampledLogger(logger, 0.1, rng=lambda: next(samples))
+
+    with caplog.at_level(logging.DEBUG, logger='aiida_finales.test'):
+        for index in range(4):
+            sampled_logger.debug('Request %d', index)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        'Request 0',
+        'Request 3',
+    ]
+    assert sampled_logger.num_suppressed == 2
@@ -0,0 +1,69 @@
+"""Tests for the metrics of the tenant and the client."""
+import json
+import urllib.request
+
+import pytest
+
+from aiida_finales.engine.client import FinalesClient
+from aiida_finales.engine.metrics import REGISTRY, MetricsRegistry, MetricsServer
+
+
+def test_render_prometheus():
+    """The metrics are rendered in the Prometheus text format."""
+    registry = MetricsRegistry()
+    counter = registry.counter('calls_total', 'Calls.', ('endpoint', ))
+    counter.inc(endpoint='/results/')
+    counter.inc(2, endpoint='/results/')
+    registry.gauge('depth', 'Depth.').set(3)
+    histogram = registry.histogram('latency_seconds',
+                                   'Latency.',
+                                   buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    assert counter.get(endpoint='/results/') == 3
+    assert histogram.get()['buckets'] == [0, 1, 2]
+    text = registry.render_prometheus()
+    assert '# TYPE calls_total counter' in text
+    assert 'calls_total{endpoint="/results/"} 3.0' in text
+    assert 'depth 3.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_count 2' in text
+
+    with pytest.raises(ValueError):
+        counter.inc(method='GET')
+    with pytest.raises(ValueError):
+        registry.gauge('calls_total', 'Calls.')
+
+
+def test_metrics_server():
+    """The metrics are served over HTTP in both formats."""
+    registry = MetricsRegistry()
+    registry.counter('calls_total', 'Calls.').inc()
+    server = MetricsServer(registry, port=0)
+    server.start()
+    try:
+        baseurl = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(baseurl + '/metrics') as response:
+            assert 'calls_total 1.0' in response.read().decode()
+        with urllib.request.urlopen(baseurl + '/metrics.json') as response:
+            assert 'calls_total' in json.loads(response.read())
+    finally:
+        server.stop()
+
+
+def test_client_latency(recording_server):
+    """The latency of the calls is recorded per endpoint."""
+    histogram = REGISTRY['finales_client_request_seconds']
+    count_before = histogram.get(method='GET',
+                                 endpoint='/pending_requests/')['count']
+
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    client.get_pending_requests()
+
+    count_after = histogram.get(method='GET',
+                                endpoint='/pending_requests/')['count']
+    assert count_after == count_before + 1
@@ -0,0 +1,176 @@
+"""Tests for the outbox of results."""
+import os
+import socket
+
+from aiida_finales.engine.client import AsyncFinalesClient, FinalesClient
+from aiida_finales.engine.standin import StandinServer
+from aiida_finales.engine.tenant import AiidaTenantConfig
+from aiida_finales.engine.tenant.ledger import ReportLedger
+from aiida_finales.engine.tenant.outbox import OutboxFlusher, ResultOutbox
+from aiida_finales.utils.create_result import wrap_results
+
+
+class FakeClock:
+    """Clock that only advances when told to."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def get_unused_port():
+    """Return a local port where nothing is listening."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_outbox_queue():
+    """Results are queued once and served when due."""
+    clock = FakeClock()
+    outbox = ResultOutbox(clock=clock)
+    outbox.enqueue_many([('request-1', {
+        'value': 1
+    }), ('request-2', {
+        'value': 2
+    })])
+    outbox.enqueue_many([('request-1', {'value': 'duplicated'})])
+
+    assert len(outbox) == 2
+    assert 'request-1' in outbox
+    assert outbox.get_due(10) == [('request-1', {
+        'value': 1
+    }, 0), ('request-2', {
+        'value': 2
+    }, 0)]
+
+    outbox.reschedule('request-1', 5.0)
+    assert [due[0] for due in outbox.get_due(10)] == ['request-2']
+    clock.now = 5.0
+    assert outbox.get_due(10)[0] == ('request-1', {'value': 1}, 1)
+    assert outbox.oldest_age() == 5.0
+
+    outbox.complete(['request-1', 'request-2'])
+    assert len(outbox) == 0
+    assert 'request-1' not in outbox
+
+
+def test_outbox_persistence(tmp_path):
+    """Queued results survive closing and reopening the outbox."""
+    filepath = str(tmp_path / 'outbox.sqlite')
+    outbox = ResultOutbox(filepath)
+    outbox.enqueue_many([('request-1', {'value': 1})])
+    outbox.close()
+
+    outbox = ResultOutbox(filepath)
+    assert 'request-1' in outbox
+    assert outbox.get_due(10) == [('request-1', {'value': 1}, 0)]
+
+
+def test_outbox_default_file():
+    """The tenant configuration keeps the outbox in a file by default."""
+    filepath = AiidaTenantConfig().get_outbox_file()
+    assert filepath.endswith(
+        os.path.join('default', 'instance-0', 'outbox.sqlite'))
+
+    tenant_config = AiidaTenantConfig(outbox_file=':memory:')
+    assert tenant_config.get_outbox_file() == ':memory:'
+
+
+def test_flusher_posts_batches(recording_server):
+    """The flusher posts the queued results and records them."""
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    outbox = ResultOutbox()
+    ledger = ReportLedger()
+    flusher = OutboxFlusher(outbox,
+                            AsyncFinalesClient.from_client(client),
+                            ledger,
+                            batch_size=2)
+    outbox.enqueue_many([(f'request-{index}', {
+        'index': index
+    }) for index in range(5)])
+
+    assert flusher.flush_once() == 2
+    assert flusher.flush_all() == 3
+    assert len(outbox) == 0
+    assert len(ledger) == 5
+    assert ledger.get_reply('request-4') == {'index': 4}
+    assert flusher.get_stats()['num_posted'] == 5
+
+
+def test_flusher_backoff():
+    """Failed posts stay in the outbox and are retried later."""
+    client = FinalesClient('127.0.0.1',
+                           get_unused_port(),
+                           requests_per_second=None,
+                           max_retries=0)
+    clock = FakeClock()
+    outbox = ResultOutbox(clock=clock)
+    ledger = ReportLedger()
+    flusher = OutboxFlusher(outbox,
+                            AsyncFinalesClient.from_client(client),
+                            ledger,
+                            backoff_base=2.0)
+    outbox.enqueue_many([('request-1', {'value': 1})])
+
+    assert flusher.flush_once() == 0
+    assert 'request-1' in outbox
+    assert 'request-1' not in ledger
+    assert outbox.get_due(10) == []
+
+    clock.now = 2.0
+    assert outbox.get_due(10) == [('request-1', {'value': 1}, 1)]
+    assert flusher.get_stats()['num_failed'] == 1
+
+
+def test_flusher_error_replies():
+    """Error replies of the server are retried, not recorded as reported."""
+    clock = FakeClock()
+    outbox = ResultOutbox(clock=clock)
+    ledger = ReportLedger()
+    outbox.enqueue_many([('request-1', {'value': 1})])
+
+    with StandinServer('127.0.0.1', error_rate=1.0) as server:
+        client = FinalesClient('127.0.0.1',
+                               server.server_address[1],
+                               requests_per_second=None,
+                               max_retries=0)
+        flusher = OutboxFlusher(outbox, AsyncFinalesClient.from_client(client),
+                                ledger)
+        assert flusher.flush_once() == 0
+
+    assert 'request-1' in outbox
+    assert 'request-1' not in ledger
+    assert flusher.get_stats()['num_failed'] == 1
+
+
+def test_flusher_drops_rejected_results():
+    """Results the server rejects for good are dropped, not retried."""
+    outbox = ResultOutbox()
+    ledger = ReportLedger()
+
+    with StandinServer('127.0.0.1') as server:
+        request_uuid = server.state.seed_requests(1, seed=0)[0]
+        result = wrap_results(server.state.requests[request_uuid],
+                              {'value': 1.0}, 'molecular_dynamics', 'tenant')
+        client = FinalesClient('127.0.0.1',
+                               server.server_address[1],
+                               requests_per_second=None)
+        client.post_result(result, request_uuid)
+
+        # The request is already resolved, so the server replies with a 404
+        outbox.enqueue_many([(request_uuid, result)])
+        flusher = OutboxFlusher(outbox, AsyncFinalesClient.from_client(client),
+                                ledger)
+        assert flusher.flush_once() == 0
+
+    assert request_uuid not in outbox
+    assert request_uuid not in ledger
+    assert flusher.get_stats()['num_rejected'] == 1
+    assert flusher.get_stats()['num_failed'] == 0
@@ -0,0 +1,40 @@
+"""Tests for the background stage fetching the pending requests."""
+import pytest
+
+from aiida_finales.engine.tenant.pipeline import RequestPoller, iter_chunks
+
+
+def test_iter_poll_chunks():
+    """All the requests of a poll are received, in order."""
+    poller = RequestPoller(lambda: iter(range(7)), chunk_size=3, max_chunks=1)
+    poller.start()
+    try:
+        for _ in range(2):
+            poller.request_poll()
+            assert list(poller.iter_poll()) == list(range(7))
+    finally:
+        poller.stop()
+    assert not poller.running
+
+
+def test_iter_chunks():
+    """The items are grouped in lists of up to the chunk size."""
+    assert list(iter_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_chunks([], 3)) == []
+
+
+def test_iter_poll_error():
+    """Errors while fetching are raised in the consuming thread."""
+
+    def failing_iter():
+        yield 1
+        raise RuntimeError('server down')
+
+    poller = RequestPoller(failing_iter, chunk_size=10)
+    poller.start()
+    try:
+        poller.request_poll()
+        with pytest.raises(RuntimeError, match='server down'):
+            list(poller.iter_poll())
+    finally:
+        poller.stop()
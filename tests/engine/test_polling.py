@@ -0,0 +1,61 @@
+"""Tests for the polling policies of the tenant."""
+import pytest
+
+from aiida_finales.engine.tenant import AiidaTenantConfig
+from aiida_finales.engine.tenant.polling import AdaptivePolling, FixedPolling
+
+
+def make_record(**kwargs):
+    """Return a cycle record with no activity, updated with `kwargs`."""
+    cycle_record = {
+        'num_pending': 0,
+        'num_submitted': 0,
+        'num_reported': 0,
+        'num_updated': 0,
+        'num_ongoing': 0,
+    }
+    cycle_record.update(kwargs)
+    return cycle_record
+
+
+def test_fixed_polling():
+    """The fixed policy ignores the activity."""
+    policy = FixedPolling(interval=2.0)
+    assert policy.next_interval(make_record()) == 2.0
+    assert policy.next_interval(make_record(num_submitted=3)) == 2.0
+
+
+def test_adaptive_polling():
+    """The adaptive policy backs off when idle and re-polls when busy."""
+    policy = AdaptivePolling(interval=1.0, max_interval=5.0)
+
+    idle_intervals = [policy.next_interval(make_record()) for _ in range(5)]
+    assert idle_intervals == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    assert policy.next_interval(make_record(num_reported=1)) == 0.5
+    assert policy.next_interval(make_record(num_ongoing=2)) == 1.0
+    assert policy.next_interval(make_record()) == 1.0
+
+    # Workflows that only changed state in the index are not new work
+    assert policy.next_interval(make_record(num_updated=3,
+                                            num_ongoing=3)) == 1.0
+
+
+def test_adaptive_polling_invalid_factor():
+    """A backoff factor below one is rejected."""
+    with pytest.raises(ValueError):
+        AdaptivePolling(backoff_factor=0.5)
+
+
+def test_tenant_config_polling(tmp_path):
+    """The polling policy is created from the tenant configuration."""
+    config_file = tmp_path / 'tenant_config.yaml'
+    config_file.write_text('polling: fixed\npolling_interval: 7.5\n')
+
+    tenant_config = AiidaTenantConfig.load_from_yaml_file(config_file)
+    policy = tenant_config.create_polling_policy()
+    assert isinstance(policy, FixedPolling)
+    assert policy.next_interval(make_record()) == 7.5
+
+    with pytest.raises(ValueError):
+        AiidaTenantConfig(polling='sometimes').create_polling_policy()
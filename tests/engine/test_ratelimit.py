@@ -0,0 +1,59 @@
+"""Tests for the rate limiter."""
+import asyncio
+
+import pytest
+
+from aiida_finales.engine.client import RateLimiter
+
+
+class FakeClock:
+    """Clock that only advances when told to."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def test_burst_is_not_throttled():
+    """Calls within the burst do not wait."""
+    limiter = RateLimiter(rate=2.0, burst=3, clock=FakeClock())
+    waits = [limiter._reserve() for _ in range(3)]  # pylint: disable=protected-access
+    assert waits == [0.0, 0.0, 0.0]
+    assert limiter.get_stats()['throttled_calls'] == 0
+
+
+def test_waits_accumulate_when_exhausted():
+    """Once the bucket is empty, each call waits one more token period."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=1, clock=clock)
+    waits = [limiter._reserve() for _ in range(3)]  # pylint: disable=protected-access
+    assert waits == pytest.approx([0.0, 0.5, 1.0])
+    assert limiter.last_wait == pytest.approx(1.0)
+    assert limiter.get_stats()['throttled_calls'] == 2
+
+    clock.now = 10.0
+    assert limiter._reserve() == 0.0  # pylint: disable=protected-access
+
+
+def test_disabled_limiter():
+    """A limiter without a rate never waits."""
+    limiter = RateLimiter(rate=None)
+    assert all(limiter.acquire() == 0.0 for _ in range(100))
+    assert limiter.get_stats()['total_calls'] == 100
+
+
+def test_acquire_async():
+    """The asynchronous acquire waits without blocking the loop."""
+    limiter = RateLimiter(rate=100.0, burst=1)
+
+    async def acquire_many():
+        return await asyncio.gather(*(limiter.acquire_async()
+                                      for _ in range(3)))
+
+    waits = asyncio.run(acquire_many())
+    assert waits[0] == 0.0
+    assert sum(waits) > 0.0
@@ -0,0 +1,37 @@
+"""Tests for the sharding of the requests between instances."""
+import pytest
+
+from aiida_finales.engine.tenant.sharding import RequestSharding
+
+REQUEST_UUIDS = [f'request-{index}' for index in range(300)]
+
+
+def test_every_request_has_one_owner():
+    """Each request is processed by exactly one of the instances."""
+    shardings = [RequestSharding(index, 3) for index in range(3)]
+    owned = [{
+        request_uuid
+        for request_uuid in REQUEST_UUIDS if sharding.owns(request_uuid)
+    } for sharding in shardings]
+
+    assert set.union(*owned) == set(REQUEST_UUIDS)
+    assert sum(len(requests) for requests in owned) == len(REQUEST_UUIDS)
+    assert all(len(requests) > 50 for requests in owned)
+
+
+def test_minimal_reassignment():
+    """Adding an instance only moves requests to the new instance."""
+    before = RequestSharding(0, 3)
+    after = RequestSharding(0, 4)
+    for request_uuid in REQUEST_UUIDS:
+        owner = after.get_owner(request_uuid)
+        assert owner in (before.get_owner(request_uuid), 3)
+
+
+def test_invalid_instances():
+    """The index must be one of the instances."""
+    assert RequestSharding().owns('request-1')
+    with pytest.raises(ValueError):
+        RequestSharding(2, 2)
+    with pytest.raises(ValueError):
+        RequestSharding(0, 0)
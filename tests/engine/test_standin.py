@@ -0,0 +1,106 @@
+"""Tests for the stand-in FINALES server."""
+import pytest
+import requests
+
+from aiida_finales.engine.client import FinalesClient
+from aiida_finales.engine.standin import StandinServer, StandinState
+from aiida_finales.engine.tenant import AiidaTenant
+from aiida_finales.utils.create_request import create_request
+from aiida_finales.utils.create_result import wrap_results
+
+
+@pytest.fixture
+def standin_server():
+    """Run a stand-in server in a background thread."""
+    with StandinServer(state=StandinState(users={'user': 'secret'})) as server:
+        yield server
+
+
+def create_client(server):
+    """Create an authenticated client for the server."""
+    client = FinalesClient('127.0.0.1',
+                           server.server_address[1],
+                           requests_per_second=None,
+                           max_retries=0)
+    client.authenticate('user', 'secret')
+    return client
+
+
+def test_round_trip(standin_server):
+    """Requests can be posted, listed and answered."""
+    client = create_client(standin_server)
+    assert client.get_capabilities()[0]['quantity'] == 'conductivity'
+
+    request_uuid = client.post_request(create_request(temp=250, conc_li=0.1))
+    standin_server.state.seed_requests(4, seed=1)
+    pending = client.get_pending_requests(quantity='conductivity',
+                                          method='molecular_dynamics')
+    assert len(pending) == 5
+    assert client.get_pending_requests(quantity='other') == []
+    assert len(list(client.iter_pending_requests(page_size=2))) == 5
+
+    request_data = client.get_specific_request(request_uuid)
+    result = wrap_results(request_data, {'value': 1.0}, 'molecular_dynamics',
+                          'tenant-1')
+    client.post_result(result, request_uuid)
+    assert len(client.get_pending_requests()) == 4
+    assert request_uuid in standin_server.state.result_times
+
+
+def test_validation_and_auth(standin_server):
+    """Invalid data and unauthenticated calls are rejected."""
+    port = standin_server.server_address[1]
+    baseurl = f'http://127.0.0.1:{port}'
+    assert requests.get(baseurl + '/capabilities/').status_code == 401
+    with pytest.raises(ValueError):
+        FinalesClient('127.0.0.1', port).authenticate('user', 'wrong')
+
+    client = create_client(standin_server)
+    reply = client._connection.auth_post('/requests/', data_json={})  # pylint: disable=protected-access
+    assert reply.status_code == 422
+
+
+def test_error_injection():
+    """Errors are injected reproducibly with the seed."""
+    statuses = []
+    for _ in range(2):
+        with StandinServer(error_rate=0.5, seed=3) as server:
+            baseurl = f'http://127.0.0.1:{server.server_address[1]}'
+            statuses.append([
+                requests.get(baseurl + '/capabilities/').status_code
+                for _ in range(10)
+            ])
+    assert statuses[0] == statuses[1]
+    assert set(statuses[0]) == {200, 503}
+
+
+def test_seed_requests_reproducible():
+    """The same seed generates the same requests."""
+    parameters = []
+    for _ in range(2):
+        state = StandinState()
+        state.seed_requests(3, seed=7)
+        parameters.append([
+            request_object['request']['parameters']
+            for request_object in state.get_pending()
+        ])
+    assert parameters[0] == parameters[1]
+
+
+def test_tenant_cycle_offline():
+    """A tenant cycle runs against the stand-in and its results arrive."""
+    with StandinServer() as server:
+        request_uuids = server.state.seed_requests(3, seed=0)
+        client = FinalesClient('127.0.0.1',
+                               server.server_address[1],
+                               requests_per_second=None)
+        tenant = AiidaTenant(client, max_ongoing_processes=1)
+        for request_uuid in request_uuids:
+            tenant.result_cache.store(server.state.requests[request_uuid],
+                                      'molecular_dynamics', {'value': 1.0})
+
+        cycle_record = tenant.run_cycle()
+        tenant.outbox_flusher.flush_all()
+
+    assert cycle_record['num_cache_hits'] == 3
+    assert set(server.state.results) == set(request_uuids)
@@ -0,0 +1,101 @@
+"""Tests for the submission queue of the tenant."""
+import pytest
+
+from aiida import orm
+
+from aiida_finales.engine.tenant.submission import SubmissionQueue, get_daemon_capacity
+
+
+class RecordingSubmit:
+    """Submit function that creates stored nodes instead of processes."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.builders = []
+
+    def __call__(self, builder):
+        """Record the builder and return a new node."""
+        self.builders.append(builder)
+        return orm.WorkflowNode().store()
+
+
+def test_submit_available_respects_limit():
+    """Only as many processes as free slots are submitted, in FIFO order."""
+    submit_function = RecordingSubmit()
+    queue = SubmissionQueue(3, submit_function=submit_function)
+    for index in range(5):
+        queue.put([f'request-{index}'], f'builder-{index}')
+    queue.put(['request-0'], 'builder-0')
+    assert len(queue) == 5
+
+    submitted = queue.submit_available(num_ongoing=1)
+    assert [request_uuids for request_uuids, _ in submitted] == [
+        ['request-0'],
+        ['request-1'],
+    ]
+    assert submit_function.builders == ['builder-0', 'builder-1']
+    assert 'request-0' not in queue
+    assert 'request-2' in queue
+
+    assert queue.submit_available(num_ongoing=3) == []
+    assert len(queue) == 3
+
+
+def test_submit_available_batch_size():
+    """At most `batch_size` processes are submitted per call."""
+    submit_function = RecordingSubmit()
+    queue = SubmissionQueue(10, batch_size=2, submit_function=submit_function)
+    queue.put(['request-0', 'request-1'], 'batch-0')
+    for index in range(2, 5):
+        queue.put([f'request-{index}'], f'builder-{index}')
+    assert queue.num_requests == 5
+
+    submitted = queue.submit_available(num_ongoing=0)
+    assert len(submitted) == 2
+    assert queue.num_requests == 2
+
+    # The processes submitted earlier in the same cycle count as well
+    assert queue.submit_available(num_ongoing=0, num_submitted=2) == []
+    assert len(queue.submit_available(num_ongoing=0, num_submitted=1)) == 1
+
+
+def test_invalid_max_ongoing():
+    """The queue needs room for at least one process."""
+    with pytest.raises(ValueError):
+        SubmissionQueue(0)
+
+
+def test_get_daemon_capacity():
+    """Without a running daemon, a single worker is assumed."""
+    assert get_daemon_capacity() >= 1
+
+
+def test_submit_available_group():
+    """The submitted processes are added to the group."""
+    group = orm.Group(label='tenant-group').store()
+    queue = SubmissionQueue(2, group=group, submit_function=RecordingSubmit())
+    queue.put(['request-0'], 'builder-0')
+    queue.put(['request-1'], 'builder-1')
+
+    submitted = queue.submit_available(num_ongoing=0)
+    submitted_pks = [process_node.pk for _, process_node in submitted]
+    assert sorted(node.pk for node in group.nodes) == sorted(submitted_pks)
+
+
+def test_submit_available_group_on_failure():
+    """Processes submitted before a failing submission are in the group."""
+    group = orm.Group(label='tenant-group').store()
+    recording_submit = RecordingSubmit()
+
+    def failing_submit(builder):
+        if builder == 'builder-1':
+            raise RuntimeError('broker down')
+        return recording_submit(builder)
+
+    queue = SubmissionQueue(2, group=group, submit_function=failing_submit)
+    queue.put(['request-0'], 'builder-0')
+    queue.put(['request-1'], 'builder-1')
+
+    with pytest.raises(RuntimeError):
+        queue.submit_available(num_ongoing=0)
+    assert len(group.nodes) == 1
@@ -0,0 +1,286 @@
+"""Tests for the AiiDA tenant."""
+from plumpy import ProcessState
+
+from aiida import orm
+
+from aiida_finales.engine.client import FinalesClient
+from aiida_finales.engine.tenant import AiidaTenant
+from aiida_finales.engine.tenant import main as tenant_main
+from aiida_finales.engine.tenant.main import INLINE_LABEL, can_batch, get_result_data
+from aiida_finales.utils.create_request import create_request
+from aiida_finales.utils.request_labels import get_request_label
+
+
+def create_request_data(request_uuid, **kwargs):
+    """Create the data of a request as it is received from the server."""
+    return {'uuid': request_uuid, 'request': create_request(**kwargs)}
+
+
+def test_prepare_batch_submissions():
+    """Batchable requests are split in batches of at most `batch_size`."""
+    tenant = AiidaTenant(FinalesClient('localhost', 0), batch_size=2)
+    requests_data = [
+        create_request_data(f'request-{index}',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_ec=0.25,
+                            conc_pc=0.65) for index in range(3)
+    ]
+    requests_data.append(create_request_data('request-empty'))
+    assert all(can_batch(request_data) for request_data in requests_data)
+
+    prepared_batches = tenant.prepare_batch_submissions(requests_data)
+    assert [request_uuids for request_uuids, _ in prepared_batches] == [
+        ['request-0', 'request-1'],
+        ['request-2'],
+    ]
+    assert prepared_batches[0][
+        1].metadata.description == 'request-0\nrequest-1'
+    assert prepared_batches[1][1].metadata.label == get_request_label(
+        'request-2')
+
+
+def test_prepare_submission_label():
+    """The process of a request is labelled with its uuid on creation."""
+    tenant = AiidaTenant(FinalesClient('localhost', 0))
+    request_data = create_request_data('request-1',
+                                       temp=250,
+                                       conc_li=0.1,
+                                       conc_pc=0.9)
+    builder = tenant.prepare_submission(request_data)
+    assert builder.metadata.label == get_request_label('request-1')
+
+
+def test_get_result_data():
+    """Results are found in both single and batch outputs."""
+    single_output = {'conductivity': {'values': [1.0]}}
+    batch_output = {'results': {'request-1': single_output}, 'errors': {}}
+    assert get_result_data(single_output, 'request-1') == single_output
+    assert get_result_data(batch_output, 'request-1') == single_output
+    assert get_result_data(batch_output, 'request-2') is None
+
+
+def test_iter_pending_requests_filters():
+    """The tenant asks the server only for the requests it can deal with."""
+
+    class FilteringClient(FinalesClient):
+        """Client that records the filters instead of calling the server."""
+
+        def __init__(self):
+            """Initialize internal variables."""
+            super().__init__('localhost', 0)
+            self.filters = []
+
+        def iter_pending_requests(self,
+                                  quantity=None,
+                                  method=None,
+                                  page_size=None):
+            """Record the filters and return a duplicated request."""
+            self.filters.append((quantity, method, page_size))
+            return iter([{'uuid': 'request-1'}, {'uuid': 'request-1'}])
+
+    client = FilteringClient()
+    tenant = AiidaTenant(client, page_size=50)
+    assert list(tenant.iter_pending_requests()) == [{'uuid': 'request-1'}]
+    assert client.filters == [('conductivity', 'molecular_dynamics', 50)]
+
+
+def test_report_results_outbox(recording_server):
+    """Results are queued in the outbox and recorded once posted."""
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client)
+    request_data = create_request_data('request-1',
+                                       temp=250,
+                                       conc_li=0.1,
+                                       conc_pc=0.9)
+
+    tenant.report_results([(request_data, {'value': 1.0})])
+    assert tenant.is_reported('request-1')
+    assert 'request-1' not in tenant.report_ledger
+
+    assert tenant.outbox_flusher.flush_all() == 1
+    assert 'request-1' in tenant.report_ledger
+    server_reply = tenant.report_ledger.get_reply('request-1')
+    assert server_reply['request_uuid'] == 'request-1'
+    assert server_reply['data'] == {'value': 1.0}
+
+
+def test_run_cycle_pipelined(recording_server):
+    """The pending requests are fetched by the background poller."""
+    recording_server.pending = [
+        create_request_data(f'request-{index}') for index in range(3)
+    ]
+    recording_server.paginate = True
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client, page_size=2, max_ongoing_processes=1)
+    tenant.request_poller.start()
+    try:
+        cycle_record = tenant.run_cycle()
+    finally:
+        tenant.request_poller.stop()
+
+    assert cycle_record['num_pending'] == 3
+    assert len(recording_server.queries) == 2
+    assert set(cycle_record['phase_durations']) >= {
+        'get_pending_requests',
+        'query_requests_submitted',
+        'submit',
+    }
+
+
+def test_run_cycle_submits_per_chunk(recording_server, monkeypatch):
+    """The requests of each page are submitted before the next is fetched."""
+    recording_server.pending = [
+        create_request_data(f'request-{index}',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_pc=0.9) for index in range(3)
+    ]
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client,
+                         page_size=1,
+                         max_ongoing_processes=10,
+                         pipelined=False)
+    num_queries = []
+
+    def record_submit(builder):
+        num_queries.append(len(recording_server.queries))
+        return orm.WorkflowNode().store()
+
+    monkeypatch.setattr(tenant.submission_queue, '_submit_function',
+                        record_submit)
+    cycle_record = tenant.run_cycle()
+
+    assert cycle_record['num_submitted'] == 3
+    assert num_queries == [1, 2, 3]
+
+
+class FakeSubmit:
+    """Submit function that stores running workflow nodes for the builders."""
+
+    def __init__(self):
+        """Initialize internal variables."""
+        self.labels = []
+
+    def __call__(self, builder):
+        """Store a running workflow node labelled as the builder."""
+        self.labels.append(builder.metadata.label)
+        node = orm.WorkflowNode()
+        node.process_type = tenant_main.get_relevant_process_types()[0]
+        node.label = builder.metadata.label
+        node.set_process_state(ProcessState.RUNNING)
+        return node.store()
+
+
+def test_run_cycle_inline(recording_server, monkeypatch):
+    """Inline requests are answered in the cycle by a single calculation."""
+    recording_server.pending = [
+        create_request_data('request-1',
+                            temp=250,
+                            conc_li=0.1,
+                            conc_ec=0.25,
+                            conc_pc=0.65),
+        create_request_data('request-2', temp=250, conc_li=0.1, conc_ec=0.9),
+    ]
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client,
+                         inline=True,
+                         pipelined=False,
+                         max_ongoing_processes=1)
+    fake_submit = FakeSubmit()
+    monkeypatch.setattr(tenant.submission_queue, '_submit_function',
+                        fake_submit)
+
+    cycle_record = tenant.run_cycle()
+    assert cycle_record['num_inline'] == 1
+    assert cycle_record['num_reported'] == 1
+    assert tenant.is_reported('request-1')
+
+    # The request without an inline result goes through a workflow
+    assert cycle_record['num_submitted'] == 1
+    assert fake_submit.labels == [get_request_label('request-2')]
+
+    queryb = orm.QueryBuilder().append(orm.CalcFunctionNode,
+                                       filters={'label': INLINE_LABEL},
+                                       project='description')
+    assert queryb.all(flat=True) == ['request-1\nrequest-2']
+
+    cycle_record = tenant.run_cycle()
+    assert cycle_record['num_inline'] == 0
+    assert cycle_record['num_already_reported'] == 1
+    assert cycle_record['num_ongoing'] == 1
+    assert cycle_record['num_submitted'] == 0
+    assert queryb.count() == 1
+
+
+def test_run_cycle_inline_unprocessable(recording_server):
+    """Requests without a formulation are not evaluated inline every cycle."""
+    recording_server.pending = [create_request_data('request-1', temp=250)]
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client,
+                         inline=True,
+                         pipelined=False,
+                         max_ongoing_processes=1)
+    for _ in range(3):
+        cycle_record = tenant.run_cycle()
+        assert cycle_record['num_submitted'] == 0
+
+    queryb = orm.QueryBuilder().append(orm.CalcFunctionNode,
+                                       filters={'label': INLINE_LABEL})
+    assert queryb.count() == 0
+
+
+def test_run_cycle_inline_backoff(recording_server, monkeypatch):
+    """After a failed inline evaluation, the requests go to the workflows."""
+
+    class FailingFunction:
+        """Inline function that always fails."""
+
+        num_calls = 0
+
+        @classmethod
+        def run_get_node(cls, **kwargs):
+            """Fail to evaluate the requests."""
+            cls.num_calls += 1
+            raise RuntimeError('broken setup')
+
+    monkeypatch.setitem(
+        tenant_main.TENANT_CAPABILITIES['conductivity']['molecular_dynamics'],
+        'inline_function', FailingFunction)
+    recording_server.pending = [
+        create_request_data('request-1', temp=250, conc_li=0.1, conc_pc=0.9)
+    ]
+    client = FinalesClient('127.0.0.1',
+                           recording_server.server_address[1],
+                           requests_per_second=None)
+    tenant = AiidaTenant(client,
+                         inline=True,
+                         pipelined=False,
+                         max_ongoing_processes=10)
+    fake_submit = FakeSubmit()
+    monkeypatch.setattr(tenant.submission_queue, '_submit_function',
+                        fake_submit)
+
+    cycle_record = tenant.run_cycle()
+    assert cycle_record['num_inline'] == 0
+    assert cycle_record['num_submitted'] == 1
+
+    recording_server.pending.append(
+        create_request_data('request-2', temp=250, conc_li=0.1, conc_pc=0.9))
+    cycle_record = tenant.run_cycle()
+    assert cycle_record['num_submitted'] == 1
+    assert fake_submit.labels == [
+        get_request_label('request-1'),
+        get_request_label('request-2'),
+    ]
+    assert FailingFunction.num_calls == 1
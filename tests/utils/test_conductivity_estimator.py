@@ -0,0 +1,72 @@
+"""Tests for the conductivity estimator."""
+import numpy as np
+import pytest
+
+from aiida_finales.utils import conductivity_estimator as estimator
+
+
+def test_batch_matches_scalar():
+    """The batch evaluation reproduces the scalar one row by row."""
+    values_lpf = np.array([0.1, 0.05, 0.2])
+    values_ecs = np.array([0.25, 0.5, 0.1])
+    values_pcs = np.array([0.65, 0.45, 0.7])
+    temps = np.array([250.0, 298.0, 333.0])
+
+    results, valid = estimator.estimate_conductivity_batch(
+        values_lpf, values_ecs, values_pcs, temps)
+
+    assert valid.all()
+    for index, result in enumerate(results):
+        expected = estimator.estimate_conductivity(values_lpf[index],
+                                                   values_ecs[index],
+                                                   values_pcs[index],
+                                                   temps[index])
+        assert result == pytest.approx(expected)
+
+
+def test_batch_invalid_rows():
+    """Invalid rows are masked out instead of raising."""
+    results, valid = estimator.estimate_conductivity_batch(
+        [0.1, 0.0, 0.1, 0.1],
+        [0.25, 0.25, 0.25, 0.25],
+        [0.65, 0.65, 0.0, 0.65],
+        [250.0, 250.0, 250.0, 400.0],
+    )
+
+    assert valid.tolist() == [True, False, False, False]
+    assert np.isfinite(results[0])
+    assert np.isnan(results[1:]).all()
+
+
+def test_batch_broadcasts_scalars():
+    """Scalar inputs are broadcast against the arrays."""
+    results, valid = estimator.estimate_conductivity_batch([0.1, 0.2], 0.25,
+                                                           0.65, 298)
+    assert results.shape == (2, )
+    assert valid.all()
+
+
+def test_calculate_coefs_cache():
+    """Repeated temperatures are served from the coefficient cache."""
+    estimator.clear_coefs_cache()
+
+    first = estimator.calculate_coefs(298)
+    second = estimator.calculate_coefs(298.0)
+    estimator.calculate_coefs(250)
+
+    assert first == second
+    cache_info = estimator.coefs_cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 2
+    assert cache_info.currsize == 2
+
+    first[0] = None
+    assert estimator.calculate_coefs(298)[0] is not None
+
+
+def test_calculate_coefs_grid_points():
+    """The coefficients on the grid points are the ones in the table."""
+    assert estimator.calculate_coefs(243)[0] == pytest.approx(1.0)
+    assert estimator.calculate_coefs(333)[9] == pytest.approx(21.1)
+    with pytest.raises(ValueError):
+        estimator.calculate_coefs(400)
@@ -0,0 +1,56 @@
+"""Tests for the precomputed grid of the conductivity estimator."""
+import numpy as np
+import pytest
+
+from aiida_finales.utils import conductivity_estimator as estimator
+from aiida_finales.utils.conductivity_grid import ConductivityGrid
+
+
+def test_grid_matches_model():
+    """The grid reproduces the model, more closely with more points."""
+    coarse_grid = ConductivityGrid.build((11, 11, 10))
+    grid = ConductivityGrid.build((51, 51, 46))
+    coarse_errors = coarse_grid.max_error(1000, seed=0)
+    fine_errors = grid.max_error(1000, seed=0)
+    assert fine_errors['max_abs_error'] < coarse_errors['max_abs_error']
+    assert fine_errors['max_rel_error'] < 1e-2
+
+    values_lpf = np.array([0.1, 0.05, 0.2])
+    values_ecs = np.array([0.25, 0.5, 0.1])
+    values_pcs = np.array([0.65, 0.45, 0.7])
+    temps = np.array([250.0, 298.0, 333.0])
+    results, valid = grid.estimate_batch(values_lpf, values_ecs, values_pcs,
+                                         temps)
+    expected, _ = estimator.estimate_conductivity_batch(
+        values_lpf, values_ecs, values_pcs, temps)
+    assert valid.all()
+    assert results == pytest.approx(expected, rel=1e-2)
+
+
+def test_grid_outside_and_invalid():
+    """Invalid rows are masked, and rows outside the grid use the model."""
+    grid = ConductivityGrid.build((11, 11, 10),
+                                  ranges={'salt_ratio': (0.0, 0.2)})
+    results, valid = grid.estimate_batch(
+        [0.1, 0.3, 0.0],
+        [0.25, 0.25, 0.25],
+        [0.65, 0.45, 0.65],
+        [250.0, 250.0, 250.0],
+    )
+    assert valid.tolist() == [True, True, False]
+    assert results[1] == estimator.estimate_conductivity(0.3, 0.25, 0.45, 250)
+    assert np.isnan(results[2])
+    assert np.isnan(grid.interpolate(0.3, 0.5, 250.0)).all()
+
+
+def test_grid_save_load(tmp_path):
+    """The saved grid is loaded memory-mapped, with the same values."""
+    grid = ConductivityGrid.build((11, 11, 10))
+    filepath = tmp_path / 'grid.npy'
+    grid.save(filepath)
+
+    loaded = ConductivityGrid.load(filepath)
+    assert isinstance(loaded.values, np.memmap)
+    assert not loaded.values.flags.writeable
+    assert loaded.axes == grid.axes
+    assert np.array_equal(loaded.values, grid.values)